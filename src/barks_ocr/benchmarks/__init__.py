@@ -0,0 +1 @@
+"""Benchmarks for the OCR pipeline stages."""
@@ -0,0 +1,132 @@
+# ruff: noqa: T201
+
+"""Groups/sec of ``EntityTagger`` per-group tagging against batched ``tag_many``.
+
+Tags the speech groups of the given volumes with the original one-call-per-group
+full spaCy pipeline, then with the trimmed pipeline one group at a time and
+through ``tag_many`` at each batch size and process count:
+
+    python -m barks_ocr.benchmarks.entity_tagging --volumes 1-3 -b 64 -b 256 -p 1 -p 4
+
+Every run's entities are checked against the full pipeline's, group by group.
+"""
+
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+import typer
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.speech_groupers import OCR_TYPE_DICT, SpeechGroups
+from comic_utils.common_typer_options import LogLevelArg, VolumesArg
+from intspan import intspan
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.pipeline.entity_tagger import EntityDict, EntityTagger
+from barks_ocr.pipeline.whoosh_index import iter_speech_groups
+
+APP_LOGGING_NAME = "bent"
+
+DEFAULT_BATCH_SIZES = [32, 256, 1024]
+DEFAULT_PROCESSES = [1]
+
+
+@dataclass
+class TaggingTiming:
+    name: str
+    secs: float
+    num_mismatches: int
+
+
+def _time_tagging(
+    name: str,
+    tag_func: Callable[[list[str]], Iterable[EntityDict]],
+    texts: list[str],
+    expected: list[EntityDict] | None,
+) -> tuple[TaggingTiming, list[EntityDict]]:
+    start = time.perf_counter()
+    results = list(tag_func(texts))
+    secs = time.perf_counter() - start
+
+    num_mismatches = 0
+    if expected is not None:
+        num_mismatches = sum(r != e for r, e in zip(results, expected, strict=True))
+
+    print(f"{name}: {secs:.2f}s.")
+    return TaggingTiming(name, secs, num_mismatches), results
+
+
+def _print_report(timings: list[TaggingTiming], num_groups: int) -> None:
+    base_secs = timings[0].secs
+
+    print()
+    print(f"{'Run':<28} {'Secs':>8} {'Groups/sec':>11} {'Speed-up':>9} {'Mismatches':>11}")
+    for timing in timings:
+        print(
+            f"{timing.name:<28} {timing.secs:8.2f} {num_groups / timing.secs:11.0f}"
+            f" {base_secs / timing.secs:8.2f}x {timing.num_mismatches:11d}"
+        )
+
+
+app = typer.Typer()
+
+
+@app.command(help="Benchmark per-group against batched spaCy entity tagging")
+def main(  # noqa: PLR0913
+    volumes_str: VolumesArg = "",
+    ocr_index: int = 1,
+    batch_size: list[int] = typer.Option(  # noqa: B008
+        DEFAULT_BATCH_SIZES, "--batch-size", "-b", help="Batch sizes (repeat for several)"
+    ),
+    processes: list[int] = typer.Option(  # noqa: B008
+        DEFAULT_PROCESSES, "--processes", "-p", help="spaCy process counts (repeat for several)"
+    ),
+    max_groups: int = typer.Option(0, help="Only tag this many groups (0 = all)"),
+    log_level_str: LogLevelArg = "WARNING",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "entity-tagging-benchmark.log", log_level_str)
+
+    volumes = list(intspan(volumes_str))
+    if not volumes:
+        msg = "At least one volume is needed."
+        raise typer.BadParameter(msg)
+
+    comics_database = ComicsDatabase()
+    groups = iter_speech_groups(
+        comics_database, SpeechGroups(comics_database), volumes, OCR_TYPE_DICT[ocr_index]
+    )
+    texts = [speech_text.ai_text for _, _, _, speech_text in groups]
+    if max_groups > 0:
+        texts = texts[:max_groups]
+    print(f"Tagging {len(texts)} speech groups from {len(volumes)} volumes.")
+
+    full_tagger = EntityTagger(trim_pipeline=False)
+    tagger = EntityTagger()
+
+    timings: list[TaggingTiming] = []
+    timing, expected = _time_tagging(
+        "tag, full pipeline", lambda t: map(full_tagger.tag, t), texts, None
+    )
+    timings.append(timing)
+    timings.append(_time_tagging("tag, trimmed", lambda t: map(tagger.tag, t), texts, expected)[0])
+
+    timings.extend(
+        _time_tagging(
+            f"tag_many, batch {size}, {n_process} proc",
+            lambda t, s=size, n=n_process: tagger.tag_many(t, s, n),
+            texts,
+            expected,
+        )[0]
+        for n_process in processes
+        for size in batch_size
+    )
+
+    _print_report(timings, len(texts))
+
+    if any(t.num_mismatches for t in timings):
+        print("ERROR: Some runs' entities differ from the full pipeline's.")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,168 @@
+# ruff: noqa: T201
+
+"""Latency of ``FuzzyTermIndex.find`` on OCR-damaged words against a full term scan.
+
+Samples index terms, damages each the way the OCR does (look-alike characters
+like "0" for "o", a dropped or doubled letter), then looks every damaged word
+up in the trigram index and, for a subset, by checking the edit distance to
+every term:
+
+    python -m barks_ocr.benchmarks.fuzzy_search --num-queries 2000
+    python -m barks_ocr.benchmarks.fuzzy_search --synthetic-terms 40000
+
+Reports p50/p95/max latency, the speed-up over the full scan and how often the
+original term was found, and fails if the p95 latency is over '--target-p95-ms'
+or the trigram lookup misses a term the full scan finds.
+"""
+
+import random
+import statistics
+import string
+import time
+from collections.abc import Callable
+
+import typer
+from comic_utils.common_typer_options import LogLevelArg
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.pipeline.whoosh_fuzzy import (
+    DEFAULT_MAX_EDITS,
+    FuzzyTermIndex,
+    get_edit_distance,
+    get_max_edits,
+)
+from barks_ocr.utils.index_paths import get_volumes_index_dir
+
+APP_LOGGING_NAME = "bfuz"
+
+DEFAULT_NUM_QUERIES = 1000
+DEFAULT_NUM_SCAN_QUERIES = 50
+DEFAULT_TARGET_P95_MS = 10.0
+MIN_QUERY_TERM_LEN = 5
+
+OCR_LOOK_ALIKES = {"o": "0", "l": "1", "i": "1", "s": "5", "e": "c", "b": "6", "g": "9"}
+
+
+def _damage_word(word: str, rng: random.Random) -> str:
+    """Return 'word' with one OCR-style error."""
+    look_alike_positions = [i for i, ch in enumerate(word) if ch in OCR_LOOK_ALIKES]
+    kind = rng.choice(["look-alike", "drop", "double"])
+    i = rng.randrange(1, len(word) - 1)
+
+    if kind == "look-alike" and look_alike_positions:
+        i = rng.choice(look_alike_positions)
+        return word[:i] + OCR_LOOK_ALIKES[word[i]] + word[i + 1 :]
+    if kind == "drop":
+        return word[:i] + word[i + 1 :]
+    return word[:i] + word[i] + word[i:]
+
+
+def _make_synthetic_terms(num_terms: int, rng: random.Random) -> dict[str, int]:
+    terms: dict[str, int] = {}
+    while len(terms) < num_terms:
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 12)))
+        terms[word] = rng.randint(1, 500)
+    return terms
+
+
+def _time_queries(
+    find: Callable[[str], list[str]], queries: list[str]
+) -> tuple[list[float], list[list[str]]]:
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(find(query))
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+
+def _get_percentile(latencies: list[float], percent: int) -> float:
+    return (
+        statistics.quantiles(latencies, n=100)[percent - 1] if len(latencies) > 1 else latencies[0]
+    )
+
+
+def _print_latencies(name: str, latencies: list[float]) -> None:
+    print(
+        f"{name:<14} {1000 * _get_percentile(latencies, 50):9.3f}"
+        f" {1000 * _get_percentile(latencies, 95):9.3f} {1000 * max(latencies):9.3f}"
+    )
+
+
+app = typer.Typer()
+
+
+@app.command(help="Benchmark trigram fuzzy term lookup against a full term scan")
+def main(  # noqa: PLR0913
+    ocr_index: int = 1,
+    synthetic_terms: int = typer.Option(
+        0, help="Use this many random terms instead of the index's terms"
+    ),
+    num_queries: int = DEFAULT_NUM_QUERIES,
+    num_scan_queries: int = typer.Option(
+        DEFAULT_NUM_SCAN_QUERIES, help="Queries also timed with a full term scan"
+    ),
+    max_edits: int = DEFAULT_MAX_EDITS,
+    target_p95_ms: float = DEFAULT_TARGET_P95_MS,
+    seed: int = 0,
+    log_level_str: LogLevelArg = "WARNING",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "fuzzy-search-benchmark.log", log_level_str)
+
+    rng = random.Random(seed)  # noqa: S311
+    start = time.perf_counter()
+    if synthetic_terms > 0:
+        fuzzy_index = FuzzyTermIndex("", _make_synthetic_terms(synthetic_terms, rng))
+    else:
+        fuzzy_index = FuzzyTermIndex.load_or_build(get_volumes_index_dir(ocr_index))
+    terms = fuzzy_index.terms
+    print(f"Loaded {fuzzy_index.num_terms} terms in {time.perf_counter() - start:.2f}s.")
+
+    query_terms = [t for t in terms if len(t) >= MIN_QUERY_TERM_LEN and t.isalpha()]
+    if not query_terms:
+        print("ERROR: No terms to make queries from.")
+        raise typer.Exit(code=1)
+    originals = rng.choices(query_terms, k=num_queries)
+    queries = [_damage_word(term, rng) for term in originals]
+
+    latencies, results = _time_queries(
+        lambda q: [m.term for m in fuzzy_index.find(q, max_edits)], queries
+    )
+
+    def scan(query: str) -> list[str]:
+        query_max_edits = get_max_edits(query, max_edits)
+        return [t for t in terms if get_edit_distance(query, t, query_max_edits) is not None]
+
+    num_scan = min(num_scan_queries, len(queries))
+    scan_latencies, scan_results = _time_queries(scan, queries[:num_scan])
+
+    num_found = sum(orig in found for orig, found in zip(originals, results, strict=True))
+    num_missed = sum(
+        not set(scanned) <= set(found)
+        for scanned, found in zip(scan_results, results[:num_scan], strict=True)
+    )
+
+    print()
+    print(f"{'Lookup':<14} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    _print_latencies("trigram index", latencies)
+    if scan_latencies:
+        _print_latencies("full scan", scan_latencies)
+        speed_up = statistics.mean(scan_latencies) / statistics.mean(latencies[:num_scan])
+        print(f"\nSpeed-up over the full scan: {speed_up:.0f}x.")
+    print(f"Original term found for {num_found} of {num_queries} damaged words.")
+
+    failed = False
+    p95_ms = 1000 * _get_percentile(latencies, 95)
+    if p95_ms > target_p95_ms:
+        print(f"ERROR: p95 latency {p95_ms:.3f} ms is over the {target_p95_ms} ms target.")
+        failed = True
+    if num_missed:
+        print(f"ERROR: {num_missed} lookups missed terms that the full scan found.")
+        failed = True
+    if failed:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
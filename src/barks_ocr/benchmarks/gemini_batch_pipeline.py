@@ -0,0 +1,307 @@
+# ruff: noqa: T201
+
+"""End-to-end benchmark of the Gemini batch grouping pipeline against the fake server.
+
+Builds a synthetic volume (page PNGs, raw OCR json and panel segments), starts
+``tools/fake_gemini_server`` in a separate process and runs the same steps as
+``gemini_batch_job`` -> ``gemini_batch_results`` -> ``gemini_groups`` on it:
+
+    python -m barks_ocr.benchmarks.gemini_batch_pipeline --num-pages 50
+
+Reports per-stage wall time, overall pages/minute and peak memory. Peak RSS
+covers this process only, so the fake server's memory is not counted.
+``--trace-memory`` adds tracemalloc per-stage peaks (slower).
+"""
+
+import json
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import typer
+from comic_utils.common_typer_options import LogLevelArg
+from loguru import logger
+from PIL import Image, ImageDraw
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.tools.fake_gemini_server import FakeGeminiConfig, FakeGeminiServer
+
+APP_LOGGING_NAME = "bgem"
+
+OCR_TYPE = "easyocr"
+DEFAULT_NUM_PAGES = 20
+DEFAULT_BOXES_PER_PAGE = 40
+DEFAULT_PAGE_WIDTH = 2100
+DEFAULT_PAGE_HEIGHT = 2970
+PANELS_PER_ROW = 2
+PANEL_ROWS = 4
+BOX_WIDTH = 180
+BOX_HEIGHT = 40
+
+
+@dataclass
+class SyntheticPage:
+    svg_file: Path
+    ocr_file: Path
+    panel_segments_file: Path
+
+
+@dataclass
+class StageResult:
+    name: str
+    secs: float
+    traced_peak_mb: float
+
+
+def make_synthetic_volume(  # noqa: PLR0913
+    volume_dir: Path, num_pages: int, boxes_per_page: int, width: int, height: int, seed: int
+) -> list[SyntheticPage]:
+    rng = random.Random(seed)  # noqa: S311
+    volume_dir.mkdir(parents=True, exist_ok=True)
+
+    panel_w = width // PANELS_PER_ROW
+    panel_h = height // PANEL_ROWS
+    panels = [
+        [col * panel_w, row * panel_h, panel_w, panel_h]
+        for row in range(PANEL_ROWS)
+        for col in range(PANELS_PER_ROW)
+    ]
+
+    pages = []
+    for page_num in range(1, num_pages + 1):
+        fanta_page = f"{page_num:03d}"
+        svg_file = volume_dir / f"{fanta_page}.svg"
+
+        image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        ocr_results = []
+        for box_num in range(boxes_per_page):
+            panel_x, panel_y, _, _ = panels[rng.randrange(len(panels))]
+            x0 = panel_x + rng.randrange(10, panel_w - BOX_WIDTH - 10)
+            y0 = panel_y + rng.randrange(10, panel_h - BOX_HEIGHT - 10)
+            x1 = x0 + BOX_WIDTH
+            y1 = y0 + BOX_HEIGHT
+            draw.rectangle((x0, y0, x1, y1), fill=(0, 0, 0, 255))
+
+            text = f"WORD{box_num} TEXT"
+            box = [x0, y0, x1, y0, x1, y1, x0, y1]
+            ocr_results.append([box, text, text, round(rng.uniform(0.5, 1.0), 3)])
+        image.save(Path(str(svg_file) + ".png"))
+
+        ocr_file = volume_dir / f"{fanta_page}.{OCR_TYPE}.json"
+        ocr_file.write_text(json.dumps(ocr_results))
+
+        panel_segments_file = volume_dir / f"{fanta_page}.panels.json"
+        panel_segments_file.write_text(json.dumps({"panels": panels}))
+
+        pages.append(SyntheticPage(svg_file, ocr_file, panel_segments_file))
+
+    return pages
+
+
+def _run_fake_server(config: FakeGeminiConfig, base_url_queue: mp.Queue) -> None:
+    # Keep per-request server logging out of the benchmark output.
+    logger.disable("barks_ocr.tools.fake_gemini_server")
+    server = FakeGeminiServer(config)
+    base_url_queue.put(server.base_url)
+    server.serve_forever()
+
+
+@contextmanager
+def _timed_stage(name: str, results: list[StageResult], trace_memory: bool) -> Iterator[None]:
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        secs = time.perf_counter() - start
+        traced_peak_mb = 0.0
+        if trace_memory:
+            traced_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        results.append(StageResult(name, secs, traced_peak_mb))
+        logger.info(f'Stage "{name}" took {secs:.2f}s.')
+
+
+def _call_with_retries[T](func: Callable[[], T], max_attempts: int, retry_secs: float) -> T:
+    from google.genai import errors  # noqa: PLC0415
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return func()
+        except errors.APIError as e:
+            if attempt >= max_attempts:
+                raise
+            logger.warning(f"API call failed with {e.code} (attempt {attempt}) - retrying.")
+            time.sleep(retry_secs)
+
+
+def run_pipeline(
+    pages: list[SyntheticPage], work_dir: Path, poll_secs: float, trace_memory: bool
+) -> list[StageResult]:
+    # Import here so 'GEMINI_BASE_URL' is set before 'gemini_ai' creates its client.
+    from barks_fantagraphics.ocr_file_paths import (  # noqa: PLC0415
+        get_ocr_predicted_groups_filename,
+    )
+
+    from barks_ocr.pipeline.gemini_batch_job import (  # noqa: PLC0415
+        create_batch_job,
+        get_gemini_ai_groups_request,
+    )
+    from barks_ocr.pipeline.gemini_batch_results import (  # noqa: PLC0415
+        get_batch_job_results,
+        write_batch_results,
+    )
+    from barks_ocr.pipeline.gemini_grouper import GeminiAiGrouper  # noqa: PLC0415
+    from barks_ocr.pipeline.gemini_groups import get_ai_predicted_groups  # noqa: PLC0415
+    from barks_ocr.utils.common import ProcessResult  # noqa: PLC0415
+
+    batch_results_dir = work_dir / "batch-results"
+    batch_results_dir.mkdir()
+    prelim_dir = work_dir / "prelim"
+    prelim_dir.mkdir()
+
+    max_attempts = 20
+    stages: list[StageResult] = []
+
+    with _timed_stage("batch requests", stages, trace_memory):
+        gemini_requests_data = []
+        gemini_output_files = []
+        for page in pages:
+            request = get_gemini_ai_groups_request(page.svg_file, page.ocr_file)
+            assert request is not None
+            gemini_requests_data.append(request)
+            gemini_output_files.append(
+                get_ocr_predicted_groups_filename(page.svg_file.stem, OCR_TYPE)
+            )
+
+    with _timed_stage("batch create", stages, trace_memory):
+        batch_job_name = _call_with_retries(
+            lambda: create_batch_job(work_dir / "batch-requests.jsonl", gemini_requests_data),
+            max_attempts,
+            poll_secs,
+        )
+
+    with _timed_stage("batch wait", stages, trace_memory):
+        while True:
+            job_state, file_content = _call_with_retries(
+                lambda: get_batch_job_results(batch_job_name), max_attempts, poll_secs
+            )
+            if file_content is not None:
+                break
+            logger.info(f"Batch job state: {job_state}.")
+            time.sleep(poll_secs)
+
+    with _timed_stage("batch results", stages, trace_memory):
+        num_errors = write_batch_results(file_content, gemini_output_files, batch_results_dir)
+        if num_errors > 0:
+            logger.error(f"There were {num_errors} batch results errors.")
+
+    with _timed_stage("groups", stages, trace_memory):
+        # The per-page path never touches the comics database.
+        grouper = GeminiAiGrouper(None, get_ai_predicted_groups)
+        for page in pages:
+            result = grouper.make_groups_for_page(
+                page.svg_file,
+                page.ocr_file,
+                OCR_TYPE,
+                batch_results_dir,
+                page.panel_segments_file,
+                prelim_dir,
+            )
+            assert result == ProcessResult.SUCCESS
+
+    return stages
+
+
+def _get_peak_rss_mb() -> float:
+    # 'ru_maxrss' is in KB on Linux but bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+def _print_report(stages: list[StageResult], num_pages: int, trace_memory: bool) -> None:
+    total_secs = sum(stage.secs for stage in stages)
+
+    print()
+    print(f"{'Stage':<16} {'Secs':>8} {'%':>6}" + (f" {'Peak MB':>9}" if trace_memory else ""))
+    for stage in stages:
+        line = f"{stage.name:<16} {stage.secs:8.2f} {100.0 * stage.secs / total_secs:6.1f}"
+        if trace_memory:
+            line += f" {stage.traced_peak_mb:9.1f}"
+        print(line)
+    print()
+    print(f"Pages:          {num_pages}")
+    print(f"Total secs:     {total_secs:.2f}")
+    print(f"Pages/minute:   {60.0 * num_pages / total_secs:.1f}")
+    print(f"Peak RSS (MB):  {_get_peak_rss_mb():.1f}")
+
+
+app = typer.Typer()
+
+
+@app.command(help="Benchmark the Gemini batch grouping pipeline against a fake Gemini server")
+def main(  # noqa: PLR0913
+    num_pages: int = typer.Option(DEFAULT_NUM_PAGES, help="Pages in the synthetic volume"),
+    boxes_per_page: int = typer.Option(DEFAULT_BOXES_PER_PAGE, help="OCR boxes per page"),
+    page_width: int = DEFAULT_PAGE_WIDTH,
+    page_height: int = DEFAULT_PAGE_HEIGHT,
+    latency_secs: float = typer.Option(0.0, help="Fake server delay per API call"),
+    error_rate: float = typer.Option(0.0, help="Fraction of fake server API calls failing"),
+    batch_secs_per_request: float = typer.Option(0.0, help="Fake batch job run time per request"),
+    poll_secs: float = typer.Option(0.5, help="Batch job polling interval"),
+    trace_memory: bool = typer.Option(
+        default=False, help="Also report tracemalloc peaks per stage"
+    ),
+    seed: int = 0,
+    log_level_str: LogLevelArg = "WARNING",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "gemini-batch-pipeline-benchmark.log", log_level_str)
+
+    config = FakeGeminiConfig(
+        latency_secs=latency_secs,
+        error_rate=error_rate,
+        batch_secs_per_request=batch_secs_per_request,
+        seed=seed,
+    )
+    ctx = mp.get_context("spawn")
+    base_url_queue = ctx.Queue()
+    server_process = ctx.Process(
+        target=_run_fake_server, args=(config, base_url_queue), daemon=True
+    )
+    server_process.start()
+
+    try:
+        os.environ["GEMINI_BASE_URL"] = base_url_queue.get(timeout=30)
+        os.environ.setdefault("GEMINI_API_KEY", "fake-gemini-key")
+        logger.info(f"Fake Gemini server at {os.environ['GEMINI_BASE_URL']}.")
+
+        with tempfile.TemporaryDirectory(prefix="gemini-batch-bench-") as tmp_dir:
+            work_dir = Path(tmp_dir)
+            logger.info(f"Making synthetic volume of {num_pages} pages...")
+            pages = make_synthetic_volume(
+                work_dir / "volume", num_pages, boxes_per_page, page_width, page_height, seed
+            )
+
+            stages = run_pipeline(pages, work_dir, poll_secs, trace_memory)
+    finally:
+        server_process.terminate()
+        server_process.join()
+
+    _print_report(stages, num_pages, trace_memory)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,209 @@
+# ruff: noqa: T201
+
+"""Micro-benchmark of ``RectArray`` against pairwise ``Rect`` loops on page-sized inputs.
+
+Makes random text-box sized rectangles on a comic page and times every-pair
+containment, overlap and edge distance plus elementwise union/intersection:
+
+    python -m barks_ocr.benchmarks.rect_array --num-boxes 25 --num-boxes 100
+
+Each size also cross-checks the two implementations. ``RectArray.overlaps``
+counts crossing rectangles that ``Rect.overlaps_with`` misses (and that make
+``Rect.distance_to_rect`` fail, so the ``Rect`` distance timing skips those
+pairs), and ``RectArray.distances`` is the exact gap distance, which the
+edge-picking heuristic in ``Rect.distance_to_rect`` can overestimate. Both
+differences are reported rather than treated as errors.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+import typer
+
+from barks_ocr.utils.geometry import Rect
+from barks_ocr.utils.rect_array import RectArray
+
+DEFAULT_NUM_BOXES = [25, 50, 100, 200]
+DEFAULT_PAGE_WIDTH = 2100
+DEFAULT_PAGE_HEIGHT = 2970
+MIN_BOX_WIDTH = 20
+MAX_BOX_WIDTH = 300
+MIN_BOX_HEIGHT = 10
+MAX_BOX_HEIGHT = 120
+
+
+@dataclass
+class OpTiming:
+    num_boxes: int
+    name: str
+    rect_secs: float
+    rect_array_secs: float
+
+
+def make_page_boxes(num_boxes: int, width: int, height: int, seed: int) -> np.ndarray:
+    """Return (num_boxes, 4) integer-valued x, y, w, h boxes inside the page."""
+    rng = np.random.default_rng(seed)
+    w = rng.integers(MIN_BOX_WIDTH, MAX_BOX_WIDTH, num_boxes)
+    h = rng.integers(MIN_BOX_HEIGHT, MAX_BOX_HEIGHT, num_boxes)
+    x = rng.integers(0, width - w)
+    y = rng.integers(0, height - h)
+    return np.column_stack([x, y, w, h]).astype(np.float64)
+
+
+def _time_it(func: Callable[[], object], min_secs: float) -> float:
+    """Best per-call time over enough repeats to run for at least 'min_secs'."""
+    best = float("inf")
+    total = 0.0
+    while total < min_secs:
+        start = time.perf_counter()
+        func()
+        secs = time.perf_counter() - start
+        best = min(best, secs)
+        total += secs
+    return best
+
+
+def _rect_pairwise[T](rects: list[Rect], func: Callable[[Rect, Rect], T]) -> list[list[T]]:
+    return [[func(r1, r2) for r2 in rects] for r1 in rects]
+
+
+def _rect_union(r1: Rect, r2: Rect) -> Rect:
+    x0 = min(r1.l_top.x, r2.l_top.x)
+    y0 = min(r1.l_top.y, r2.l_top.y)
+    return Rect(x0, y0, max(r1.r_bot.x, r2.r_bot.x) - x0, max(r1.r_bot.y, r2.r_bot.y) - y0)
+
+
+def _rect_intersection(r1: Rect, r2: Rect) -> Rect | None:
+    x0 = max(r1.l_top.x, r2.l_top.x)
+    y0 = max(r1.l_top.y, r2.l_top.y)
+    x1 = min(r1.r_bot.x, r2.r_bot.x)
+    y1 = min(r1.r_bot.y, r2.r_bot.y)
+    return Rect(x0, y0, x1 - x0, y1 - y0) if x1 > x0 and y1 > y0 else None
+
+
+def _check_agreement(
+    rects: list[Rect], rect_array: RectArray
+) -> tuple[list[tuple[Rect, Rect]], int, float]:
+    """Return (non-crossing pairs, distance differences, max distance difference)."""
+    contains = rect_array.contains(rect_array)
+    overlaps = rect_array.overlaps(rect_array)
+    distances = rect_array.distances(rect_array)
+
+    non_crossing_pairs = []
+    num_distance_diffs = 0
+    max_distance_diff = 0.0
+    for i, r1 in enumerate(rects):
+        for j, r2 in enumerate(rects):
+            assert r1.is_rect_inside_rect(r2) == contains[i, j], (i, j)
+
+            rect_overlaps = r1.overlaps_with(r2)
+            assert overlaps[i, j] or not rect_overlaps, (i, j)
+            if overlaps[i, j] != rect_overlaps:
+                continue
+            non_crossing_pairs.append((r1, r2))
+
+            distance_diff = r1.distance_to_rect(r2) - distances[i, j]
+            assert distance_diff > -1e-6, (i, j)  # noqa: PLR2004
+            if distance_diff > 1e-6:  # noqa: PLR2004
+                num_distance_diffs += 1
+                max_distance_diff = max(max_distance_diff, distance_diff)
+
+    return non_crossing_pairs, num_distance_diffs, max_distance_diff
+
+
+def run_benchmark(
+    num_boxes: int, width: int, height: int, seed: int, min_secs: float
+) -> list[OpTiming]:
+    boxes = make_page_boxes(num_boxes, width, height, seed)
+    # Pair each box with the next one for the elementwise ops.
+    other_boxes = np.roll(boxes, 1, axis=0)
+
+    rects = [Rect(*box) for box in boxes.tolist()]
+    other_rects = [Rect(*box) for box in other_boxes.tolist()]
+    rect_array = RectArray.from_xywh(boxes)
+    other_rect_array = RectArray.from_xywh(other_boxes)
+
+    non_crossing_pairs, num_distance_diffs, max_distance_diff = _check_agreement(rects, rect_array)
+    print(
+        f"{num_boxes} boxes: {num_boxes * num_boxes - len(non_crossing_pairs)} crossing overlaps,"
+        f" {num_distance_diffs} distances shorter than Rect's"
+        f" (max by {max_distance_diff:.2f} px)."
+    )
+
+    ops: list[tuple[str, Callable[[], object], Callable[[], object]]] = [
+        (
+            "contains",
+            lambda: _rect_pairwise(rects, Rect.is_rect_inside_rect),
+            lambda: rect_array.contains(rect_array),
+        ),
+        (
+            "overlaps",
+            lambda: _rect_pairwise(rects, Rect.overlaps_with),
+            lambda: rect_array.overlaps(rect_array),
+        ),
+        (
+            "distances",
+            lambda: [r1.distance_to_rect(r2) for r1, r2 in non_crossing_pairs],
+            lambda: rect_array.distances(rect_array),
+        ),
+        (
+            "union",
+            lambda: [_rect_union(r1, r2) for r1, r2 in zip(rects, other_rects, strict=True)],
+            lambda: rect_array.union(other_rect_array),
+        ),
+        (
+            "intersection",
+            lambda: [_rect_intersection(r1, r2) for r1, r2 in zip(rects, other_rects, strict=True)],
+            lambda: rect_array.intersection(other_rect_array),
+        ),
+        (
+            "build",
+            lambda: [Rect(*box) for box in boxes.tolist()],
+            lambda: RectArray.from_xywh(boxes),
+        ),
+    ]
+
+    return [
+        OpTiming(
+            num_boxes, name, _time_it(rect_func, min_secs), _time_it(rect_array_func, min_secs)
+        )
+        for name, rect_func, rect_array_func in ops
+    ]
+
+
+def _print_report(timings: list[OpTiming]) -> None:
+    print()
+    print(f"{'Boxes':>6} {'Op':<13} {'Rect ms':>10} {'RectArray ms':>13} {'Speed-up':>9}")
+    for timing in timings:
+        print(
+            f"{timing.num_boxes:6d} {timing.name:<13}"
+            f" {1000.0 * timing.rect_secs:10.3f}"
+            f" {1000.0 * timing.rect_array_secs:13.3f}"
+            f" {timing.rect_secs / timing.rect_array_secs:8.1f}x"
+        )
+
+
+app = typer.Typer()
+
+
+@app.command(help="Benchmark RectArray against pairwise Rect loops on page-sized inputs")
+def main(
+    num_boxes: list[int] = typer.Option(  # noqa: B008
+        DEFAULT_NUM_BOXES, help="Boxes per page (repeat for several sizes)"
+    ),
+    page_width: int = DEFAULT_PAGE_WIDTH,
+    page_height: int = DEFAULT_PAGE_HEIGHT,
+    min_secs: float = typer.Option(0.2, help="Minimum time spent timing each op"),
+    seed: int = 0,
+) -> None:
+    timings: list[OpTiming] = []
+    for n in num_boxes:
+        timings.extend(run_benchmark(n, page_width, page_height, seed, min_secs))
+
+    _print_report(timings)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,275 @@
+# ruff: noqa: T201
+
+"""Search latency, index open time and index size of a Whoosh volumes index.
+
+Builds an index of the given volumes into a scratch directory (or uses an
+existing one with '--index-dir'), then replays a query mix sampled from the
+index itself - single words, two-word phrases from indexed speech, entity
+names through ``find_entities`` and hyphenated terms:
+
+    python -m barks_ocr.benchmarks.search_latency --volumes 5-7 --save-baseline
+    python -m barks_ocr.benchmarks.search_latency --volumes 5-7
+
+Reports p50/p95 latency per query kind, the index open time and its size on
+disk. With a saved baseline, every metric is compared to it and the run fails
+if any is more than '--max-regression' worse, so an index schema or analyzer
+change that slows searches down shows up. The queries only depend on the index
+contents and '--seed', so runs on the same volumes replay the same queries.
+"""
+
+import json
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import typer
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.speech_groupers import OCR_TYPE_DICT
+from barks_fantagraphics.whoosh_search_engine import ENTITY_TYPES, SearchEngine
+from comic_utils.common_typer_options import LogLevelArg, VolumesArg
+from intspan import intspan
+from whoosh import index
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.pipeline.whoosh_parallel import build_index_parallel
+from barks_ocr.pipeline.whoosh_term_stats import CONTENT_FIELD, IndexTermStats
+from barks_ocr.tools.whoosh_find_server import run_search
+from barks_ocr.utils.index_paths import get_volumes_index_dir
+
+APP_LOGGING_NAME = "bsea"
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE_FILE = Path.home() / ".cache" / "barks-ocr" / "search-latency-baseline.json"
+DEFAULT_QUERIES_PER_KIND = 200
+DEFAULT_REPEATS = 3
+DEFAULT_OPEN_REPEATS = 5
+DEFAULT_MAX_REGRESSION = 0.25
+MIN_WORD_LEN = 3
+
+QUERY_KINDS = ("word", "phrase", "entity", "hyphenated")
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    queries_per_kind: int
+    repeats: int
+    open_repeats: int
+    baseline_file: Path
+    save_baseline: bool
+    max_regression: float
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    kind: str
+    words: str
+    entity_type: str | None = None
+
+
+def _sample_queries(index_dir: Path, num_per_kind: int, seed: int) -> list[SearchQuery]:
+    rng = random.Random(seed)  # noqa: S311
+    term_stats = IndexTermStats(index_dir)
+    ix = index.open_dir(index_dir)
+    content_type = ix.schema[CONTENT_FIELD]
+
+    def sample(items: list, k: int = num_per_kind) -> list:
+        return rng.sample(items, min(k, len(items)))
+
+    terms = sorted(term_stats.doc_freqs)
+    words = [t for t in terms if t.isalpha() and len(t) >= MIN_WORD_LEN]
+    hyphenated = [t for t in terms if "-" in t.strip("-")]
+
+    queries = [SearchQuery("word", w) for w in sample(words)]
+    queries.extend(SearchQuery("hyphenated", t) for t in sample(hyphenated))
+
+    with ix.reader() as reader:
+        for doc_num in sample(sorted(reader.all_doc_ids())):
+            doc_terms = list(
+                content_type.process_text(reader.stored_fields(doc_num)[CONTENT_FIELD])
+            )
+            if len(doc_terms) > 1:
+                i = rng.randrange(len(doc_terms) - 1)
+                queries.append(SearchQuery("phrase", f'"{doc_terms[i]} {doc_terms[i + 1]}"'))
+
+        entity_types = [t for t in ENTITY_TYPES if t in ix.schema]
+        for entity_type in entity_types:
+            names = sorted(
+                ix.schema[entity_type].from_bytes(b) for b in reader.lexicon(entity_type)
+            )
+            queries.extend(
+                SearchQuery("entity", name, entity_type)
+                for name in sample(names, num_per_kind // len(entity_types) + 1)
+            )
+
+    return queries
+
+
+def _time_it(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _get_index_size(index_dir: Path) -> int:
+    return sum(f.stat().st_size for f in index_dir.iterdir() if f.is_file())
+
+
+def _get_percentile_ms(secs: list[float], percent: int) -> float:
+    if len(secs) == 1:
+        return 1000 * secs[0]
+    return 1000 * statistics.quantiles(secs, n=100)[percent - 1]
+
+
+def measure(
+    index_dir: Path, queries: list[SearchQuery], repeats: int, open_repeats: int
+) -> dict[str, float]:
+    """Return the metrics of searching the index in 'index_dir' with 'queries'."""
+    metrics: dict[str, float] = {
+        "open_ms": 1000
+        * statistics.median(_time_it(lambda: SearchEngine(index_dir)) for _ in range(open_repeats)),
+        "size_mb": _get_index_size(index_dir) / (1024 * 1024),
+    }
+
+    search_engine = SearchEngine(index_dir)
+    for kind in QUERY_KINDS:
+        kind_queries = [q for q in queries if q.kind == kind]
+        if not kind_queries:
+            continue
+        latencies = [
+            _time_it(lambda q=q: run_search(search_engine, q.entity_type, q.words))
+            for _ in range(repeats)
+            for q in kind_queries
+        ]
+        metrics[f"{kind}_p50_ms"] = _get_percentile_ms(latencies, 50)
+        metrics[f"{kind}_p95_ms"] = _get_percentile_ms(latencies, 95)
+
+    return metrics
+
+
+def _print_metrics(
+    metrics: dict[str, float], baseline: dict[str, float] | None, max_regression: float
+) -> list[str]:
+    """Print the metrics against the baseline and return the names of those that regressed."""
+    regressed = []
+
+    print()
+    print(f"{'Metric':<16} {'Value':>10} {'Baseline':>10} {'Change':>8}")
+    for name, value in metrics.items():
+        if baseline is None or name not in baseline:
+            print(f"{name:<16} {value:10.3f}")
+            continue
+
+        base_value = baseline[name]
+        change = (value - base_value) / base_value if base_value else 0.0
+        flag = ""
+        if change > max_regression:
+            flag = "  REGRESSED"
+            regressed.append(name)
+        print(f"{name:<16} {value:10.3f} {base_value:10.3f} {100 * change:7.1f}%{flag}")
+
+    return regressed
+
+
+def _load_baseline(baseline_file: Path, volumes: list[int], seed: int) -> dict[str, float] | None:
+    if not baseline_file.is_file():
+        print(f'No baseline "{baseline_file}" to compare with.')
+        return None
+
+    baseline = json.loads(baseline_file.read_text())
+    if baseline.get("version") != BASELINE_VERSION:
+        print(f'Ignoring old baseline "{baseline_file}".')
+        return None
+    if baseline["volumes"] != volumes or baseline["seed"] != seed:
+        print(
+            f"WARNING: The baseline is for volumes {baseline['volumes']}, seed {baseline['seed']}"
+            " - the queries differ."
+        )
+    return baseline["metrics"]
+
+
+def _save_baseline(
+    baseline_file: Path, volumes: list[int], seed: int, metrics: dict[str, float]
+) -> None:
+    baseline = {"version": BASELINE_VERSION, "volumes": volumes, "seed": seed, "metrics": metrics}
+    baseline_file.parent.mkdir(parents=True, exist_ok=True)
+    baseline_file.write_text(json.dumps(baseline, indent=4) + "\n")
+    print(f'\nSaved baseline "{baseline_file}".')
+
+
+def _run(index_dir: Path, volumes: list[int], seed: int, options: RunOptions) -> list[str]:
+    queries = _sample_queries(index_dir, options.queries_per_kind, seed)
+    counts = ", ".join(f"{sum(q.kind == k for q in queries)} {k}" for k in QUERY_KINDS)
+    print(f"Replaying {len(queries)} queries ({counts}) x {options.repeats}.")
+
+    metrics = measure(index_dir, queries, options.repeats, options.open_repeats)
+    baseline = _load_baseline(options.baseline_file, volumes, seed)
+    regressed = _print_metrics(metrics, baseline, options.max_regression)
+
+    if options.save_baseline:
+        _save_baseline(options.baseline_file, volumes, seed, metrics)
+    return regressed
+
+
+app = typer.Typer()
+
+
+@app.command(help="Benchmark Whoosh index search latency, open time and size")
+def main(  # noqa: PLR0913
+    volumes_str: VolumesArg = "",
+    ocr_index: int = 1,
+    index_dir: Path | None = typer.Option(  # noqa: B008
+        None, help="Benchmark this index instead of building one of the volumes"
+    ),
+    queries_per_kind: int = DEFAULT_QUERIES_PER_KIND,
+    repeats: int = typer.Option(DEFAULT_REPEATS, help="Times each query is run"),
+    open_repeats: int = DEFAULT_OPEN_REPEATS,
+    seed: int = 0,
+    baseline_file: Path = typer.Option(DEFAULT_BASELINE_FILE, "--baseline"),  # noqa: B008
+    save_baseline: bool = typer.Option(default=False, help="Save this run as the baseline"),
+    max_regression: float = typer.Option(
+        DEFAULT_MAX_REGRESSION, help="Fail if a metric is this fraction worse than the baseline"
+    ),
+    workers: int = typer.Option(1, help="Processes for building the index"),
+    log_level_str: LogLevelArg = "WARNING",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "search-latency-benchmark.log", log_level_str)
+
+    volumes = list(intspan(volumes_str))
+    options = RunOptions(
+        queries_per_kind, repeats, open_repeats, baseline_file, save_baseline, max_regression
+    )
+
+    if index_dir is not None:
+        regressed = _run(index_dir, volumes, seed, options)
+    else:
+        if not volumes:
+            msg = "At least one volume is needed to build an index."
+            raise typer.BadParameter(msg)
+
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            scratch_index_dir = Path(scratch_dir) / "index"
+            print(f"Building an index of volumes {volumes}...")
+            secs = _time_it(
+                lambda: build_index_parallel(
+                    ComicsDatabase(),
+                    dict.fromkeys(volumes, 1),
+                    OCR_TYPE_DICT[ocr_index],
+                    scratch_index_dir,
+                    get_volumes_index_dir(ocr_index),
+                    workers,
+                )
+            )
+            print(f"Built in {secs:.1f}s.")
+            regressed = _run(scratch_index_dir, volumes, seed, options)
+
+    if regressed:
+        print(f"ERROR: Regressed by more than {100 * max_regression:.0f}%: {', '.join(regressed)}.")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,110 @@
+# ruff: noqa: T201
+
+"""Speed-up curve of the parallel Whoosh index build against the number of workers.
+
+Does a full build of the given volumes into a scratch directory once per worker
+count, using the real speech groups and entity files:
+
+    python -m barks_ocr.benchmarks.whoosh_build --volumes 1-27 -w 1 -w 2 -w 4 -w 8
+
+Reports the build time, speed-up and parallel efficiency against the first
+worker count, and checks that every build has the same documents.
+"""
+
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import typer
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.speech_groupers import OCR_TYPE_DICT
+from comic_utils.common_typer_options import LogLevelArg, VolumesArg
+from intspan import intspan
+from whoosh import index
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.pipeline.entity_store import get_merged_entity_provider
+from barks_ocr.pipeline.whoosh_incremental import get_page_hashes
+from barks_ocr.pipeline.whoosh_parallel import build_index_parallel, partition_volumes
+from barks_ocr.utils.index_paths import get_volumes_index_dir
+
+APP_LOGGING_NAME = "bwho"
+
+DEFAULT_WORKERS = [1, 2, 4, 8]
+
+
+@dataclass
+class BuildTiming:
+    workers: int
+    num_parts: int
+    secs: float
+    doc_count: int
+
+
+def _print_report(timings: list[BuildTiming]) -> None:
+    base_secs = timings[0].secs * timings[0].num_parts
+
+    print()
+    print(f"{'Workers':>7} {'Parts':>5} {'Secs':>8} {'Speed-up':>9} {'Efficiency':>10}")
+    for timing in timings:
+        speed_up = timings[0].secs / timing.secs
+        efficiency = base_secs / (timing.secs * timing.num_parts)
+        print(
+            f"{timing.workers:7d} {timing.num_parts:5d} {timing.secs:8.2f}"
+            f" {speed_up:8.2f}x {100.0 * efficiency:9.0f}%"
+        )
+
+
+app = typer.Typer()
+
+
+@app.command(help="Benchmark the parallel Whoosh index build against worker count")
+def main(
+    volumes_str: VolumesArg = "",
+    ocr_index: int = 1,
+    workers: list[int] = typer.Option(  # noqa: B008
+        DEFAULT_WORKERS, "--workers", "-w", help="Worker counts to time (repeat for several)"
+    ),
+    log_level_str: LogLevelArg = "WARNING",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "whoosh-build-benchmark.log", log_level_str)
+
+    volumes = list(intspan(volumes_str))
+    if not volumes:
+        msg = "At least one volume is needed."
+        raise typer.BadParameter(msg)
+
+    comics_database = ComicsDatabase()
+    ocr_type = OCR_TYPE_DICT[ocr_index]
+    entities_dir = get_volumes_index_dir(ocr_index)
+
+    entity_provider = get_merged_entity_provider(entities_dir, volumes)
+    page_hashes = get_page_hashes(comics_database, volumes, ocr_type, entity_provider)
+    volume_weights = {volume: len(page_hashes[volume]) for volume in volumes}
+    print(f"Indexing {sum(volume_weights.values())} pages from {len(volumes)} volumes.")
+
+    timings: list[BuildTiming] = []
+    for num_workers in workers:
+        num_parts = len(partition_volumes(volume_weights, num_workers))
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            index_dir = Path(scratch_dir) / "index"
+            start = time.perf_counter()
+            build_index_parallel(
+                comics_database, volume_weights, ocr_type, index_dir, entities_dir, num_workers
+            )
+            secs = time.perf_counter() - start
+            doc_count = index.open_dir(index_dir).doc_count()
+
+        print(f"{num_workers} workers: {secs:.2f}s, {doc_count} documents.")
+        timings.append(BuildTiming(num_workers, num_parts, secs, doc_count))
+
+    if len({t.doc_count for t in timings}) != 1:
+        print("ERROR: The builds have different document counts.")
+        raise typer.Exit(code=1)
+
+    _print_report(timings)
+
+
+if __name__ == "__main__":
+    app()
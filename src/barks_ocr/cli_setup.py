@@ -9,10 +9,19 @@ import barks_ocr.log_setup as _log_setup
 
 _LOG_CONFIG = Path(__file__).parent / "resources" / "log-config.yaml"
 
+_logging_args = (_log_setup.APP_LOGGING_NAME, _log_setup.log_filename, _log_setup.log_level)
+
 
 def init_logging(app_logging_name: str, log_filename: str, log_level_str: str) -> None:
     """Configure loguru logging for this project's CLI entry points."""
+    global _logging_args  # noqa: PLW0603
+    _logging_args = (app_logging_name, log_filename, log_level_str)
     _init_logging(_log_setup, _LOG_CONFIG, app_logging_name, log_filename, log_level_str)
 
 
-__all__ = ["get_comic_titles", "init_logging"]
+def get_logging_args() -> tuple[str, str, str]:
+    """Return the ``init_logging`` arguments in effect, to log the same way in a spawned worker."""
+    return _logging_args
+
+
+__all__ = ["get_comic_titles", "get_logging_args", "init_logging"]
@@ -1,7 +1,8 @@
 import json
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from datetime import UTC, datetime
 from pathlib import Path
+from types import MappingProxyType
 
 from barks_fantagraphics.entity_types import EntityType
 
@@ -66,23 +67,40 @@ def merge_entities(auto: dict[str, set[str]], corrections: dict) -> dict[str, se
     return _apply_corrections(auto, corrections)
 
 
-def get_merged_entity_provider(
-    entities_dir: Path, volumes: list[int]
-) -> Callable[[str, str, str], dict[str, set[str]]]:
-    cache: dict[int, tuple[dict, dict]] = {}
+type FrozenEntities = Mapping[str, frozenset[str]]
+type EntityProvider = Callable[[str, str, str], FrozenEntities]
+
+_NO_ENTITIES: FrozenEntities = MappingProxyType({t: frozenset() for t in EntityType})
+
+
+def _freeze_entities(entities: dict[str, set[str]]) -> FrozenEntities:
+    return MappingProxyType({k: frozenset(v) for k, v in entities.items()})
+
+
+def get_merged_entity_provider(entities_dir: Path, volumes: list[int]) -> EntityProvider:
+    """Return a lookup of the corrected entities of each (title, fanta_page, group_id).
+
+    All the volumes' entities are merged with their corrections up front into one
+    table of read-only entities, so lookups are a single dict get. If a group is in
+    more than one volume, the first of 'volumes' with entities for it wins.
+    """
+    merged: dict[tuple[str, str, str], FrozenEntities] = {}
     for vol in volumes:
-        cache[vol] = (load_auto_entities(entities_dir, vol), load_corrections(entities_dir, vol))
-
-    def provider(title: str, fanta_page: str, group_id: str) -> dict[str, set[str]]:
-        for auto_groups, corrections in cache.values():
-            title_groups = auto_groups.get(title, {})
-            page_groups = title_groups.get(fanta_page, {})
-            group_entities = page_groups.get(group_id, {})
-            if group_entities:
-                group_corrections = corrections.get(title, {}).get(fanta_page, {}).get(group_id, {})
-                auto_sets = {k: set(v) for k, v in group_entities.items()}
-                return merge_entities(auto_sets, group_corrections)
-
-        return {t: set() for t in EntityType}
+        auto_groups = load_auto_entities(entities_dir, vol)
+        corrections = load_corrections(entities_dir, vol)
+        for title, title_groups in auto_groups.items():
+            for fanta_page, page_groups in title_groups.items():
+                for group_id, group_entities in page_groups.items():
+                    key = (title, fanta_page, group_id)
+                    if not group_entities or key in merged:
+                        continue
+                    group_corrections = (
+                        corrections.get(title, {}).get(fanta_page, {}).get(group_id, {})
+                    )
+                    auto_sets = {k: set(v) for k, v in group_entities.items()}
+                    merged[key] = _freeze_entities(merge_entities(auto_sets, group_corrections))
+
+    def provider(title: str, fanta_page: str, group_id: str) -> FrozenEntities:
+        return merged.get((title, fanta_page, group_id), _NO_ENTITIES)
 
     return provider
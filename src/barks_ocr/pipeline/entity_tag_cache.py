@@ -0,0 +1,102 @@
+"""A persistent cache of entity tagging results keyed by normalized text.
+
+Tagging results only depend on the normalized text (see ``normalize_text``),
+the tagger and the curated entity maps, so results are cached by a hash of
+the normalized text, and the whole cache is dropped when the tagger
+fingerprint (tagger version, spaCy and model versions, curated maps) changes.
+The spaCy model is only loaded if there is something that isn't in the cache.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from barks_fantagraphics.entity_types import EntityType
+from loguru import logger
+
+from barks_ocr.pipeline.entity_tagger import (
+    DEFAULT_TAG_BATCH_SIZE,
+    EntityDict,
+    EntityTagger,
+    get_tagger_fingerprint,
+    normalize_text,
+)
+
+TAG_CACHE_VERSION = 1
+DEFAULT_TAG_CACHE_FILE = Path.home() / ".cache" / "barks-ocr" / "entity-tag-cache.json"
+
+
+class CachedEntityTagger:
+    """``EntityTagger.tag_many`` backed by a cache of earlier results."""
+
+    def __init__(
+        self,
+        cache_file: Path,
+        batch_size: int = DEFAULT_TAG_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> None:
+        self._cache_file = cache_file
+        self._batch_size = batch_size
+        self._n_process = n_process
+        self._fingerprint = get_tagger_fingerprint()
+        self._entries: dict[str, dict[str, list[str]]] = {}
+        self._tagger: EntityTagger | None = None
+        self._changed = False
+        self.num_hits = 0
+        self.num_misses = 0
+
+        if cache_file.is_file():
+            cache = json.loads(cache_file.read_text())
+            if cache.get("version") != TAG_CACHE_VERSION:
+                logger.warning(f'Ignoring old entity tag cache "{cache_file}".')
+            elif cache.get("fingerprint") != self._fingerprint:
+                logger.info("The entity tagger or curated entities changed - retagging everything.")
+            else:
+                self._entries = cache["entries"]
+
+    def tag_many(self, texts: list[str]) -> list[EntityDict]:
+        """Return the entities of each text, only tagging texts not tagged before."""
+        keys = [_get_text_key(text) for text in texts]
+
+        to_tag = {
+            key: text for key, text in zip(keys, texts, strict=True) if key not in self._entries
+        }
+        self.num_misses += len(to_tag)
+        self.num_hits += len(texts) - len(to_tag)
+
+        if to_tag:
+            if self._tagger is None:
+                self._tagger = EntityTagger()
+            all_entities = self._tagger.tag_many(to_tag.values(), self._batch_size, self._n_process)
+            for key, entities in zip(to_tag, all_entities, strict=True):
+                self._entries[key] = {t.value: sorted(v) for t, v in entities.items() if v}
+            self._changed = True
+
+        return [_get_entity_dict(self._entries[key]) for key in keys]
+
+    def get_hit_rate_str(self) -> str:
+        num_lookups = self.num_hits + self.num_misses
+        hit_rate = 100.0 * self.num_hits / num_lookups if num_lookups else 0.0
+        return f"{self.num_hits} of {num_lookups} groups from the tag cache ({hit_rate:.1f}%)"
+
+    def save(self) -> None:
+        if not self._changed:
+            return
+        cache = {
+            "version": TAG_CACHE_VERSION,
+            "fingerprint": self._fingerprint,
+            "entries": self._entries,
+        }
+        self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self._cache_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(cache))
+        temp_file.replace(self._cache_file)
+        self._changed = False
+
+
+def _get_text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+def _get_entity_dict(entry: dict[str, list[str]]) -> EntityDict:
+    return {t: set(entry.get(t.value, ())) for t in EntityType}
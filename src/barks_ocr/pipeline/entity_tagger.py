@@ -1,7 +1,9 @@
+import hashlib
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 
 import spacy.tokens
+import spacy.util
 from barks_fantagraphics.entity_types import EntityType
 from barks_fantagraphics.whoosh_barks_terms import (
     BARKSIAN_ENTITY_TYPE_MAP,
@@ -9,6 +11,8 @@ from barks_fantagraphics.whoosh_barks_terms import (
     CONTEXT_SENSITIVE_WORDS,
 )
 
+from barks_ocr.utils.multi_pattern_matcher import MultiPatternMatcher, PatternMatch
+
 # spaCy label → our entity category
 SPACY_LABEL_MAP: dict[str, EntityType] = {
     "PERSON": EntityType.PERSON,
@@ -24,6 +28,18 @@ SPACY_LABEL_MAP: dict[str, EntityType] = {
     "LANGUAGE": EntityType.MISC,
 }
 
+SPACY_MODEL = "en_core_web_sm"
+# Bump when a tagging change gives different entities for the same text.
+TAGGER_VERSION = 2
+
+# Tagging only needs the tokens and the NER's 'doc.ents', so the other pipeline
+# components are disabled unless the NER depends on them. The NER won't make an
+# entity across a sentence start, so the sentence boundaries ('parser' or
+# 'senter') have to be set before it, as in the full pipeline.
+NER_PIPE = "ner"
+SENTENCE_PIPES = ("parser", "senter")
+DEFAULT_TAG_BATCH_SIZE = 256
+
 type EntityDict = dict[EntityType, set[str]]
 type EntityTaggerFn = Callable[[str], EntityDict]
 type _CompiledContextRule = tuple[re.Pattern[str], EntityType, str]
@@ -34,9 +50,36 @@ def _build_lower_map(mapping: dict[str, str]) -> dict[str, str]:
     return {k.lower(): v for k, v in mapping.items()}
 
 
+def normalize_text(text: str) -> str:
+    """Return the text as tagged - the entities depend on nothing else in 'text'."""
+    # Run spaCy on lowercased text — ALL-CAPS input causes the tagger to
+    # label almost every token as PROPN (NNP), producing noisy NER results.
+    return text.lower().replace("\n", " ")
+
+
+def get_tagger_fingerprint() -> str:
+    """Return a hash of everything other than the text that tagging results depend on."""
+    curated_terms = sorted(
+        (sorted(term_set), str(entity_type))
+        for term_set, entity_type in BARKSIAN_ENTITY_TYPE_MAP.items()
+    )
+    fingerprint_parts = [
+        str(TAGGER_VERSION),
+        spacy.__version__,
+        spacy.util.get_package_version(SPACY_MODEL) or "",
+        repr(curated_terms),
+        repr(sorted(CAPITALIZATION_MAP.items())),
+        repr(sorted(CONTEXT_SENSITIVE_WORDS.items())),
+    ]
+    return hashlib.sha256("\n".join(fingerprint_parts).encode()).hexdigest()
+
+
 class EntityTagger:
-    def __init__(self) -> None:
-        self._nlp = spacy.load("en_core_web_sm")
+    def __init__(self, trim_pipeline: bool = True) -> None:
+        self._nlp = spacy.load(SPACY_MODEL)
+        if trim_pipeline:
+            for pipe_name in self._get_unused_pipe_names():
+                self._nlp.disable_pipe(pipe_name)
 
         self._single_word_entities: dict[str, EntityType] = {}  # lowercase → entity_type
         self._multi_word_entities: dict[str, EntityType] = {}  # lowercase → entity_type
@@ -59,37 +102,71 @@ class EntityTagger:
             for word, (fallback_type, fallback_canonical, rules) in CONTEXT_SENSITIVE_WORDS.items()
         }
 
+        # One pass over the text finds every curated multi-word name and context-sensitive word.
+        self._curated_matcher = MultiPatternMatcher(
+            [*self._multi_word_entities, *self._context_sensitive]
+        )
+
+    def _get_unused_pipe_names(self) -> list[str]:
+        """Return the pipeline components the NER and the sentence boundaries don't depend on."""
+        needed = {
+            pipe_name
+            for pipe_name in self._nlp.pipe_names
+            if pipe_name == NER_PIPE or pipe_name in SENTENCE_PIPES
+        }
+        unused = []
+        for pipe_name, pipe in self._nlp.pipeline:
+            if pipe_name in needed:
+                continue
+            # A shared 'tok2vec' is needed if a needed component listens to it.
+            if needed & set(getattr(pipe, "listening_components", [])):
+                continue
+            unused.append(pipe_name)
+        return unused
+
     def tag(self, text: str) -> EntityDict:
+        text_lower = normalize_text(text)
+        return self._tag_doc(text_lower, self._nlp(text_lower))
+
+    def tag_many(
+        self,
+        texts: Iterable[str],
+        batch_size: int = DEFAULT_TAG_BATCH_SIZE,
+        n_process: int = 1,
+    ) -> Iterator[EntityDict]:
+        """Tag 'texts' in spaCy batches, yielding the same result as 'tag' for each text."""
+        docs = self._nlp.pipe(
+            (normalize_text(text) for text in texts), batch_size=batch_size, n_process=n_process
+        )
+        for doc in docs:
+            yield self._tag_doc(doc.text, doc)
+
+    def _tag_doc(self, text_lower: str, doc: spacy.tokens.Doc) -> EntityDict:
         result: EntityDict = {t: set() for t in EntityType}
-        text_lower = text.lower().replace("\n", " ")
-        # Run spaCy on lowercased text — ALL-CAPS input causes the tagger to
-        # label almost every token as PROPN (NNP), producing noisy NER results.
-        doc = self._nlp(text_lower)
 
-        self._match_curated_full_names(text_lower, result)
-        curated_spans = self._find_curated_spans(text_lower)
+        curated_matches = self._curated_matcher.find_all(text_lower)
+        self._match_curated_full_names(curated_matches, result)
+        curated_spans = self._find_curated_spans(curated_matches)
         self._match_spacy_entities(doc, curated_spans, result)
         self._match_curated_tokens(doc, result)
-        self._match_context_sensitive(text_lower, result)
+        self._match_context_sensitive(text_lower, curated_matches, result)
 
         return result
 
-    def _match_curated_full_names(self, text_lower: str, result: EntityDict) -> None:
-        for name, category in self._multi_word_entities.items():
-            if name in text_lower:
+    def _match_curated_full_names(
+        self, curated_matches: list[PatternMatch], result: EntityDict
+    ) -> None:
+        for _, _, name in curated_matches:
+            category = self._multi_word_entities.get(name)
+            if category is not None:
                 result[category].add(name.title() if category != EntityType.WORK else name)
 
-    def _find_curated_spans(self, text_lower: str) -> set[tuple[int, int]]:
-        spans: set[tuple[int, int]] = set()
-        for name in self._multi_word_entities:
-            start = 0
-            while True:
-                idx = text_lower.find(name, start)
-                if idx == -1:
-                    break
-                spans.add((idx, idx + len(name)))
-                start = idx + 1
-        return spans
+    def _find_curated_spans(self, curated_matches: list[PatternMatch]) -> set[tuple[int, int]]:
+        return {
+            (start, end)
+            for start, end, name in curated_matches
+            if name in self._multi_word_entities
+        }
 
     def _match_spacy_entities(
         self,
@@ -122,10 +199,12 @@ class EntityTagger:
                 if cat:
                     result[cat].add(canonical)
 
-    def _match_context_sensitive(self, text_lower: str, result: EntityDict) -> None:
-        for word, (fallback_type, fallback_canonical, rules) in self._context_sensitive.items():
-            if word not in text_lower:
-                continue
+    def _match_context_sensitive(
+        self, text_lower: str, curated_matches: list[PatternMatch], result: EntityDict
+    ) -> None:
+        found_words = {name for _, _, name in curated_matches if name in self._context_sensitive}
+        for word in found_words:
+            fallback_type, fallback_canonical, rules = self._context_sensitive[word]
 
             # Apply specific patterns first, recording which word positions they cover
             specific_positions: set[int] = set()
@@ -1,4 +1,19 @@
+"""Promote the 'use_as_final' prelim groups of each page to its final groups file.
+
+Each title keeps an index (one json file per title in the index directory)
+of every page's prelim file stats and content hashes, which prelim file was
+'use_as_final' and the stat of the final file written from it. A page whose
+prelim and final files haven't changed since the last run is skipped without
+reading anything; a page whose prelim files were touched but not changed is
+only hashed. Final files are only rewritten when their contents would change.
+"""
+
+import hashlib
 import json
+import multiprocessing as mp
+from os import stat_result
+from pathlib import Path
+from typing import Any
 
 import typer
 from barks_fantagraphics.comic_book_info import is_non_comic_title
@@ -8,43 +23,249 @@ from barks_fantagraphics.ocr_json_files import JsonFiles
 from comic_utils.common_typer_options import LogLevelArg, TitleArg, VolumesArg
 from loguru import logger
 
-from barks_ocr.cli_setup import get_comic_titles, init_logging
+from barks_ocr.cli_setup import get_comic_titles, get_logging_args, init_logging
+from barks_ocr.utils.common import ProcessResult
 
 APP_LOGGING_NAME = "gemf"
 
+FINAL_INDEX_VERSION = 1
+DEFAULT_FINAL_INDEX_DIR = Path.home() / ".cache" / "barks-ocr" / "final-groups-index"
+
+TitleResults = dict[ProcessResult, int]
+
+_WORKER_DB: ComicsDatabase | None = None
+
+
+class FinalGroupsIndex:
+    """A title's per-page record of prelim file hashes and 'use_as_final' choice."""
+
+    def __init__(self, index_file: Path) -> None:
+        self._index_file = index_file
+        self._pages: dict[str, dict[str, Any]] = {}
+        self._changed = False
+
+        if index_file.is_file():
+            index = json.loads(index_file.read_text())
+            if index.get("version") == FINAL_INDEX_VERSION:
+                self._pages = index["pages"]
+            else:
+                logger.warning(f'Ignoring old final groups index "{index_file}".')
+
+    def save(self) -> None:
+        if not self._changed:
+            return
+        self._index_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self._index_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps({"version": FINAL_INDEX_VERSION, "pages": self._pages}))
+        temp_file.replace(self._index_file)
+
+    def update_page(
+        self,
+        page: str,
+        prelim_files: tuple[Path, Path],
+        final_files: tuple[Path, Path],
+        page_desc: str,
+    ) -> ProcessResult:
+        """Bring the page's final groups file up to date with its prelim files."""
+        record = self._pages.get(page)
+        prelim_stats = [f.stat() for f in prelim_files]
+
+        if (
+            record is not None
+            and _stats_match(record["prelims"], prelim_stats)
+            and _is_final_current(record, final_files)
+        ):
+            return _get_unchanged_result(record, page_desc)
+
+        prelim_bytes = [f.read_bytes() for f in prelim_files]
+        prelim_hashes = [hashlib.sha256(b).hexdigest() for b in prelim_bytes]
+
+        if (
+            record is not None
+            and [p[2] for p in record["prelims"]] == prelim_hashes
+            and _is_final_current(record, final_files)
+        ):
+            # Touched but not changed.
+            record["prelims"] = _get_prelim_records(prelim_stats, prelim_hashes)
+            self._changed = True
+            return _get_unchanged_result(record, page_desc)
+
+        prelim_groups = [json.loads(b) for b in prelim_bytes]
+        result = _write_final_groups(prelim_groups, final_files, page_desc)
+
+        use_as_final = _get_use_as_final_index(prelim_groups)
+        self._pages[page] = {
+            "prelims": _get_prelim_records(prelim_stats, prelim_hashes),
+            "use_as_final": use_as_final,
+            "final": None if use_as_final is None else _get_stat(final_files[use_as_final]),
+        }
+        self._changed = True
+
+        return result
+
+
+def _get_stat(file: Path) -> list[int]:
+    stat = file.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _get_prelim_records(stats: list[stat_result], hashes: list[str]) -> list[list[Any]]:
+    return [[s.st_size, s.st_mtime_ns, h] for s, h in zip(stats, hashes, strict=True)]
+
+
+def _stats_match(prelim_records: list[list[Any]], stats: list[stat_result]) -> bool:
+    return [r[:2] for r in prelim_records] == [[s.st_size, s.st_mtime_ns] for s in stats]
+
+
+def _is_final_current(record: dict[str, Any], final_files: tuple[Path, Path]) -> bool:
+    use_as_final = record["use_as_final"]
+    if use_as_final is None:
+        return True
+    final_file = final_files[use_as_final]
+    return final_file.is_file() and _get_stat(final_file) == record["final"]
+
+
+def _get_unchanged_result(record: dict[str, Any], page_desc: str) -> ProcessResult:
+    if record["use_as_final"] is None:
+        logger.warning(f'"{page_desc}": Not ready for final yet.')
+    else:
+        logger.debug(f'"{page_desc}": Final groups are up to date.')
+    return ProcessResult.SKIPPED
+
 
 def make_final_gemini_ai_groups_for_titles(
-    comics_database: ComicsDatabase, titles: list[str]
-) -> None:
+    comics_database: ComicsDatabase, titles: list[str], index_dir: Path, workers: int = 1
+) -> TitleResults:
+    """Make the final groups for the titles and return the page counts for each result."""
+    comic_titles = []
     for title in titles:
         if is_non_comic_title(title):
             logger.warning(f'Not a comic title "{title}" - skipping.')
             continue
+        comic_titles.append(title)
+
+    totals: TitleResults = dict.fromkeys(ProcessResult, 0)
+
+    def add_results(title_results: TitleResults) -> None:
+        for result, count in title_results.items():
+            totals[result] += count
 
-        make_final_gemini_ai_groups_for_title(comics_database, title)
+    # No point spawning more workers than titles.
+    effective_workers = min(workers, len(comic_titles)) if comic_titles else 1
+    if effective_workers > 1:
+        logger.info(
+            f"Making final groups for {len(comic_titles)} titles"
+            f" with {effective_workers} workers..."
+        )
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(
+            processes=effective_workers,
+            initializer=_worker_init,
+            initargs=(get_logging_args(),),
+        ) as pool:
+            for title_results in pool.imap_unordered(
+                _worker_run, [(title, index_dir) for title in comic_titles]
+            ):
+                add_results(title_results)
+    else:
+        for title in comic_titles:
+            add_results(make_final_gemini_ai_groups_for_title(comics_database, title, index_dir))
 
+    logger.info(
+        f"Wrote final groups for {totals[ProcessResult.SUCCESS]} pages,"
+        f" skipped {totals[ProcessResult.SKIPPED]}, failed {totals[ProcessResult.FAILURE]}."
+    )
 
-def make_final_gemini_ai_groups_for_title(comics_database: ComicsDatabase, title: str) -> None:
+    return totals
+
+
+def make_final_gemini_ai_groups_for_title(
+    comics_database: ComicsDatabase, title: str, index_dir: Path
+) -> TitleResults:
     json_files = JsonFiles(comics_database, title)
     json_files.title_final_results_dir.mkdir(parents=True, exist_ok=True)
 
     comic = comics_database.get_comic_book(title)
     ocr_files = comic.get_srce_restored_ocr_raw_story_files(RESTORABLE_PAGE_TYPES)
 
+    index = FinalGroupsIndex(index_dir / f"{title}.json")
+    results: TitleResults = dict.fromkeys(ProcessResult, 0)
+
     for ocr_file in ocr_files:
         json_files.set_ocr_file(ocr_file)
+        page_desc = f"{title}, {json_files.page}"
+
+        # noinspection PyBroadException
+        try:
+            result = index.update_page(
+                json_files.page,
+                json_files.ocr_prelim_groups_json_file,
+                json_files.ocr_final_groups_json_file,
+                page_desc,
+            )
+        except Exception:  # noqa: BLE001
+            logger.exception(f'"{page_desc}": Could not make final groups:')
+            result = ProcessResult.FAILURE
+
+        results[result] += 1
+
+    index.save()
+
+    return results
+
+
+def make_final_gemini_ai_groups_for_page(
+    ocr_prelim_groups_json_files: tuple[Path, Path],
+    ocr_final_groups_json_files: tuple[Path, Path],
+    page_desc: str,
+) -> ProcessResult:
+    """Write the final groups file from whichever prelim groups file is marked 'use_as_final'."""
+    prelim_groups = [json.loads(f.read_text()) for f in ocr_prelim_groups_json_files]
+    return _write_final_groups(prelim_groups, ocr_final_groups_json_files, page_desc)
 
-        ocr_prelim_group1 = json.loads(json_files.ocr_prelim_groups_json_file[0].read_text())
-        ocr_prelim_group2 = json.loads(json_files.ocr_prelim_groups_json_file[1].read_text())
-        assert (not ocr_prelim_group1["use_as_final"]) or (not ocr_prelim_group2["use_as_final"])
-        if ocr_prelim_group1["use_as_final"]:
-            with json_files.ocr_final_groups_json_file[0].open("w") as f:
-                json.dump(ocr_prelim_group1["groups"], f, indent=4)
-        elif ocr_prelim_group2["use_as_final"]:
-            with json_files.ocr_final_groups_json_file[1].open("w") as f:
-                json.dump(ocr_prelim_group2["groups"], f, indent=4)
-        else:
-            logger.warning(f'"{title}, {json_files.page}": Not ready for final yet.')
+
+def _get_use_as_final_index(prelim_groups: list[dict[str, Any]]) -> int | None:
+    assert (not prelim_groups[0]["use_as_final"]) or (not prelim_groups[1]["use_as_final"])
+    for i, groups in enumerate(prelim_groups):
+        if groups["use_as_final"]:
+            return i
+    return None
+
+
+def _write_final_groups(
+    prelim_groups: list[dict[str, Any]],
+    ocr_final_groups_json_files: tuple[Path, Path],
+    page_desc: str,
+) -> ProcessResult:
+    use_as_final = _get_use_as_final_index(prelim_groups)
+    if use_as_final is None:
+        logger.warning(f'"{page_desc}": Not ready for final yet.')
+        return ProcessResult.SKIPPED
+
+    final_file = ocr_final_groups_json_files[use_as_final]
+    final_text = json.dumps(prelim_groups[use_as_final]["groups"], indent=4)
+    if final_file.is_file() and final_file.read_text() == final_text:
+        logger.debug(f'"{page_desc}": Final groups are unchanged - not rewriting.')
+        return ProcessResult.SKIPPED
+
+    final_file.write_text(final_text)
+
+    return ProcessResult.SUCCESS
+
+
+def _worker_init(logging_args: tuple[str, str, str]) -> None:
+    """Pool initializer - log like the parent and make the comics database once per worker."""
+    init_logging(*logging_args)
+
+    global _WORKER_DB  # noqa: PLW0603
+    _WORKER_DB = ComicsDatabase()
+
+
+def _worker_run(args: tuple[str, Path]) -> TitleResults:
+    """Make the final groups for one title in a worker using the worker-local database."""
+    assert _WORKER_DB is not None
+    title, index_dir = args
+    return make_final_gemini_ai_groups_for_title(_WORKER_DB, title, index_dir)
 
 
 app = typer.Typer()
@@ -54,13 +275,25 @@ app = typer.Typer()
 def main(
     volumes_str: VolumesArg = "",
     title_str: TitleArg = "",
+    workers: int = typer.Option(
+        1, "--workers", "-w", help="Parallel title processes (1 = no multiprocessing)"
+    ),
+    index_dir: Path = typer.Option(  # noqa: B008
+        DEFAULT_FINAL_INDEX_DIR, help="Per-title index of prelim hashes and final choices"
+    ),
     log_level_str: LogLevelArg = "DEBUG",
 ) -> None:
     init_logging(APP_LOGGING_NAME, "make-final-gemini-ai-groups.log", log_level_str)
 
+    if workers < 1:
+        msg = "--workers must be >= 1."
+        raise typer.BadParameter(msg)
+
     comics_database, titles = get_comic_titles(volumes_str, title_str)
 
-    make_final_gemini_ai_groups_for_titles(comics_database, titles)
+    results = make_final_gemini_ai_groups_for_titles(comics_database, titles, index_dir, workers)
+    if results[ProcessResult.FAILURE] > 0:
+        raise typer.Exit(code=1)
 
 
 if __name__ == "__main__":
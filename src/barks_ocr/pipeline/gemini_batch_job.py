@@ -41,7 +41,7 @@ def make_gemini_ai_groups_for_titles_batch_job(
         make_gemini_ai_groups_for_title(comics_database, title)
 
 
-def make_gemini_ai_groups_for_title(comics_database: ComicsDatabase, title: str) -> None:  # noqa: PLR0915
+def make_gemini_ai_groups_for_title(comics_database: ComicsDatabase, title: str) -> None:
     out_title_dir = UNPROCESSED_BATCH_JOBS_DIR / title
     volume_dirname = comics_database.get_fantagraphics_volume_title(
         comics_database.get_fanta_volume_int(title)
@@ -99,27 +99,10 @@ def make_gemini_ai_groups_for_title(comics_database: ComicsDatabase, title: str)
             f'Found JSONL file "{json_file_path}" - backing up to "{json_backup_file_path}".'
         )
         json_file_path.rename(json_backup_file_path)
-    logger.info(f'Creating JSONL file: "{json_file_path}"...')
-    with json_file_path.open("w") as f:
-        f.writelines(json.dumps(req) + "\n" for req in gemini_requests_data)
-
-    logger.info(f'Uploading JSONL file: "{json_file_path}"...')
-    batch_input_file = CLIENT.files.upload(file=json_file_path)
-    assert batch_input_file.name
-    logger.info(f'Uploaded JSONL file: "{batch_input_file.name}".')
-
-    logger.info("\nCreating batch job...")
-    batch_job_from_file = CLIENT.batches.create(
-        model=AI_PRO_MODEL,
-        src=batch_input_file.name,
-        config={
-            "display_name": "ocr-grouping-batch-job",
-        },
-    )
-    logger.info(f"Created batch job from file: {batch_job_from_file.name}")
+    batch_job_name = create_batch_job(json_file_path, gemini_requests_data)
 
     batch_details = {
-        "batch_job_name": batch_job_from_file.name,
+        "batch_job_name": batch_job_name,
         "gemini_output_files": gemini_output_files,
     }
     batch_details_file = get_batch_details_file(title)
@@ -139,6 +122,32 @@ def make_gemini_ai_groups_for_title(comics_database: ComicsDatabase, title: str)
     )
 
 
+def create_batch_job(json_file_path: Path, gemini_requests_data: list[dict]) -> str:
+    """Write the requests JSONL file, upload it and create a batch job from it."""
+    logger.info(f'Creating JSONL file: "{json_file_path}"...')
+    with json_file_path.open("w") as f:
+        f.writelines(json.dumps(req) + "\n" for req in gemini_requests_data)
+
+    logger.info(f'Uploading JSONL file: "{json_file_path}"...')
+    # Don't rely on the system mime types table knowing '.jsonl'.
+    batch_input_file = CLIENT.files.upload(file=json_file_path, config={"mime_type": "jsonl"})
+    assert batch_input_file.name
+    logger.info(f'Uploaded JSONL file: "{batch_input_file.name}".')
+
+    logger.info("\nCreating batch job...")
+    batch_job_from_file = CLIENT.batches.create(
+        model=AI_PRO_MODEL,
+        src=batch_input_file.name,
+        config={
+            "display_name": "ocr-grouping-batch-job",
+        },
+    )
+    assert batch_job_from_file.name
+    logger.info(f"Created batch job from file: {batch_job_from_file.name}")
+
+    return batch_job_from_file.name
+
+
 def get_gemini_ai_groups_request(svg_file: Path, ocr_file: Path) -> dict | None:
     ocr_name = (Path(ocr_file).stem + Path(ocr_file.suffix).stem).replace(".", "-")
     png_file = Path(str(svg_file) + ".png")
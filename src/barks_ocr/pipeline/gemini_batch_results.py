@@ -30,7 +30,7 @@ def process_batch_jobs(comics_database: ComicsDatabase, titles: list[str]) -> No
         process_batch_job(comics_database, title)
 
 
-def process_batch_job(comics_database: ComicsDatabase, title: str) -> None:  # noqa: C901, PLR0915
+def process_batch_job(comics_database: ComicsDatabase, title: str) -> None:
     # noinspection PyBroadException
     num_errors = 0
     # noinspection PyBroadException,GrazieInspectionRunner
@@ -61,57 +61,17 @@ def process_batch_job(comics_database: ComicsDatabase, title: str) -> None:  # n
         # CLIENT.batches.delete(name=batch_job_name)  # noqa: ERA001
         # sys.exit(0)  # noqa: ERA001
 
-        batch_job_from_file = CLIENT.batches.get(name=batch_job_name)
-        assert batch_details_file
-        assert batch_job_from_file.state is not None
-        job_state = batch_job_from_file.state.name
-        if job_state != "JOB_STATE_SUCCEEDED":
+        job_state, file_content = get_batch_job_results(batch_job_name)
+        if file_content is None:
             logger.error(f"Job did not succeed. Final state: {job_state}")
             return
 
-        logger.info(f"Job status: {job_state}.")
-        # The output is in another file.
-        result_file_name = batch_job_from_file.dest.file_name  # ty:ignore[unresolved-attribute]
-        logger.info(f'Results are in Gemini file: "{result_file_name}".')
-
-        logger.info("Downloading and parsing result file content...")
-        assert result_file_name
-        file_content_bytes = CLIENT.files.download(file=result_file_name)
-        file_content = file_content_bytes.decode("utf-8")
-
         volume = comics_database.get_fanta_volume_int(title)
         volume_dirname = comics_database.get_fantagraphics_volume_title(volume)
         out_dir = BATCH_JOBS_OUTPUT_DIR / volume_dirname
         out_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f'Writing downloaded data to volume directory "{out_dir}"...')
-
-        # The result file is also a JSONL file. Parse and save each line.
-        file_index = 0
-        for line in file_content.splitlines():
-            if line:
-                parsed_response = json.loads(line)
-
-                if "error" in parsed_response:
-                    logger.error(parsed_response["error"])
-                    continue
-
-                # noinspection PyBroadException
-                try:
-                    for part in parsed_response["response"]["candidates"][0]["content"]["parts"]:
-                        if part.get("text"):
-                            out_file = out_dir / gemini_output_files[file_index]
-                            file_index += 1
-
-                            logger.info(f'Writing line {file_index} to file: "{out_file}"...')
-                            with out_file.open("w") as f:
-                                f.write(part["text"])
-                except Exception:  # noqa: BLE001
-                    logger.error(
-                        f"Error parsing line {file_index}:"
-                        f" {parsed_response['response']['candidates'][0]}"
-                    )
-                    num_errors += 1
-                    logger.exception(f"Error parsing line {file_index} but continuing")
+
+        num_errors = write_batch_results(file_content, gemini_output_files, out_dir)
 
         batch_details_file.rename(finished_batch_details_file)
         logger.info(f'Moved "{batch_details_file}" to finished "{finished_batch_details_file}".')
@@ -130,6 +90,62 @@ def process_batch_job(comics_database: ComicsDatabase, title: str) -> None:  # n
         )
 
 
+def get_batch_job_results(batch_job_name: str) -> tuple[str, str | None]:
+    """Return the batch job state and, if the job succeeded, its downloaded JSONL results."""
+    batch_job_from_file = CLIENT.batches.get(name=batch_job_name)
+    assert batch_job_from_file.state is not None
+    job_state = batch_job_from_file.state.name
+    if job_state != "JOB_STATE_SUCCEEDED":
+        return job_state, None
+
+    logger.info(f"Job status: {job_state}.")
+    # The output is in another file.
+    result_file_name = batch_job_from_file.dest.file_name  # ty:ignore[unresolved-attribute]
+    logger.info(f'Results are in Gemini file: "{result_file_name}".')
+
+    logger.info("Downloading and parsing result file content...")
+    assert result_file_name
+    file_content_bytes = CLIENT.files.download(file=result_file_name)
+
+    return job_state, file_content_bytes.decode("utf-8")
+
+
+def write_batch_results(file_content: str, gemini_output_files: list[str], out_dir: Path) -> int:
+    """Write each response in the results JSONL to its output file; return the error count."""
+    logger.info(f'Writing downloaded data to volume directory "{out_dir}"...')
+
+    num_errors = 0
+    # The result file is also a JSONL file. Parse and save each line.
+    file_index = 0
+    for line in file_content.splitlines():
+        if line:
+            parsed_response = json.loads(line)
+
+            if "error" in parsed_response:
+                logger.error(parsed_response["error"])
+                continue
+
+            # noinspection PyBroadException
+            try:
+                for part in parsed_response["response"]["candidates"][0]["content"]["parts"]:
+                    if part.get("text"):
+                        out_file = out_dir / gemini_output_files[file_index]
+                        file_index += 1
+
+                        logger.info(f'Writing line {file_index} to file: "{out_file}"...')
+                        with out_file.open("w") as f:
+                            f.write(part["text"])
+            except Exception:  # noqa: BLE001
+                logger.error(
+                    f"Error parsing line {file_index}:"
+                    f" {parsed_response['response']['candidates'][0]}"
+                )
+                num_errors += 1
+                logger.exception(f"Error parsing line {file_index} but continuing")
+
+    return num_errors
+
+
 app = typer.Typer()
 
 
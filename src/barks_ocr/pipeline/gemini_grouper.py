@@ -1,6 +1,7 @@
 import json
-import sys
+import multiprocessing as mp
 from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -16,35 +17,84 @@ from barks_fantagraphics.ocr_file_paths import (
 )
 from loguru import logger
 
+from barks_ocr.cli_setup import get_logging_args, init_logging
 from barks_ocr.utils.common import ProcessResult
-from barks_ocr.utils.geometry import Rect
 from barks_ocr.utils.ocr_box import (
     OcrBox,
     PointList,
     get_box_str,
-    load_groups_from_json,
     save_box_groups_as_json,
 )
+from barks_ocr.utils.panel_index import NO_AREA_PANEL_NUM, get_panel_index_from_file
+
+
+@dataclass(frozen=True, slots=True)
+class PageGroupsJob:
+    svg_file: Path
+    ocr_file: Path
+    ocr_type: str
+    batch_results_dir: Path
+    panel_segments_file: Path
+    out_dir: Path
 
 
 class GeminiAiGrouper:
     def __init__(
         self,
-        comics_database: ComicsDatabase,
+        comics_database: ComicsDatabase | None,
         get_ai_predicted_groups_func: Callable[[str, str, Path, list[dict[str, Any]], Path], Any],
     ) -> None:
+        # Only finding the pages of titles needs the database - a grouper that is
+        # just given pages (like a pool worker's) can do without one.
         self._comics_database = comics_database
         self._get_ai_predicted_groups = get_ai_predicted_groups_func
 
-    def make_groups_for_titles(self, title_list: list[str]) -> None:
+    def make_groups_for_titles(self, title_list: list[str], workers: int = 1) -> int:
+        """Make groups for every page of the titles and return the number of failed pages.
+
+        With ``workers > 1`` the pages are spread over a process pool, so
+        ``get_ai_predicted_groups_func`` must be picklable.
+        """
+        jobs: list[PageGroupsJob] = []
         for title in title_list:
             if is_non_comic_title(title):
                 logger.warning(f'Not a comic title "{title}" - skipping.')
                 continue
 
-            self._make_groups_for_title(title)
+            jobs.extend(self._get_page_jobs(title))
+
+        # No point spawning more workers than pages.
+        effective_workers = min(workers, len(jobs)) if jobs else 1
+
+        results: dict[ProcessResult, list[PageGroupsJob]] = {result: [] for result in ProcessResult}
+        if effective_workers > 1:
+            logger.info(f"Making groups for {len(jobs)} pages with {effective_workers} workers...")
+            ctx = mp.get_context("spawn")
+            with ctx.Pool(
+                processes=effective_workers,
+                initializer=_worker_init,
+                initargs=(self._get_ai_predicted_groups, get_logging_args()),
+            ) as pool:
+                for job, result in pool.imap_unordered(_worker_run, jobs):
+                    results[result].append(job)
+        else:
+            for job in jobs:
+                results[self.make_groups_for_job(job)].append(job)
 
-    def _make_groups_for_title(self, title: str) -> None:
+        failures = results[ProcessResult.FAILURE]
+        logger.info(
+            f"Made groups for {len(results[ProcessResult.SUCCESS])} pages,"
+            f" skipped {len(results[ProcessResult.SKIPPED])}, failed {len(failures)}."
+        )
+        if failures:
+            logger.error(f"There were {len(failures)} page failures:")
+            for job in sorted(failures, key=lambda j: (str(j.out_dir), str(j.ocr_file))):
+                logger.error(f'    "{get_abbrev_path(job.ocr_file)}".')
+
+        return len(failures)
+
+    def _get_page_jobs(self, title: str) -> list[PageGroupsJob]:
+        assert self._comics_database is not None
         volume = self._comics_database.get_fanta_volume_int(title)
         volume_dirname = self._comics_database.get_fantagraphics_volume_title(volume)
 
@@ -64,43 +114,67 @@ class GeminiAiGrouper:
         ocr_files = comic.get_srce_restored_ocr_raw_story_files(RESTORABLE_PAGE_TYPES)
         panel_segments_files = comic.get_srce_panel_segments_files(RESTORABLE_PAGE_TYPES)
 
-        num_files_processed = 0
-        for svg_file, ocr_file, panel_segments_file in zip(
-            svg_files, ocr_files, panel_segments_files, strict=True
-        ):
-            fanta_page = svg_file.stem
-
-            for ocr_type_file in ocr_file:
-                ocr_type = get_ocr_type(ocr_type_file)
-
-                ocr_prelim_groups_json_file = out_dir / get_ocr_prelim_groups_json_filename(
-                    fanta_page, ocr_type
-                )
-                ocr_box_groups_json_file = out_dir / self._get_ocr_box_groups_json_filename(
-                    fanta_page, ocr_type
-                )
-                ocr_groups_txt_file = out_dir / self._get_ocr_groups_txt_filename(
-                    fanta_page, ocr_type
-                )
+        return [
+            PageGroupsJob(
+                svg_file,
+                ocr_type_file,
+                get_ocr_type(ocr_type_file),
+                batch_results_dir,
+                panel_segments_file,
+                out_dir,
+            )
+            for svg_file, ocr_file, panel_segments_file in zip(
+                svg_files, ocr_files, panel_segments_files, strict=True
+            )
+            for ocr_type_file in ocr_file
+        ]
+
+    def make_groups_for_job(self, job: PageGroupsJob) -> ProcessResult:
+        return self.make_groups_for_page(
+            job.svg_file,
+            job.ocr_file,
+            job.ocr_type,
+            job.batch_results_dir,
+            job.panel_segments_file,
+            job.out_dir,
+        )
 
-                result = self._make_groups(
-                    svg_file,
-                    ocr_type_file,
-                    ocr_type,
-                    batch_results_dir,
-                    panel_segments_file,
-                    ocr_prelim_groups_json_file,
-                    ocr_box_groups_json_file,
-                    ocr_groups_txt_file,
-                )
+    def make_groups_for_page(  # noqa: PLR0913
+        self,
+        svg_file: Path,
+        ocr_file: Path,
+        ocr_type: str,
+        batch_results_dir: Path,
+        panel_segments_file: Path,
+        out_dir: Path,
+        force: bool = False,
+    ) -> ProcessResult:
+        """Make the page's prelim groups files.
 
-                if result == ProcessResult.FAILURE:
-                    msg = "There were process errors."
-                    logger.error(msg)
-                if result == ProcessResult.SUCCESS:
-                    num_files_processed += 1
+        Unless ``force`` is set, a page whose prelim groups file is newer than its
+        predicted groups file is skipped.
+        """
+        fanta_page = svg_file.stem
 
-            # break  # Break early for testing  # noqa: ERA001
+        ocr_prelim_groups_json_file = out_dir / get_ocr_prelim_groups_json_filename(
+            fanta_page, ocr_type
+        )
+        ocr_box_groups_json_file = out_dir / self._get_ocr_box_groups_json_filename(
+            fanta_page, ocr_type
+        )
+        ocr_groups_txt_file = out_dir / self._get_ocr_groups_txt_filename(fanta_page, ocr_type)
+
+        return self._make_groups(
+            svg_file,
+            ocr_file,
+            ocr_type,
+            batch_results_dir,
+            panel_segments_file,
+            ocr_prelim_groups_json_file,
+            ocr_box_groups_json_file,
+            ocr_groups_txt_file,
+            force,
+        )
 
     def _make_groups(  # noqa: PLR0913
         self,
@@ -112,6 +186,7 @@ class GeminiAiGrouper:
         ocr_prelim_data_groups_json_file: Path,
         ocr_box_groups_json_file: Path,
         ocr_groups_txt_file: Path,
+        force: bool,
     ) -> ProcessResult:
         fanta_page = svg_file.stem
         png_file = Path(str(svg_file) + ".png")
@@ -128,9 +203,13 @@ class GeminiAiGrouper:
             ai_predicted_groups_file = batch_results_dir / get_ocr_predicted_groups_filename(
                 fanta_page, ocr_type
             )
-            if ocr_prelim_data_groups_json_file.is_file() and (
-                ocr_prelim_data_groups_json_file.stat().st_mtime
-                > ai_predicted_groups_file.stat().st_mtime
+            if (
+                not force
+                and ocr_prelim_data_groups_json_file.is_file()
+                and (
+                    ocr_prelim_data_groups_json_file.stat().st_mtime
+                    > ai_predicted_groups_file.stat().st_mtime
+                )
             ):
                 logger.info(f'Found groups file - skipping: "{ocr_prelim_data_groups_json_file}".')
                 return ProcessResult.SKIPPED
@@ -153,19 +232,18 @@ class GeminiAiGrouper:
                 json.dump(ai_prelim_data, f, indent=4)
             logger.info(f'Wrote prelim ai group data to "{ocr_prelim_data_groups_json_file}"...')
 
+            # Build the box groups once and write both the json and text files from them.
             groups = self._get_text_groups(ai_prelim_data, ocr_bound_ids)
             save_box_groups_as_json(groups, ocr_box_groups_json_file)
-
-            groups = load_groups_from_json(ocr_box_groups_json_file)
             self._write_groups_to_text_file(ocr_groups_txt_file, groups)
 
         except json.decoder.JSONDecodeError:
             logger.exception(f'Could not process file "{ocr_file}":')
             logger.error(f'Check JSON file: "{ocr_file}".')
-            sys.exit(1)
-        except:  # noqa: E722
+            return ProcessResult.FAILURE
+        except Exception:  # noqa: BLE001
             logger.exception(f'Could not process file "{png_file}":')
-            sys.exit(1)
+            return ProcessResult.FAILURE
         else:
             return ProcessResult.SUCCESS
 
@@ -180,51 +258,40 @@ class GeminiAiGrouper:
         }
 
         logger.info(f'Loading panel segments file "{get_abbrev_path(panel_segments_file)}".')
-        with panel_segments_file.open("r") as f:
-            panel_segment_info = json.load(f)
+        panel_index = get_panel_index_from_file(panel_segments_file)
 
-        merged_groups = {}
+        page_groups = []
         # TODO: group_id start from 1
         for group_id, group in enumerate(groups):
-            box_ids = group["box_ids"]
             cleaned_box_texts = group["split_cleaned_box_texts"]
             if not cleaned_box_texts:
                 logger.warning(f"Ignoring group {group_id}: empty 'split_cleaned_box_texts'.")
                 continue
 
-            box_bounds: list[PointList] = []
-            box_texts = {}
-            for box_id in box_ids:
-                if box_id not in cleaned_box_texts:
-                    logger.warning(
-                        f'For group {group_id}, could not find box_id "{box_id}"'
-                        f" in cleaned_box_texts: {cleaned_box_texts.keys()}."
-                    )
-                    continue
-
-                cleaned_box_text = cleaned_box_texts[box_id]
-                if not cleaned_box_text:
-                    logger.warning(f'Ignoring empty text fragment for box "{box_id}".')
-                elif box_id not in id_to_bound:
-                    logger.warning(
-                        f'For group {group_id}, could not find box_id "{box_id}"'
-                        f" in id_to_bound: {id_to_bound.keys()}."
-                    )
-                else:
-                    box = id_to_bound[box_id]["text_box"]
-                    box_texts[box_id] = {"text_frag": cleaned_box_text, "text_box": box}
-                    box_bounds.append(box)
+            box_bounds, box_texts = self._get_group_box_texts(
+                group_id, group["box_ids"], cleaned_box_texts, id_to_bound
+            )
 
             if not box_bounds:
                 logger.warning(f"Ignoring group {group_id}: 'box_bounds is None'.")
                 continue
 
-            enclosing_box = self._get_enclosing_box(box_bounds)
-            # noinspection PyBroadException
-            try:
-                panel_num = self._get_enclosing_panel_num(enclosing_box, panel_segment_info)
-            except:  # noqa: E722
-                logger.exception(f"Could not get enclosing panel number for group '{group_id}':")
+            page_groups.append((group_id, group, self._get_enclosing_box(box_bounds), box_texts))
+
+        # One panel lookup for all the page's groups.
+        panel_nums = panel_index.get_enclosing_panel_nums(
+            [enclosing_box for _, _, enclosing_box, _ in page_groups]
+        )
+
+        merged_groups = {}
+        for (group_id, group, enclosing_box, box_texts), panel_num in zip(
+            page_groups, panel_nums.tolist(), strict=True
+        ):
+            if panel_num == NO_AREA_PANEL_NUM:
+                logger.error(
+                    f"Could not get enclosing panel number for group '{group_id}':"
+                    f" text box {enclosing_box} has no area."
+                )
                 continue
 
             ai_text = group["cleaned_text"]
@@ -278,6 +345,38 @@ class GeminiAiGrouper:
     def _get_ocr_box_groups_json_filename(fanta_page: str, ocr_type: str) -> str:
         return fanta_page + f"-{ocr_type}-gemini-groups.json"
 
+    @staticmethod
+    def _get_group_box_texts(
+        group_id: int,
+        box_ids: list[str],
+        cleaned_box_texts: dict[str, str],
+        id_to_bound: dict[Any, dict[str, Any]],
+    ) -> tuple[list[PointList], dict[str, dict[str, Any]]]:
+        box_bounds: list[PointList] = []
+        box_texts = {}
+        for box_id in box_ids:
+            if box_id not in cleaned_box_texts:
+                logger.warning(
+                    f'For group {group_id}, could not find box_id "{box_id}"'
+                    f" in cleaned_box_texts: {cleaned_box_texts.keys()}."
+                )
+                continue
+
+            cleaned_box_text = cleaned_box_texts[box_id]
+            if not cleaned_box_text:
+                logger.warning(f'Ignoring empty text fragment for box "{box_id}".')
+            elif box_id not in id_to_bound:
+                logger.warning(
+                    f'For group {group_id}, could not find box_id "{box_id}"'
+                    f" in id_to_bound: {id_to_bound.keys()}."
+                )
+            else:
+                box = id_to_bound[box_id]["text_box"]
+                box_texts[box_id] = {"text_frag": cleaned_box_text, "text_box": box}
+                box_bounds.append(box)
+
+        return box_bounds, box_texts
+
     @staticmethod
     def _get_enclosing_box(boxes: list[PointList]) -> PointList:
         x_min = min(box[0][0] for box in boxes)
@@ -287,57 +386,43 @@ class GeminiAiGrouper:
 
         return [(x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max)]
 
-    @staticmethod
-    def _get_enclosing_panel_num(box: PointList, panel_segment_info) -> int:  # noqa: ANN001
-        ocr_box = OcrBox(box, "", 0, "")
-        box = ocr_box.min_rotated_rectangle
-        bottom_left = box[0]
-        top_right = box[1]
-        box_rect = Rect(
-            bottom_left[0],
-            bottom_left[1],
-            top_right[0] - bottom_left[0],
-            top_right[1] - bottom_left[1],
-        )
-
-        for i, panel_box in enumerate(panel_segment_info["panels"]):
-            top_left_x = panel_box[0]
-            top_left_y = panel_box[1]
-            w = panel_box[2]
-            h = panel_box[3]
-            panel_rect = Rect(top_left_x, top_left_y, w, h)
-            if panel_rect.is_rect_inside_rect(box_rect):
-                return i + 1
-
-        return -1
-
     @staticmethod
     def _get_text_groups(
         ocr_merged_data: dict[str, Any], ocr_bound_ids: list[dict[str, Any]]
-    ) -> dict[int, list[tuple[Any, float]]]:
-        groups = {}
-
+    ) -> dict[int, list[tuple[OcrBox, float]]]:
+        group_ids = []
+        text_ids = []
+        box_points_list = []
+        accepted_texts = []
         for group_id, ocr_data in ocr_merged_data["groups"].items():
-            dist = 0.0
-
-            group = []
-            for text_id in ocr_data["cleaned_box_texts"]:
-                cleaned_text_data = ocr_data["cleaned_box_texts"][text_id]
-                text_data = {
-                    "box_id": text_id,
-                    "box_points": cleaned_text_data["text_box"],
-                    "ocr_text": ocr_bound_ids[int(text_id)]["text"],
-                    "ocr_prob": ocr_bound_ids[int(text_id)]["prob"],
-                    "accepted_text": cleaned_text_data["text_frag"].upper(),
-                }
-                group.append((text_data, dist))
+            for text_id, cleaned_text_data in ocr_data["cleaned_box_texts"].items():
+                group_ids.append(group_id)
+                text_ids.append(text_id)
+                box_points_list.append(cleaned_text_data["text_box"])
+                accepted_texts.append(cleaned_text_data["text_frag"].upper())
+
+        # Make all the page's boxes in one go so their geometry is computed together.
+        ocr_boxes = OcrBox.from_quads(
+            box_points_list,
+            [ocr_bound_ids[int(text_id)]["text"] for text_id in text_ids],
+            [ocr_bound_ids[int(text_id)]["prob"] for text_id in text_ids],
+            accepted_texts,
+            box_ids=text_ids,
+        )
 
-            groups[group_id] = group
+        dist = 0.0
+        groups: dict[int, list[tuple[OcrBox, float]]] = {
+            group_id: [] for group_id in ocr_merged_data["groups"]
+        }
+        for group_id, ocr_box in zip(group_ids, ocr_boxes, strict=True):
+            groups[group_id].append((ocr_box, dist))
 
         return groups
 
     @staticmethod
-    def _write_groups_to_text_file(file: Path, groups: dict[int, Any]) -> None:
+    def _write_groups_to_text_file(
+        file: Path, groups: dict[int, list[tuple[OcrBox, float]]]
+    ) -> None:
         max_text_len = 0
         max_acc_text_len = 0
         for group in groups.values():
@@ -353,6 +438,28 @@ class GeminiAiGrouper:
                         f"text: '{ocr_box.ocr_text:<{max_text_len}}', "
                         f"acc: '{ocr_box.accepted_text:<{max_acc_text_len}}', "
                         f"P: {ocr_box.ocr_prob:4.2f}, "
-                        f"box: {get_box_str(ocr_box._box_points)},"  # noqa: SLF001
+                        f"box: {get_box_str(ocr_box.box_points)},"
                         f" rect: {ocr_box.is_approx_rect}\n"
                     )
+
+
+# Worker-process globals: each worker builds its grouper once via the pool
+# initializer, then reuses it across every page that worker processes.
+_WORKER_GROUPER: GeminiAiGrouper | None = None
+
+
+def _worker_init(
+    get_ai_predicted_groups_func: Callable[[str, str, Path, list[dict[str, Any]], Path], Any],
+    logging_args: tuple[str, str, str],
+) -> None:
+    """Pool initializer - log like the parent and make the grouper once per worker process."""
+    init_logging(*logging_args)
+
+    global _WORKER_GROUPER  # noqa: PLW0603
+    _WORKER_GROUPER = GeminiAiGrouper(None, get_ai_predicted_groups_func)
+
+
+def _worker_run(job: PageGroupsJob) -> tuple[PageGroupsJob, ProcessResult]:
+    """Make the groups for one page in a worker using the worker-local grouper."""
+    assert _WORKER_GROUPER is not None
+    return job, _WORKER_GROUPER.make_groups_for_job(job)
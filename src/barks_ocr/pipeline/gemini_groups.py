@@ -1,8 +1,10 @@
 import json
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import typer
+from barks_fantagraphics.comics_database import ComicsDatabase
 from barks_fantagraphics.ocr_file_paths import get_ocr_predicted_groups_filename
 from comic_utils.common_typer_options import LogLevelArg, TitleArg, VolumesArg
 from loguru import logger
@@ -10,9 +12,23 @@ from loguru import logger
 from barks_ocr.cli_setup import get_comic_titles, init_logging
 from barks_ocr.pipeline.gemini_grouper import GeminiAiGrouper
 from barks_ocr.utils.gemini_ai_for_grouping import get_cleaned_text
+from barks_ocr.utils.gemini_live_client import (
+    DEFAULT_MAX_QPS,
+    DEFAULT_MAX_TOKENS_PER_MINUTE,
+    GeminiLiveClient,
+    GeminiResponseCache,
+    RateLimiter,
+    get_live_client,
+)
+
+if TYPE_CHECKING:
+    from barks_ocr.pipeline.gemini_live_groups import LiveAiPredictedGroups
 
 APP_LOGGING_NAME = "gemg"
 
+DEFAULT_LIVE_CACHE_DIR = Path.home() / ".cache" / "barks-ocr" / "gemini-live"
+DEFAULT_LIVE_WORKERS = 4
+
 
 def get_ai_predicted_groups(
     fanta_page: str,
@@ -37,21 +53,108 @@ def get_ai_predicted_groups(
         return json.loads(predicted_groups)
 
 
+def make_live_ai_predicted_groups(
+    max_qps: float, max_tokens_per_minute: int, cache_dir: Path, base_url: str
+) -> "LiveAiPredictedGroups":
+    # Only the live mode needs the API key - keep these imports out of the batch path.
+    from barks_ocr.pipeline.gemini_live_groups import LiveAiPredictedGroups  # noqa: PLC0415
+    from barks_ocr.utils.gemini_ai import (  # noqa: PLC0415
+        AI_PRO_MODEL,
+        GEMINI_API_KEY,
+        GEMINI_BASE_URL,
+    )
+
+    live_client = GeminiLiveClient(
+        get_live_client(GEMINI_API_KEY, base_url or GEMINI_BASE_URL),
+        AI_PRO_MODEL,
+        RateLimiter(max_qps, max_tokens_per_minute),
+        GeminiResponseCache(cache_dir),
+    )
+
+    return LiveAiPredictedGroups(live_client)
+
+
+def get_live_ai_predicted_groups(  # noqa: PLR0913
+    comics_database: ComicsDatabase,
+    titles: list[str],
+    workers: int,
+    max_qps: float,
+    max_tokens_per_minute: int,
+    cache_dir: Path,
+    base_url: str,
+) -> Callable[[str, str, Path, list[dict[str, Any]], Path], Any]:
+    from barks_ocr.pipeline.gemini_live_groups import (  # noqa: PLC0415
+        get_live_requests_for_titles,
+    )
+
+    live_ai_predicted_groups = make_live_ai_predicted_groups(
+        max_qps, max_tokens_per_minute, cache_dir, base_url
+    )
+
+    num_failures = live_ai_predicted_groups.prefetch(
+        get_live_requests_for_titles(comics_database, titles), workers
+    )
+    if num_failures > 0:
+        logger.error(f"There were {num_failures} failed live Gemini requests.")
+
+    return live_ai_predicted_groups
+
+
 app = typer.Typer()
 
 
 @app.command(help="Make gemini ai groups from batch job results")
-def main(
+def main(  # noqa: PLR0913
     volumes_str: VolumesArg = "",
     title_str: TitleArg = "",
+    live: bool = typer.Option(
+        default=False,
+        help="Call Gemini directly for pages with no batch results instead of using a batch job",
+    ),
+    live_workers: int = typer.Option(DEFAULT_LIVE_WORKERS, help="Concurrent live Gemini requests"),
+    max_qps: float = typer.Option(DEFAULT_MAX_QPS, help="Max live Gemini requests per second"),
+    max_tokens_per_minute: int = typer.Option(
+        DEFAULT_MAX_TOKENS_PER_MINUTE, help="Max live Gemini tokens per minute"
+    ),
+    live_cache_dir: Path = typer.Option(  # noqa: B008
+        DEFAULT_LIVE_CACHE_DIR, help="Disk cache for live Gemini responses"
+    ),
+    base_url: str = typer.Option("", help="Gemini API base url (for a local stand-in server)"),
+    workers: int = typer.Option(
+        1, "--workers", "-w", help="Parallel page grouping processes (1 = no multiprocessing)"
+    ),
     log_level_str: LogLevelArg = "DEBUG",
 ) -> None:
     init_logging(APP_LOGGING_NAME, "make-gemini-ai-groups-from-batch.log", log_level_str)
 
+    if workers < 1:
+        msg = "--workers must be >= 1."
+        raise typer.BadParameter(msg)
+
     comics_database, titles = get_comic_titles(volumes_str, title_str)
 
-    gemini_ai_grouper = GeminiAiGrouper(comics_database, get_ai_predicted_groups)
-    gemini_ai_grouper.make_groups_for_titles(titles)
+    ai_predicted_groups_func: Callable[[str, str, Path, list[dict[str, Any]], Path], Any]
+    if live:
+        ai_predicted_groups_func = get_live_ai_predicted_groups(
+            comics_database,
+            titles,
+            live_workers,
+            max_qps,
+            max_tokens_per_minute,
+            live_cache_dir,
+            base_url,
+        )
+        if workers > 1:
+            # The prefetch has written every predicted groups file it could, and the
+            # live client can't be sent to worker processes, so read the files instead.
+            ai_predicted_groups_func = get_ai_predicted_groups
+    else:
+        ai_predicted_groups_func = get_ai_predicted_groups
+
+    gemini_ai_grouper = GeminiAiGrouper(comics_database, ai_predicted_groups_func)
+    num_failures = gemini_ai_grouper.make_groups_for_titles(titles, workers)
+    if num_failures > 0:
+        raise typer.Exit(code=1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+"""Live (non-batch) Gemini predicted groups for ``GeminiAiGrouper``.
+
+``LiveAiPredictedGroups`` is a drop-in ``get_ai_predicted_groups_func`` that asks
+Gemini directly instead of reading a downloaded batch result. Each response is
+also written to the usual predicted-groups file in the batch results directory,
+so the later pipeline stages cannot tell a live page from a batch page.
+
+``prefetch`` issues the requests for many pages concurrently under the client's
+rate limit before grouping starts; the grouper then picks the results up
+without waiting on the network page by page. Only pages with no predicted-groups
+file are prefetched, and any other page is read from its file by
+``get_ai_predicted_groups``, so pages that already have batch results never
+call the API or have their file overwritten.
+
+``fetch`` always asks Gemini (through the client's response cache) and rewrites
+the page's predicted-groups file. It is for callers that already know a page's
+file is stale, like the 'predict' stage of ``barks-ocr-run --live``.
+"""
+
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from barks_fantagraphics.comic_book_info import is_non_comic_title
+from barks_fantagraphics.comics_consts import RESTORABLE_PAGE_TYPES
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.comics_utils import get_abbrev_path, get_ocr_type
+from barks_fantagraphics.ocr_file_paths import (
+    BATCH_JOBS_OUTPUT_DIR,
+    get_ocr_predicted_groups_filename,
+)
+from comic_utils.cv_image_utils import get_bw_image_from_alpha
+from loguru import logger
+from PIL import Image
+
+from barks_ocr.pipeline.gemini_batch_job import assign_ids_to_ocr_boxes, get_ocr_data
+from barks_ocr.pipeline.gemini_groups import get_ai_predicted_groups
+from barks_ocr.utils.gemini_ai_comic_prompts import comic_prompt
+from barks_ocr.utils.gemini_ai_for_grouping import get_cleaned_text, norm2ai
+from barks_ocr.utils.gemini_live_client import GeminiLiveClient
+from barks_ocr.utils.preprocessing import preprocess_image
+
+
+@dataclass(frozen=True, slots=True)
+class LiveGroupsRequest:
+    fanta_page: str
+    ocr_type: str
+    batch_results_dir: Path
+    png_file: Path
+    ocr_file: Path
+
+
+def get_bw_image_png_bytes(png_file: Path) -> tuple[bytes, int, int]:
+    """Return the preprocessed BW page image as PNG bytes plus its width and height."""
+    bw_image = Image.fromarray(preprocess_image(get_bw_image_from_alpha(png_file)))
+    width, height = bw_image.size
+
+    buffer = io.BytesIO()
+    bw_image.save(buffer, format="PNG")
+
+    return buffer.getvalue(), width, height
+
+
+def get_live_requests_for_titles(
+    comics_database: ComicsDatabase, title_list: list[str]
+) -> list[LiveGroupsRequest]:
+    """Return a request for every page that has no predicted groups file yet."""
+    requests = []
+
+    for title in title_list:
+        if is_non_comic_title(title):
+            logger.warning(f'Not a comic title "{title}" - skipping.')
+            continue
+
+        volume_dirname = comics_database.get_fantagraphics_volume_title(
+            comics_database.get_fanta_volume_int(title)
+        )
+        batch_results_dir = BATCH_JOBS_OUTPUT_DIR / volume_dirname
+        batch_results_dir.mkdir(parents=True, exist_ok=True)
+
+        comic = comics_database.get_comic_book(title)
+        svg_files = comic.get_srce_restored_svg_story_files(RESTORABLE_PAGE_TYPES)
+        ocr_files = comic.get_srce_restored_ocr_raw_story_files(RESTORABLE_PAGE_TYPES)
+
+        for svg_file, ocr_file in zip(svg_files, ocr_files, strict=True):
+            fanta_page = Path(svg_file).stem
+            png_file = Path(str(svg_file) + ".png")
+
+            for ocr_type_file in ocr_file:
+                ocr_type = get_ocr_type(ocr_type_file)
+                predicted_groups_file = batch_results_dir / get_ocr_predicted_groups_filename(
+                    fanta_page, ocr_type
+                )
+                if predicted_groups_file.is_file():
+                    logger.info(
+                        f'Found predicted groups file "{predicted_groups_file}" - skipping.'
+                    )
+                    continue
+
+                requests.append(
+                    LiveGroupsRequest(
+                        fanta_page, ocr_type, batch_results_dir, png_file, ocr_type_file
+                    )
+                )
+
+    return requests
+
+
+class LiveAiPredictedGroups:
+    def __init__(self, live_client: GeminiLiveClient) -> None:
+        self._live_client = live_client
+        self._prefetched: dict[tuple[Path, str, str], Any] = {}
+
+    def __call__(
+        self,
+        fanta_page: str,
+        ocr_type: str,
+        batch_results_dir: Path,
+        ocr_bound_ids: list[dict[str, Any]],
+        png_file: Path,
+    ) -> Any:  # noqa: ANN401
+        prefetch_key = (batch_results_dir, fanta_page, ocr_type)
+        if prefetch_key in self._prefetched:
+            return self._prefetched.pop(prefetch_key)
+
+        return get_ai_predicted_groups(
+            fanta_page, ocr_type, batch_results_dir, ocr_bound_ids, png_file
+        )
+
+    def prefetch(self, requests: list[LiveGroupsRequest], workers: int) -> int:
+        """Fetch predicted groups for all ``requests`` concurrently; return the failure count."""
+        if not requests:
+            return 0
+
+        logger.info(f"Prefetching {len(requests)} live Gemini requests with {workers} workers...")
+
+        num_failures = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._prefetch_one, req): req for req in requests}
+            for future in as_completed(futures):
+                request = futures[future]
+                # noinspection PyBroadException
+                try:
+                    self._prefetched[
+                        (request.batch_results_dir, request.fanta_page, request.ocr_type)
+                    ] = future.result()
+                except Exception:  # noqa: BLE001
+                    num_failures += 1
+                    logger.exception(
+                        f'Live Gemini request failed for page "{request.fanta_page}"'
+                        f" ({request.ocr_type}):"
+                    )
+
+        logger.info(f"Prefetched {len(requests) - num_failures} of {len(requests)} pages.")
+
+        return num_failures
+
+    def _prefetch_one(self, request: LiveGroupsRequest) -> Any:  # noqa: ANN401
+        ocr_bound_ids = assign_ids_to_ocr_boxes(get_ocr_data(request.ocr_file))
+        return self.fetch(
+            request.fanta_page,
+            request.ocr_type,
+            request.batch_results_dir,
+            ocr_bound_ids,
+            request.png_file,
+        )
+
+    def fetch(
+        self,
+        fanta_page: str,
+        ocr_type: str,
+        batch_results_dir: Path,
+        ocr_bound_ids: list[dict[str, Any]],
+        png_file: Path,
+    ) -> Any:  # noqa: ANN401
+        """Ask Gemini for the page's predicted groups, even if it has a predicted groups file."""
+        logger.info(f'Getting live Gemini ai predicted groups for "{get_abbrev_path(png_file)}".')
+
+        image_bytes, width, height = get_bw_image_png_bytes(png_file)
+        prompt = comic_prompt.format(json.dumps(norm2ai(ocr_bound_ids, height, width)))
+
+        predicted_groups = self._live_client.generate_json(prompt, image_bytes)
+
+        # Keep the same artefact the batch results stage would have written.
+        predicted_groups_file = batch_results_dir / get_ocr_predicted_groups_filename(
+            fanta_page, ocr_type
+        )
+        predicted_groups_file.write_text(predicted_groups)
+        logger.info(f'Wrote live predicted groups to "{predicted_groups_file}".')
+
+        predicted_groups, reason_changed = get_cleaned_text(predicted_groups)
+        if reason_changed:
+            logger.warning(f'Fixed json in "{predicted_groups_file}": {reason_changed}.')
+
+        return json.loads(predicted_groups)
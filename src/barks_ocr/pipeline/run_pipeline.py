@@ -0,0 +1,643 @@
+# ruff: noqa: T201
+
+"""Run the OCR pipeline stages as one dependency graph over per-page artifacts.
+
+The stages, in dependency order, are
+
+    ocr -> predict -> groups -> final -> index
+
+where 'predict' is the Gemini predicted groups step (batch job + results, or
+live requests) and 'index' is the Whoosh index for the requested volumes.
+
+After a stage runs for a page, the content hash of the page's stage inputs and
+the stage's output files are saved in a per-volume state file. A page is stale
+for a stage when the hash of its current inputs no longer matches the saved
+one, or a saved output file has gone. Staleness is worked out again after each
+stage has run, from the files it actually wrote, so editing one page's
+restoration reruns just that page downstream, and a rerun that writes
+byte-identical output stops there.
+
+Pages with stage outputs but no saved state (made by the separate stage CLIs,
+or before there was any state) are taken as up to date the first time they are
+seen.
+
+Without ``--live``, stale 'predict' pages can't be run here: they are listed
+for ``barks-ocr-gemini-batch-job`` and ``barks-ocr-gemini-batch-results`` and
+their later stages wait for the new results.
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import typer
+from barks_fantagraphics.comic_book_info import is_non_comic_title
+from barks_fantagraphics.comics_consts import RESTORABLE_PAGE_TYPES
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.comics_utils import get_abbrev_path, get_ocr_type
+from barks_fantagraphics.ocr_file_paths import (
+    BATCH_JOBS_OUTPUT_DIR,
+    get_ocr_predicted_groups_filename,
+)
+from barks_fantagraphics.ocr_json_files import JsonFiles
+from comic_utils.common_typer_options import LogLevelArg, TitleArg, VolumesArg
+from intspan import intspan
+from loguru import logger
+
+from barks_ocr.cli_setup import get_comic_titles, init_logging
+from barks_ocr.pipeline.gemini_groups import DEFAULT_LIVE_CACHE_DIR, DEFAULT_LIVE_WORKERS
+from barks_ocr.utils.common import ProcessResult
+from barks_ocr.utils.gemini_live_client import DEFAULT_MAX_QPS, DEFAULT_MAX_TOKENS_PER_MINUTE
+
+if TYPE_CHECKING:
+    from barks_ocr.pipeline.gemini_grouper import GeminiAiGrouper
+    from barks_ocr.pipeline.gemini_live_groups import LiveAiPredictedGroups
+
+APP_LOGGING_NAME = "prun"
+
+STATE_VERSION = 1
+DEFAULT_STATE_DIR = Path.home() / ".cache" / "barks-ocr" / "pipeline-state"
+
+OCR_STAGE = "ocr"
+PREDICT_STAGE = "predict"
+GROUPS_STAGE = "groups"
+FINAL_STAGE = "final"
+INDEX_STAGE = "index"
+ALL_STAGES = [OCR_STAGE, PREDICT_STAGE, GROUPS_STAGE, FINAL_STAGE, INDEX_STAGE]
+
+# The index record is per volume, not per page.
+INDEX_RECORD_KEY = "*"
+
+# Set in 'main' for the threads of the live 'predict' stage.
+_LIVE_PREDICTED_GROUPS: "LiveAiPredictedGroups | None" = None
+# Made on first use in each 'groups' stage process.
+_GROUPER: "GeminiAiGrouper | None" = None
+
+
+@dataclass(frozen=True, slots=True)
+class PageArtifacts:
+    title: str
+    volume: int
+    volume_dirname: str
+    fanta_page: str
+    svg_file: Path
+    panel_segments_file: Path
+    ocr_types: tuple[str, ...]
+    ocr_files: tuple[Path, ...]
+    batch_results_dir: Path
+    predicted_groups_files: tuple[Path, ...]
+    prelim_groups_files: tuple[Path, ...]
+    final_groups_files: tuple[Path, ...]
+
+    @property
+    def key(self) -> str:
+        return f"{self.title}/{self.fanta_page}"
+
+    @property
+    def png_file(self) -> Path:
+        return Path(str(self.svg_file) + ".png")
+
+
+@dataclass(frozen=True)
+class PageStage:
+    name: str
+    get_inputs: Callable[[PageArtifacts], list[Path]]
+    get_outputs: Callable[[PageArtifacts], list[Path]]
+    run: Callable[[PageArtifacts], ProcessResult]
+    # A page only has a final groups file once one of its prelim files is marked final.
+    needs_all_outputs: bool = True
+    run_in_processes: bool = False
+
+
+class PipelineState:
+    """Per-volume record of the input hashes and outputs of every page stage run.
+
+    File content hashes are cached by path, size and mtime, so unchanged files
+    are not read again on later runs.
+    """
+
+    def __init__(self, state_file: Path) -> None:
+        self._state_file = state_file
+        self._file_hashes: dict[str, list[Any]] = {}
+        self._stages: dict[str, dict[str, dict[str, Any]]] = {}
+
+        if state_file.is_file():
+            state = json.loads(state_file.read_text())
+            if state.get("version") == STATE_VERSION:
+                self._file_hashes = state["file_hashes"]
+                self._stages = state["stages"]
+            else:
+                logger.warning(f'Ignoring old pipeline state file "{state_file}".')
+
+    def save(self) -> None:
+        self._state_file.parent.mkdir(parents=True, exist_ok=True)
+        state = {"version": STATE_VERSION, "file_hashes": self._file_hashes, "stages": self._stages}
+        temp_file = self._state_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(state, indent=1, sort_keys=True))
+        temp_file.replace(self._state_file)
+
+    def get_file_hash(self, file: Path) -> str | None:
+        """Return the file's content hash, or None if there is no such file."""
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            return None
+
+        cached = self._file_hashes.get(str(file))
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        with file.open("rb") as f:
+            file_hash = hashlib.file_digest(f, "sha256").hexdigest()
+        self._file_hashes[str(file)] = [stat.st_size, stat.st_mtime_ns, file_hash]
+
+        return file_hash
+
+    def get_files_hash(self, files: list[Path]) -> str:
+        """Hash the names and contents of 'files' together (missing files hash as missing)."""
+        files_hash = hashlib.sha256()
+        for file in files:
+            files_hash.update(f"{file.name}\0{self.get_file_hash(file) or '-'}\n".encode())
+        return files_hash.hexdigest()
+
+    def get_record(self, stage: str, key: str) -> dict[str, Any] | None:
+        return self._stages.get(stage, {}).get(key)
+
+    def set_record(self, stage: str, key: str, inputs_hash: str, outputs: list[Path]) -> None:
+        self._stages.setdefault(stage, {})[key] = {
+            "inputs": inputs_hash,
+            "outputs": [str(f) for f in outputs if f.is_file()],
+        }
+
+
+def get_page_artifacts(comics_database: ComicsDatabase, titles: list[str]) -> list[PageArtifacts]:
+    pages = []
+
+    for title in titles:
+        if is_non_comic_title(title):
+            logger.warning(f'Not a comic title "{title}" - skipping.')
+            continue
+
+        volume = comics_database.get_fanta_volume_int(title)
+        volume_dirname = comics_database.get_fantagraphics_volume_title(volume)
+        batch_results_dir = BATCH_JOBS_OUTPUT_DIR / volume_dirname
+
+        comic = comics_database.get_comic_book(title)
+        svg_files = comic.get_srce_restored_svg_story_files(RESTORABLE_PAGE_TYPES)
+        ocr_files = comic.get_srce_restored_ocr_raw_story_files(RESTORABLE_PAGE_TYPES)
+        panel_segments_files = comic.get_srce_panel_segments_files(RESTORABLE_PAGE_TYPES)
+        json_files = JsonFiles(comics_database, title)
+
+        for svg_file, ocr_file, panel_segments_file in zip(
+            svg_files, ocr_files, panel_segments_files, strict=True
+        ):
+            fanta_page = Path(svg_file).stem
+            ocr_types = tuple(get_ocr_type(f) for f in ocr_file)
+            json_files.set_ocr_file(ocr_file)
+
+            pages.append(
+                PageArtifacts(
+                    title=title,
+                    volume=volume,
+                    volume_dirname=volume_dirname,
+                    fanta_page=fanta_page,
+                    svg_file=Path(svg_file),
+                    panel_segments_file=Path(panel_segments_file),
+                    ocr_types=ocr_types,
+                    ocr_files=tuple(ocr_file),
+                    batch_results_dir=batch_results_dir,
+                    predicted_groups_files=tuple(
+                        batch_results_dir / get_ocr_predicted_groups_filename(fanta_page, t)
+                        for t in ocr_types
+                    ),
+                    prelim_groups_files=tuple(json_files.ocr_prelim_groups_json_file),
+                    final_groups_files=tuple(json_files.ocr_final_groups_json_file),
+                )
+            )
+
+    return pages
+
+
+# ── Stage runners ─────────────────────────────────────────────────────────────
+
+
+def _run_ocr(page: PageArtifacts) -> ProcessResult:
+    # Loads paddle and easyocr - only import when there is OCR to do.
+    from barks_ocr.pipeline.batch_ocr import ocr_comic_page  # noqa: PLC0415
+
+    # 'ocr_comic_page' keeps existing OCR files, and these ones are stale, so OCR into
+    # same-named files in a scratch dir and only replace the old files if that works.
+    out_dir = page.ocr_files[0].parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=out_dir, prefix=".ocr-") as scratch_dir:
+        scratch_files = tuple(Path(scratch_dir) / f.name for f in page.ocr_files)
+        result = ocr_comic_page(Path(scratch_dir), page.svg_file, scratch_files)
+        if result == ProcessResult.SUCCESS:
+            for scratch_file, ocr_file in zip(scratch_files, page.ocr_files, strict=True):
+                scratch_file.replace(ocr_file)
+
+    return result
+
+
+def _run_predict(page: PageArtifacts) -> ProcessResult:
+    from barks_ocr.pipeline.gemini_batch_job import (  # noqa: PLC0415
+        assign_ids_to_ocr_boxes,
+        get_ocr_data,
+    )
+
+    assert _LIVE_PREDICTED_GROUPS is not None
+
+    page.batch_results_dir.mkdir(parents=True, exist_ok=True)
+    for ocr_type, ocr_file in zip(page.ocr_types, page.ocr_files, strict=True):
+        ocr_bound_ids = assign_ids_to_ocr_boxes(get_ocr_data(ocr_file))
+        # The page's predicted groups file is stale, so don't read it back.
+        _LIVE_PREDICTED_GROUPS.fetch(
+            page.fanta_page, ocr_type, page.batch_results_dir, ocr_bound_ids, page.png_file
+        )
+
+    return ProcessResult.SUCCESS
+
+
+def _get_grouper() -> "GeminiAiGrouper":
+    from barks_ocr.pipeline.gemini_grouper import GeminiAiGrouper  # noqa: PLC0415
+    from barks_ocr.pipeline.gemini_groups import get_ai_predicted_groups  # noqa: PLC0415
+
+    global _GROUPER  # noqa: PLW0603
+    if _GROUPER is None:
+        _GROUPER = GeminiAiGrouper(None, get_ai_predicted_groups)
+    return _GROUPER
+
+
+def _run_groups(page: PageArtifacts) -> ProcessResult:
+    grouper = _get_grouper()
+
+    result = ProcessResult.SUCCESS
+    for ocr_type, ocr_file, prelim_groups_file in zip(
+        page.ocr_types, page.ocr_files, page.prelim_groups_files, strict=True
+    ):
+        prelim_groups_file.parent.mkdir(parents=True, exist_ok=True)
+        page_result = grouper.make_groups_for_page(
+            page.svg_file,
+            ocr_file,
+            ocr_type,
+            page.batch_results_dir,
+            page.panel_segments_file,
+            prelim_groups_file.parent,
+            force=True,
+        )
+        if page_result == ProcessResult.FAILURE:
+            result = ProcessResult.FAILURE
+
+    return result
+
+
+def _run_final(page: PageArtifacts) -> ProcessResult:
+    from barks_ocr.pipeline.final_groups import (  # noqa: PLC0415
+        make_final_gemini_ai_groups_for_page,
+    )
+
+    page.final_groups_files[0].parent.mkdir(parents=True, exist_ok=True)
+    assert len(page.prelim_groups_files) == 2  # noqa: PLR2004
+    assert len(page.final_groups_files) == 2  # noqa: PLR2004
+
+    return make_final_gemini_ai_groups_for_page(
+        (page.prelim_groups_files[0], page.prelim_groups_files[1]),
+        (page.final_groups_files[0], page.final_groups_files[1]),
+        f"{page.title}, {page.fanta_page}",
+    )
+
+
+def _run_page_stage(run: Callable[[PageArtifacts], ProcessResult], page: PageArtifacts) -> Any:  # noqa: ANN401
+    # noinspection PyBroadException
+    try:
+        return run(page)
+    except Exception:  # noqa: BLE001
+        logger.exception(f'Could not process page "{page.key}":')
+        return ProcessResult.FAILURE
+
+
+PAGE_STAGES = [
+    PageStage(
+        OCR_STAGE,
+        get_inputs=lambda p: [p.png_file],
+        get_outputs=lambda p: list(p.ocr_files),
+        run=_run_ocr,
+        run_in_processes=True,
+    ),
+    PageStage(
+        PREDICT_STAGE,
+        get_inputs=lambda p: [p.png_file, *p.ocr_files],
+        get_outputs=lambda p: list(p.predicted_groups_files),
+        run=_run_predict,
+    ),
+    PageStage(
+        GROUPS_STAGE,
+        get_inputs=lambda p: [*p.ocr_files, *p.predicted_groups_files, p.panel_segments_file],
+        get_outputs=lambda p: list(p.prelim_groups_files),
+        run=_run_groups,
+        run_in_processes=True,
+    ),
+    PageStage(
+        FINAL_STAGE,
+        get_inputs=lambda p: list(p.prelim_groups_files),
+        get_outputs=lambda p: list(p.final_groups_files),
+        run=_run_final,
+        needs_all_outputs=False,
+    ),
+]
+
+
+# ── Planning and running ──────────────────────────────────────────────────────
+
+
+class PipelineRunner:
+    def __init__(
+        self,
+        pages: list[PageArtifacts],
+        state_dir: Path,
+        stage_workers: dict[str, int],
+        live: bool,
+        dry_run: bool,
+    ) -> None:
+        self._pages = pages
+        self._stage_workers = stage_workers
+        self._live = live
+        self._dry_run = dry_run
+
+        self._states = {
+            dirname: PipelineState(state_dir / f"{dirname}.json")
+            for dirname in sorted({page.volume_dirname for page in pages})
+        }
+        # Pages (re)run, or to be run in a dry run, by an earlier stage.
+        self._rerun_keys: set[str] = set()
+        # Pages an earlier stage could not run - their later stages have to wait.
+        self._blocked_keys: set[str] = set()
+
+    def run_page_stages(self, until_stage: str) -> int:
+        """Run every page stage up to 'until_stage' for the stale pages; return the failures."""
+        num_failures = 0
+
+        for stage in PAGE_STAGES:
+            stale_pages = self._get_stale_pages(stage)
+            logger.info(f'Stage "{stage.name}": {len(stale_pages)} stale pages.')
+
+            if stale_pages and stage.name == PREDICT_STAGE and not self._live:
+                self._report_predict_needs_batch(stale_pages)
+            elif self._dry_run:
+                for page in stale_pages:
+                    print(f"  {stage.name:<8} {page.key}")
+                self._rerun_keys.update(page.key for page in stale_pages)
+            else:
+                num_failures += self._run_stage(stage, stale_pages)
+                self._save_states()
+
+            if stage.name == until_stage:
+                break
+
+        return num_failures
+
+    def run_index_stage(
+        self, comics_database: ComicsDatabase, volumes: list[int], ocr_index: int
+    ) -> int:
+        """Update the Whoosh index for 'volumes' if any of their groups files changed."""
+        # The index is built from both the prelim and the final groups files.
+        volume_files: dict[str, list[Path]] = {dirname: [] for dirname in self._states}
+        for page in self._pages:
+            volume_files[page.volume_dirname].extend(
+                [*page.prelim_groups_files, *page.final_groups_files]
+            )
+
+        volume_hashes = {
+            dirname: self._states[dirname].get_files_hash(files)
+            for dirname, files in volume_files.items()
+        }
+        stale_volumes = [
+            dirname
+            for dirname, files_hash in volume_hashes.items()
+            if self._is_index_stale(dirname, files_hash)
+        ]
+        if not stale_volumes:
+            logger.info(f'Stage "{INDEX_STAGE}": index is up to date.')
+            return 0
+
+        logger.info(f'Stage "{INDEX_STAGE}": changed volumes: {", ".join(stale_volumes)}.')
+        if self._dry_run:
+            print(f"  {INDEX_STAGE:<8} volumes {intspan(volumes)}")
+            return 0
+
+        from barks_ocr.pipeline.whoosh_index import build_index  # noqa: PLC0415
+
+        # noinspection PyBroadException
+        try:
+            build_index(comics_database, volumes, ocr_index, incremental=True)
+        except Exception:  # noqa: BLE001
+            logger.exception(f"Could not build the index for volumes {intspan(volumes)}:")
+            return 1
+
+        for dirname, files_hash in volume_hashes.items():
+            self._states[dirname].set_record(INDEX_STAGE, INDEX_RECORD_KEY, files_hash, [])
+        self._save_states()
+
+        return 0
+
+    def _is_index_stale(self, volume_dirname: str, files_hash: str) -> bool:
+        if self._dry_run and any(
+            page.key in self._rerun_keys
+            for page in self._pages
+            if page.volume_dirname == volume_dirname
+        ):
+            return True
+
+        record = self._states[volume_dirname].get_record(INDEX_STAGE, INDEX_RECORD_KEY)
+        if record is None:
+            # Take an existing index as up to date the first time it's seen.
+            self._states[volume_dirname].set_record(INDEX_STAGE, INDEX_RECORD_KEY, files_hash, [])
+            return False
+
+        return record["inputs"] != files_hash
+
+    def _get_stale_pages(self, stage: PageStage) -> list[PageArtifacts]:
+        stale_pages = []
+
+        for page in self._pages:
+            if page.key in self._blocked_keys:
+                continue
+            if self._dry_run and page.key in self._rerun_keys:
+                # Can't hash outputs a dry run has not made.
+                stale_pages.append(page)
+                continue
+
+            missing_inputs = [f for f in stage.get_inputs(page) if not f.is_file()]
+            if missing_inputs:
+                logger.warning(
+                    f'Stage "{stage.name}", page "{page.key}": missing input'
+                    f' "{get_abbrev_path(missing_inputs[0])}" - skipping page.'
+                )
+                self._blocked_keys.add(page.key)
+                continue
+
+            if self._is_page_stale(stage, page):
+                stale_pages.append(page)
+
+        return stale_pages
+
+    def _is_page_stale(self, stage: PageStage, page: PageArtifacts) -> bool:
+        state = self._states[page.volume_dirname]
+        inputs_hash = state.get_files_hash(stage.get_inputs(page))
+        record = state.get_record(stage.name, page.key)
+
+        if record is None:
+            outputs = stage.get_outputs(page)
+            have_outputs = (
+                all(f.is_file() for f in outputs)
+                if stage.needs_all_outputs
+                else any(f.is_file() for f in outputs)
+            )
+            if have_outputs and page.key not in self._rerun_keys:
+                # Made outside this tool - take it as up to date.
+                state.set_record(stage.name, page.key, inputs_hash, outputs)
+                return False
+            return True
+
+        return record["inputs"] != inputs_hash or not all(
+            Path(f).is_file() for f in record["outputs"]
+        )
+
+    def _run_stage(self, stage: PageStage, pages: list[PageArtifacts]) -> int:
+        if not pages:
+            return 0
+
+        workers = min(self._stage_workers[stage.name], len(pages))
+        logger.info(f'Running stage "{stage.name}" on {len(pages)} pages with {workers} workers...')
+
+        # Inputs don't change while the stage runs, so hash them first.
+        inputs_hashes = {
+            page.key: self._states[page.volume_dirname].get_files_hash(stage.get_inputs(page))
+            for page in pages
+        }
+
+        num_failures = 0
+        with self._get_executor(stage, workers) as executor:
+            futures = {executor.submit(_run_page_stage, stage.run, page): page for page in pages}
+            for future in as_completed(futures):
+                page = futures[future]
+                if future.result() == ProcessResult.FAILURE:
+                    logger.error(f'Stage "{stage.name}" failed for page "{page.key}".')
+                    self._blocked_keys.add(page.key)
+                    num_failures += 1
+                    continue
+
+                self._states[page.volume_dirname].set_record(
+                    stage.name, page.key, inputs_hashes[page.key], stage.get_outputs(page)
+                )
+                self._rerun_keys.add(page.key)
+
+        return num_failures
+
+    @staticmethod
+    def _get_executor(stage: PageStage, workers: int) -> Executor:
+        if stage.run_in_processes and workers > 1:
+            return ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        return ThreadPoolExecutor(max_workers=workers)
+
+    def _report_predict_needs_batch(self, stale_pages: list[PageArtifacts]) -> None:
+        logger.warning(
+            f"{len(stale_pages)} pages need new Gemini predicted groups. Rerun with '--live',"
+            f" or delete their predicted groups files and run 'barks-ocr-gemini-batch-job'"
+            f" then 'barks-ocr-gemini-batch-results'."
+        )
+        for page in stale_pages:
+            print(f"  {PREDICT_STAGE:<8} {page.key} (needs Gemini results)")
+            self._blocked_keys.add(page.key)
+
+    def _save_states(self) -> None:
+        for state in self._states.values():
+            state.save()
+
+
+app = typer.Typer()
+
+
+@app.command(help="Run the stale parts of the OCR pipeline, from OCR to the Whoosh index")
+def main(  # noqa: PLR0913
+    volumes_str: VolumesArg = "",
+    title_str: TitleArg = "",
+    until: str = typer.Option(INDEX_STAGE, help=f"Last stage to run: {', '.join(ALL_STAGES)}"),
+    dry_run: bool = typer.Option(default=False, help="Only list the stale pages per stage"),
+    live: bool = typer.Option(
+        default=False, help="Get stale Gemini predicted groups with live requests"
+    ),
+    ocr_workers: int = typer.Option(1, help="Concurrent OCR pages (processes)"),
+    predict_workers: int = typer.Option(
+        DEFAULT_LIVE_WORKERS, help="Concurrent live Gemini pages (threads)"
+    ),
+    groups_workers: int = typer.Option(
+        os.cpu_count() or 1, help="Concurrent prelim grouping pages (processes)"
+    ),
+    final_workers: int = typer.Option(4, help="Concurrent final groups pages (threads)"),
+    max_qps: float = typer.Option(DEFAULT_MAX_QPS, help="Max live Gemini requests per second"),
+    max_tokens_per_minute: int = typer.Option(
+        DEFAULT_MAX_TOKENS_PER_MINUTE, help="Max live Gemini tokens per minute"
+    ),
+    live_cache_dir: Path = typer.Option(  # noqa: B008
+        DEFAULT_LIVE_CACHE_DIR, help="Disk cache for live Gemini responses"
+    ),
+    state_dir: Path = typer.Option(  # noqa: B008
+        DEFAULT_STATE_DIR, help="Directory for the per-volume pipeline state files"
+    ),
+    ocr_index: int = typer.Option(1, help="OCR type the Whoosh index is built from"),
+    log_level_str: LogLevelArg = "INFO",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "run-pipeline.log", log_level_str)
+
+    if until not in ALL_STAGES:
+        msg = f'Unknown stage "{until}". Expected one of: {", ".join(ALL_STAGES)}.'
+        raise typer.BadParameter(msg)
+    stage_workers = {
+        OCR_STAGE: ocr_workers,
+        PREDICT_STAGE: predict_workers,
+        GROUPS_STAGE: groups_workers,
+        FINAL_STAGE: final_workers,
+    }
+    if any(workers < 1 for workers in stage_workers.values()):
+        msg = "Stage workers must be >= 1."
+        raise typer.BadParameter(msg)
+
+    comics_database, titles = get_comic_titles(volumes_str, title_str)
+    pages = get_page_artifacts(comics_database, titles)
+
+    if live and not dry_run:
+        from barks_ocr.pipeline.gemini_groups import (  # noqa: PLC0415
+            make_live_ai_predicted_groups,
+        )
+
+        global _LIVE_PREDICTED_GROUPS  # noqa: PLW0603
+        _LIVE_PREDICTED_GROUPS = make_live_ai_predicted_groups(
+            max_qps, max_tokens_per_minute, live_cache_dir, ""
+        )
+
+    runner = PipelineRunner(pages, state_dir, stage_workers, live, dry_run)
+    num_failures = runner.run_page_stages(until)
+
+    if until == INDEX_STAGE:
+        volumes = list(intspan(volumes_str))
+        if volumes:
+            num_failures += runner.run_index_stage(comics_database, volumes, ocr_index)
+        else:
+            # The index is built per volume set - a lone title can't say which one.
+            logger.info(f'No volumes given - not running the "{INDEX_STAGE}" stage.')
+
+    if num_failures > 0:
+        logger.error(f"There were {num_failures} failures.")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,232 @@
+"""Per-volume cache of the prelim groups JSON of every page, for read-only checks.
+
+``SpeechGroups`` opens and parses each prelim groups file of a title, and builds
+its speech objects, every time a title is asked for, so a check of a whole
+volume is dominated by reading a few thousand small files. A speech corpus
+keeps the JSON text of all the prelim groups files of a volume in one
+uncompressed Arrow IPC file in ``~/.cache/barks-ocr/speech-corpus``, which is
+memory-mapped on load.
+
+Each row is stamped with its file's size and mtime. On load the prelim files of
+the volume are stat'ed, and only new or changed files are read again (removed
+ones are dropped), so the corpus is rewritten only when a page has changed.
+
+``SpeechCorpus.get_speech_page_groups`` returns ``CorpusPageGroup``s with the
+same page attributes and ``speech_page_json`` as a ``SpeechPageGroup``. They
+can't renumber or save groups, so anything that fixes files still needs
+``SpeechGroups``.
+
+They also have no ``speech_groups`` of ``SpeechText``s - those are made from
+the JSON by ``barks_fantagraphics``, and a copy made here could drift from
+what the index and the editor see. So only checks that work on the raw JSON
+use the corpus, which is just ``barks-ocr-check``. The tools that need
+``SpeechText``s (``compare``, ``florence_check``, ``annotate`` and the entity
+tagging in ``whoosh_index``) still use ``SpeechGroups``.
+
+The final groups files of a volume can be kept the same way ('final=True'),
+for the Parquet groups export.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+from barks_fantagraphics.barks_titles import ENUM_TO_STR_TITLE, Titles
+from barks_fantagraphics.comics_consts import RESTORABLE_PAGE_TYPES
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.comics_helpers import get_titles
+from barks_fantagraphics.comics_utils import get_ocr_type
+from barks_fantagraphics.ocr_json_files import JsonFiles
+from barks_fantagraphics.speech_groupers import OcrTypes
+from loguru import logger
+
+SPEECH_CORPUS_VERSION = 1
+DEFAULT_SPEECH_CORPUS_DIR = Path.home() / ".cache" / "barks-ocr" / "speech-corpus"
+
+CORPUS_SCHEMA = {
+    "title": pl.String,
+    "fanta_page": pl.String,
+    "ocr_type": pl.String,
+    "file": pl.String,
+    "size": pl.Int64,
+    "mtime_ns": pl.Int64,
+    "page_json": pl.String,
+}
+
+
+@dataclass(frozen=True)
+class CorpusPageGroup:
+    """The read-only part of a ``SpeechPageGroup``."""
+
+    fanta_vol: int
+    fanta_page: str
+    ocr_index: OcrTypes
+    ocr_prelim_groups_json_file: Path
+    speech_page_json: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class _GroupsFile:
+    title: str
+    fanta_page: str
+    ocr_type: str
+    file: Path
+    size: int
+    mtime_ns: int
+
+
+def get_speech_corpus_file(
+    volume: int, corpus_dir: Path = DEFAULT_SPEECH_CORPUS_DIR, *, final: bool = False
+) -> Path:
+    stage = "-final" if final else ""
+    return corpus_dir / f"vol-{volume:02d}{stage}-v{SPEECH_CORPUS_VERSION}.arrow"
+
+
+def _get_groups_files(
+    comics_database: ComicsDatabase, volume: int, final: bool
+) -> list[_GroupsFile]:
+    """Return the prelim (or final) groups files of 'volume' that exist, with size and mtime."""
+    groups_files = []
+
+    for title in get_titles(comics_database, [volume], "", exclude_non_comics=True):
+        comic = comics_database.get_comic_book(title)
+        json_files = JsonFiles(comics_database, title)
+        for ocr_file in comic.get_srce_restored_ocr_raw_story_files(RESTORABLE_PAGE_TYPES):
+            json_files.set_ocr_file(ocr_file)
+            page_groups_files = (
+                json_files.ocr_final_groups_json_file
+                if final
+                else json_files.ocr_prelim_groups_json_file
+            )
+            for ocr_type_file, groups_file in zip(ocr_file, page_groups_files, strict=True):
+                try:
+                    stat = groups_file.stat()
+                except FileNotFoundError:
+                    continue
+                groups_files.append(
+                    _GroupsFile(
+                        title,
+                        json_files.page,
+                        get_ocr_type(ocr_type_file).name,
+                        groups_file,
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                    )
+                )
+
+    return groups_files
+
+
+def _read_corpus(corpus_file: Path) -> pl.DataFrame | None:
+    if not corpus_file.is_file():
+        return None
+    try:
+        return pl.read_ipc(corpus_file)
+    except (OSError, pl.exceptions.PolarsError) as e:
+        logger.warning(f'Could not read speech corpus "{corpus_file}" - remaking it: {e}')
+        return None
+
+
+def _write_corpus(corpus_file: Path, corpus: pl.DataFrame) -> None:
+    corpus_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = corpus_file.with_suffix(f".{os.getpid()}.tmp")
+    corpus.write_ipc(temp_file, compression="uncompressed")
+    temp_file.replace(corpus_file)
+
+
+def load_volume_corpus(
+    comics_database: ComicsDatabase,
+    volume: int,
+    corpus_dir: Path = DEFAULT_SPEECH_CORPUS_DIR,
+    *,
+    final: bool = False,
+) -> pl.DataFrame:
+    """Return the speech corpus of 'volume', first bringing it up to date with its groups files."""
+    corpus_file = get_speech_corpus_file(volume, corpus_dir, final=final)
+    stage = "final" if final else "prelim"
+    old_corpus = _read_corpus(corpus_file)
+
+    old_rows: dict[str, tuple[int, int, str]] = {}
+    if old_corpus is not None:
+        old_rows = {
+            file: (size, mtime_ns, page_json)
+            for file, size, mtime_ns, page_json in old_corpus.select(
+                "file", "size", "mtime_ns", "page_json"
+            ).iter_rows()
+        }
+
+    groups_files = _get_groups_files(comics_database, volume, final)
+    page_jsons = []
+    num_read = 0
+    for groups_file in groups_files:
+        old_row = old_rows.get(str(groups_file.file))
+        if old_row is not None and old_row[:2] == (groups_file.size, groups_file.mtime_ns):
+            page_jsons.append(old_row[2])
+        else:
+            page_jsons.append(groups_file.file.read_text())
+            num_read += 1
+
+    num_removed = len(old_rows.keys() - {str(f.file) for f in groups_files})
+    if old_corpus is not None and num_read == 0 and num_removed == 0:
+        logger.debug(f"Speech corpus of volume {volume} ({stage}) is up to date.")
+        return old_corpus
+
+    corpus = pl.DataFrame(
+        {
+            "title": [f.title for f in groups_files],
+            "fanta_page": [f.fanta_page for f in groups_files],
+            "ocr_type": [f.ocr_type for f in groups_files],
+            "file": [str(f.file) for f in groups_files],
+            "size": [f.size for f in groups_files],
+            "mtime_ns": [f.mtime_ns for f in groups_files],
+            "page_json": page_jsons,
+        },
+        schema=CORPUS_SCHEMA,
+    )
+    _write_corpus(corpus_file, corpus)
+    logger.info(
+        f"Speech corpus of volume {volume}: read {num_read} of {len(groups_files)}"
+        f" {stage} groups files, dropped {num_removed}."
+    )
+
+    return corpus
+
+
+class SpeechCorpus:
+    """``SpeechGroups.get_speech_page_groups`` for read-only use, from the volume corpora."""
+
+    def __init__(
+        self, comics_database: ComicsDatabase, corpus_dir: Path = DEFAULT_SPEECH_CORPUS_DIR
+    ) -> None:
+        self._comics_database = comics_database
+        self._corpus_dir = corpus_dir
+        self._volume_corpora: dict[int, pl.DataFrame] = {}
+
+    def update_volumes(self, volumes: set[int]) -> None:
+        """Bring the corpora of 'volumes' up to date now, rather than on first use."""
+        for volume in sorted(volumes):
+            self._get_volume_corpus(volume)
+
+    def _get_volume_corpus(self, volume: int) -> pl.DataFrame:
+        if volume not in self._volume_corpora:
+            self._volume_corpora[volume] = load_volume_corpus(
+                self._comics_database, volume, self._corpus_dir
+            )
+        return self._volume_corpora[volume]
+
+    def get_speech_page_groups(self, title: Titles) -> list[CorpusPageGroup]:
+        title_str = ENUM_TO_STR_TITLE[title]
+        volume = self._comics_database.get_fanta_volume_int(title_str)
+
+        title_corpus = self._get_volume_corpus(volume).filter(pl.col("title") == title_str)
+        return [
+            CorpusPageGroup(
+                volume, fanta_page, OcrTypes[ocr_type], Path(file), json.loads(page_json)
+            )
+            for fanta_page, ocr_type, file, page_json in title_corpus.select(
+                "fanta_page", "ocr_type", "file", "page_json"
+            ).iter_rows()
+        ]
@@ -0,0 +1,176 @@
+"""OCR-error tolerant term lookup through a character trigram side index.
+
+``SearchEngine.find_words`` only finds exact analyzed terms, so words with
+leftover OCR errors ("SCR00GE") are never found, and a Whoosh fuzzy query over
+the whole index is slow. A ``FuzzyTermIndex`` maps each character trigram of
+the index's content terms to the terms that have it. The candidates for a word
+are the terms sharing enough of its trigrams to be within 'max_edits' edits
+(each edit changes at most three trigrams), and only those are checked with an
+edit distance. Short words get fewer edits, as they have too many near
+neighbours otherwise (and their trigrams can't rule many terms out). A word
+that was split in two by the OCR ("SCRO OGE") is found as a pair of terms that
+join to the word.
+
+The terms and their document frequencies are kept with the index state,
+stamped with the fingerprint of the index they were read from, and read again
+from the term dictionary when that changes. (Not the generation - a full
+rebuild is generation 1 again.) The trigram map is made from them on load.
+"""
+
+import json
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+from whoosh import index
+
+from barks_ocr.pipeline.whoosh_incremental import DEFAULT_INDEX_STATE_DIR
+from barks_ocr.pipeline.whoosh_term_stats import IndexTermStats
+from barks_ocr.utils.index_paths import get_index_fingerprint
+
+FUZZY_INDEX_VERSION = 2
+DEFAULT_MAX_EDITS = 2
+CHARS_PER_EDIT = 3
+MIN_SPLIT_PART_LEN = 2
+_PAD = "$"
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    term: str  # "a b" for a word split in two
+    edits: int
+    doc_freq: int
+
+
+def get_fuzzy_index_file(volumes_index_dir: Path) -> Path:
+    return DEFAULT_INDEX_STATE_DIR / f"{volumes_index_dir.name}-trigrams.json"
+
+
+def _get_trigrams(term: str) -> set[str]:
+    padded = f"{_PAD}{_PAD}{term}{_PAD}"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def get_max_edits(word: str, max_edits: int) -> int:
+    """Return the edits allowed for 'word' - one per 'CHARS_PER_EDIT' chars after the first."""
+    return min(max_edits, (len(word) - 1) // CHARS_PER_EDIT)
+
+
+def get_edit_distance(a: str, b: str, max_edits: int) -> int | None:
+    """Return the Levenshtein distance of 'a' and 'b', or None if it's over 'max_edits'."""
+    if abs(len(a) - len(b)) > max_edits:
+        return None
+
+    prev_row = list(range(len(b) + 1))
+    for i, a_ch in enumerate(a, 1):
+        row = [i]
+        for j, b_ch in enumerate(b, 1):
+            row.append(min(prev_row[j] + 1, row[j - 1] + 1, prev_row[j - 1] + (a_ch != b_ch)))
+        if min(row) > max_edits:
+            return None
+        prev_row = row
+
+    return prev_row[-1] if prev_row[-1] <= max_edits else None
+
+
+class FuzzyTermIndex:
+    def __init__(self, fingerprint: str, doc_freqs: dict[str, int]) -> None:
+        self.fingerprint = fingerprint
+        self._doc_freqs = doc_freqs
+        self._terms = sorted(doc_freqs)
+
+        self._trigram_terms: dict[str, list[int]] = defaultdict(list)
+        self._terms_by_len: dict[int, list[int]] = defaultdict(list)
+        for term_id, term in enumerate(self._terms):
+            for trigram in _get_trigrams(term):
+                self._trigram_terms[trigram].append(term_id)
+            self._terms_by_len[len(term)].append(term_id)
+
+    @classmethod
+    def load_or_build(cls, volumes_index_dir: Path) -> "FuzzyTermIndex":
+        """Load the side index of the index in 'volumes_index_dir', remaking it if it's stale."""
+        fingerprint = get_index_fingerprint(index.open_dir(volumes_index_dir))
+        index_file = get_fuzzy_index_file(volumes_index_dir)
+
+        if index_file.is_file():
+            saved = json.loads(index_file.read_text())
+            if (
+                saved.get("version") == FUZZY_INDEX_VERSION
+                and saved.get("fingerprint") == fingerprint
+            ):
+                return cls(fingerprint, saved["doc_freqs"])
+
+        term_stats = IndexTermStats(volumes_index_dir)
+        logger.info(f'Making the trigram index for "{volumes_index_dir}".')
+        fuzzy_index = cls(term_stats.fingerprint, term_stats.doc_freqs)
+        fuzzy_index.save(index_file)
+        return fuzzy_index
+
+    def save(self, index_file: Path) -> None:
+        data = {
+            "version": FUZZY_INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "doc_freqs": self._doc_freqs,
+        }
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = index_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(data))
+        temp_file.replace(index_file)
+
+    @property
+    def terms(self) -> list[str]:
+        return self._terms
+
+    @property
+    def num_terms(self) -> int:
+        return len(self._terms)
+
+    def _get_candidate_ids(self, word: str, max_edits: int) -> list[int]:
+        trigrams = _get_trigrams(word)
+        min_shared = len(trigrams) - 3 * max_edits
+        if min_shared <= 0:
+            # Too short for the trigrams to rule anything out - check every term of a near length.
+            return [
+                term_id
+                for length in range(len(word) - max_edits, len(word) + max_edits + 1)
+                for term_id in self._terms_by_len.get(length, [])
+            ]
+
+        shared = Counter(
+            term_id for trigram in trigrams for term_id in self._trigram_terms.get(trigram, [])
+        )
+        return [term_id for term_id, count in shared.items() if count >= min_shared]
+
+    def find(self, word: str, max_edits: int = DEFAULT_MAX_EDITS) -> list[FuzzyMatch]:
+        """Return the terms close to 'word', closest and most frequent first.
+
+        See ``get_max_edits`` for how close the terms must be.
+        """
+        max_edits = get_max_edits(word, max_edits)
+        matches: list[FuzzyMatch] = []
+        for term_id in self._get_candidate_ids(word, max_edits):
+            term = self._terms[term_id]
+            edits = get_edit_distance(word, term, max_edits)
+            if edits is not None:
+                matches.append(FuzzyMatch(term, edits, self._doc_freqs[term]))
+
+        matches.extend(self._find_split(word))
+
+        return sorted(matches, key=lambda m: (m.edits, -m.doc_freq, m.term))
+
+    def _find_split(self, word: str) -> list[FuzzyMatch]:
+        """Return the pairs of terms that join to make 'word'."""
+        matches = []
+        for i in range(MIN_SPLIT_PART_LEN, len(word) - MIN_SPLIT_PART_LEN + 1):
+            left, right = word[:i], word[i:]
+            if left in self._doc_freqs and right in self._doc_freqs:
+                doc_freq = min(self._doc_freqs[left], self._doc_freqs[right])
+                matches.append(FuzzyMatch(f"{left} {right}", 1, doc_freq))
+        return matches
+
+
+def save_fuzzy_term_index(volumes_index_dir: Path) -> None:
+    """Bring the trigram side index of the index in 'volumes_index_dir' up to date."""
+    fuzzy_index = FuzzyTermIndex.load_or_build(volumes_index_dir)
+    logger.info(f"Trigram index is up to date ({fuzzy_index.num_terms} terms).")
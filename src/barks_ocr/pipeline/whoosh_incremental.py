@@ -0,0 +1,298 @@
+"""Incremental updates of a Whoosh volumes index from per-page content hashes.
+
+A page's hash covers everything about its speech groups that goes into the
+index (group ids, text, type, panel number) plus the merged entities of each
+group. The hashes of the pages last written to the index are kept in a state
+file together with the fingerprint of the index they were written to.
+
+An incremental update only touches pages whose hash changed (or that were
+added or removed). The documents themselves are made by
+``SearchEngineCreator``, which only indexes whole volumes, so it is run over
+the volumes with changed pages with the writer's ``add_document`` swapped for
+one that keeps the fields of the changed pages' documents and drops the rest -
+nothing is analyzed or written for the other pages. The changed pages' old
+documents are then deleted from the index and the kept documents added in
+their place, all in one commit with the given segment merge policy. If the
+index or its state is missing, or the index was written by something else
+since the state was saved, the caller falls back to a full build.
+"""
+
+import hashlib
+import json
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.speech_groupers import OcrTypes, SpeechGroups
+from barks_fantagraphics.whoosh_search_engine import SearchEngineCreator
+from loguru import logger
+from whoosh import fields, index, query, writing
+from whoosh.writing import IndexWriter, SegmentWriter
+
+from barks_ocr.pipeline.entity_store import EntityProvider
+from barks_ocr.utils.index_paths import get_index_fingerprint
+
+INDEX_STATE_VERSION = 2
+DEFAULT_INDEX_STATE_DIR = Path.home() / ".cache" / "barks-ocr" / "whoosh-index"
+
+# Stored fields of 'SearchEngineCreator' documents that identify the page a
+# document came from. Without them there is no incremental update.
+PAGE_KEY_FIELDS = ("title", "fanta_page")
+
+MERGE_POLICIES = {
+    "small": writing.MERGE_SMALL,
+    "none": writing.NO_MERGE,
+    "optimize": writing.OPTIMIZE,
+}
+DEFAULT_MERGE_POLICY = "small"
+
+# (title string, comic book title, fanta page) - documents may be stored under
+# either title, so both are kept.
+type PageKey = tuple[str, str, str]
+type PageHashes = dict[int, dict[PageKey, str]]
+
+
+def get_index_state_file(volumes_index_dir: Path) -> Path:
+    return DEFAULT_INDEX_STATE_DIR / f"{volumes_index_dir.name}.json"
+
+
+def get_page_hashes(
+    comics_database: ComicsDatabase,
+    volumes: list[int],
+    ocr_type: OcrTypes,
+    entity_provider: EntityProvider,
+) -> PageHashes:
+    """Return the content hash of every indexed page in 'volumes'."""
+    all_speech_groups = SpeechGroups(comics_database)
+
+    page_hashes: PageHashes = {}
+    for volume in volumes:
+        volume_hashes = page_hashes.setdefault(volume, {})
+
+        titles = comics_database.get_configured_titles_in_fantagraphics_volumes(
+            [volume], exclude_non_comics=True
+        )
+        for title_str, fanta_info in titles:
+            title = fanta_info.comic_book_info.title
+            for speech_page in all_speech_groups.get_speech_page_groups(title):
+                if speech_page.ocr_index != ocr_type:
+                    continue
+
+                page_hash = hashlib.sha256()
+                for group_id, speech_text in sorted(speech_page.speech_groups.items()):
+                    entities = entity_provider(title_str, speech_page.fanta_page, group_id)
+                    group_data = [
+                        group_id,
+                        str(speech_text.type),
+                        speech_text.panel_num,
+                        speech_text.raw_ai_text,
+                        speech_text.ai_text,
+                        sorted((str(k), sorted(v)) for k, v in entities.items() if v),
+                    ]
+                    page_hash.update(json.dumps(group_data).encode())
+
+                page_key = (title_str, str(title), speech_page.fanta_page)
+                volume_hashes[page_key] = page_hash.hexdigest()
+
+    return page_hashes
+
+
+class IndexState:
+    """The page hashes, by volume, last written to an index and its fingerprint then."""
+
+    def __init__(self, state_file: Path) -> None:
+        self._state_file = state_file
+        self.fingerprint: str | None = None
+        self.page_hashes: PageHashes = {}
+
+        if state_file.is_file():
+            state = json.loads(state_file.read_text())
+            if state.get("version") == INDEX_STATE_VERSION:
+                self.fingerprint = state["fingerprint"]
+                self.page_hashes = {
+                    int(volume): {(t, ct, p): h for t, ct, p, h in pages}
+                    for volume, pages in state["volumes"].items()
+                }
+            else:
+                logger.warning(f'Ignoring old index state file "{state_file}".')
+
+    def save(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        state = {
+            "version": INDEX_STATE_VERSION,
+            "fingerprint": fingerprint,
+            "volumes": {
+                str(volume): [[*key, h] for key, h in sorted(pages.items())]
+                for volume, pages in sorted(self.page_hashes.items())
+            },
+        }
+        self._state_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self._state_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(state))
+        temp_file.replace(self._state_file)
+
+    def clear(self) -> None:
+        """Forget the saved pages, so the next incremental update is a full build."""
+        self.fingerprint = None
+        self.page_hashes = {}
+        self._state_file.unlink(missing_ok=True)
+
+    def get_changed_pages(self, page_hashes: PageHashes) -> dict[int, set[PageKey]]:
+        """Return the pages, by volume, that were added, removed or changed."""
+        changed: dict[int, set[PageKey]] = {}
+        for volume, pages in page_hashes.items():
+            old_pages = self.page_hashes.get(volume, {})
+            volume_changed = {key for key, h in pages.items() if old_pages.get(key) != h}
+            volume_changed |= old_pages.keys() - pages.keys()
+            if volume_changed:
+                changed[volume] = volume_changed
+        return changed
+
+
+def update_index_pages(  # noqa: PLR0913
+    comics_database: ComicsDatabase,
+    volumes_index_dir: Path,
+    ocr_type: OcrTypes,
+    entity_provider: EntityProvider,
+    page_hashes: PageHashes,
+    index_state: IndexState,
+    merge_policy: str,
+) -> bool:
+    """Reindex only the changed pages and return False if a full build is needed instead."""
+    if not index.exists_in(volumes_index_dir):
+        logger.info(f'No index in "{volumes_index_dir}" - doing a full build.')
+        return False
+
+    ix = index.open_dir(volumes_index_dir)
+    if index_state.fingerprint != get_index_fingerprint(ix):
+        logger.info("The index has no saved page state for its contents - doing a full build.")
+        return False
+    stored_names = ix.schema.stored_names()
+    if not all(field in stored_names for field in PAGE_KEY_FIELDS):
+        logger.warning(
+            f"Index documents don't store {', '.join(PAGE_KEY_FIELDS)} - doing a full build."
+        )
+        return False
+
+    changed_pages = index_state.get_changed_pages(page_hashes)
+    if not changed_pages:
+        logger.info("The index is up to date.")
+        return True
+
+    doc_keys = _get_doc_keys(set().union(*changed_pages.values()))
+    rebuild_volumes = sorted(
+        v for v, pages in changed_pages.items() if pages & page_hashes[v].keys()
+    )
+    logger.info(
+        f"Reindexing {sum(len(p) for p in changed_pages.values())} changed pages"
+        f" from volumes {', '.join(str(v) for v in sorted(changed_pages))}."
+    )
+
+    documents = []
+    if rebuild_volumes:
+        documents = _get_page_documents(
+            comics_database, volumes_index_dir, ocr_type, entity_provider, rebuild_volumes, doc_keys
+        )
+        if not documents:
+            logger.warning("Got no documents for the changed pages - doing a full build.")
+            return False
+
+    writer = ix.writer()
+    num_deleted = _delete_page_docs(writer, doc_keys)
+    for document in documents:
+        writer.add_document(**document)
+    writer.commit(mergetype=MERGE_POLICIES[merge_policy])
+
+    logger.info(f"Replaced {num_deleted} index documents with {len(documents)}.")
+
+    for volume, pages in page_hashes.items():
+        index_state.page_hashes[volume] = pages
+    index_state.save(get_index_fingerprint(index.open_dir(volumes_index_dir)))
+
+    return True
+
+
+def save_full_build_state(
+    volumes_index_dir: Path, page_hashes: PageHashes, index_state: IndexState
+) -> None:
+    """Record the page hashes of a from-scratch build of the index."""
+    index_state.page_hashes = page_hashes
+    index_state.save(get_index_fingerprint(index.open_dir(volumes_index_dir)))
+
+
+def _get_doc_keys(pages: set[PageKey]) -> set[tuple[str, str]]:
+    doc_keys = set()
+    for title_str, title, fanta_page in pages:
+        doc_keys.add((title_str, fanta_page))
+        doc_keys.add((title, fanta_page))
+    return doc_keys
+
+
+def _get_doc_key(stored: dict) -> tuple[str, ...]:
+    return tuple(str(stored.get(field)) for field in PAGE_KEY_FIELDS)
+
+
+@contextmanager
+def _keep_page_documents(doc_keys: set[tuple[str, str]]) -> Iterator[list[dict[str, Any]]]:
+    """Make every whoosh writer keep the fields of the 'doc_keys' documents instead of indexing."""
+    documents: list[dict[str, Any]] = []
+
+    def add_document(_writer: SegmentWriter, **doc_fields: Any) -> None:  # noqa: ANN401
+        if _get_doc_key(doc_fields) in doc_keys:
+            documents.append(doc_fields)
+
+    segment_writer_add_document = SegmentWriter.add_document
+    SegmentWriter.add_document = add_document  # ty: ignore[invalid-assignment]
+    try:
+        yield documents
+    finally:
+        SegmentWriter.add_document = segment_writer_add_document  # ty: ignore[invalid-assignment]
+
+
+def _get_page_documents(  # noqa: PLR0913
+    comics_database: ComicsDatabase,
+    volumes_index_dir: Path,
+    ocr_type: OcrTypes,
+    entity_provider: EntityProvider,
+    volumes: list[int],
+    doc_keys: set[tuple[str, str]],
+) -> list[dict[str, Any]]:
+    """Return the 'doc_keys' documents' fields as ``SearchEngineCreator`` makes them."""
+    # The creator makes its own (here empty) index - keep it out of the real one.
+    with (
+        tempfile.TemporaryDirectory(dir=volumes_index_dir.parent) as scratch_dir,
+        _keep_page_documents(doc_keys) as documents,
+    ):
+        SearchEngineCreator(comics_database, Path(scratch_dir), ocr_type).index_volumes(
+            volumes, entity_provider=entity_provider
+        )
+
+    return documents
+
+
+def _delete_page_docs(writer: IndexWriter, doc_keys: set[tuple[str, str]]) -> int:
+    schema = writer.schema
+    if all(isinstance(schema[field], fields.ID) for field in PAGE_KEY_FIELDS):
+        return sum(
+            writer.delete_by_query(
+                query.And(
+                    [
+                        query.Term(field, value)
+                        for field, value in zip(PAGE_KEY_FIELDS, key, strict=True)
+                    ]
+                )
+            )
+            for key in doc_keys
+        )
+
+    # The page fields aren't indexed as is, so go by the stored fields.
+    num_deleted = 0
+    with writer.reader() as reader:
+        for docnum, stored in reader.iter_docs():
+            if _get_doc_key(stored) in doc_keys:
+                writer.delete_document(docnum)
+                num_deleted += 1
+    return num_deleted
@@ -2,11 +2,12 @@
 
 import json
 from collections import Counter, defaultdict
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
 import typer
 from barks_fantagraphics.comic_book_info import NON_COMIC_TITLES
-from barks_fantagraphics.comics_consts import BARKS_ROOT_DIR
 from barks_fantagraphics.comics_database import ComicsDatabase
 from barks_fantagraphics.entity_types import EntityType
 from barks_fantagraphics.speech_groupers import OCR_TYPE_DICT, OcrTypes, SpeechGroups
@@ -18,14 +19,28 @@ from barks_fantagraphics.whoosh_barks_terms import (
     CAPITALIZATION_MAP,
     FRAGMENTS_TO_SUPPRESS,
 )
-from barks_fantagraphics.whoosh_search_engine import SearchEngine, SearchEngineCreator, TitleDict
+from barks_fantagraphics.whoosh_search_engine import SearchEngine, TitleDict
 from comic_utils.common_typer_options import LogLevelArg, VolumesArg
 from intspan import intspan
 from loguru import logger
 
 from barks_ocr.cli_setup import init_logging
 from barks_ocr.pipeline.entity_store import get_merged_entity_provider, save_auto_entities
-from barks_ocr.pipeline.entity_tagger import EntityTagger
+from barks_ocr.pipeline.entity_tag_cache import DEFAULT_TAG_CACHE_FILE, CachedEntityTagger
+from barks_ocr.pipeline.entity_tagger import DEFAULT_TAG_BATCH_SIZE, EntityTagger
+from barks_ocr.pipeline.whoosh_fuzzy import save_fuzzy_term_index
+from barks_ocr.pipeline.whoosh_incremental import (
+    DEFAULT_MERGE_POLICY,
+    MERGE_POLICIES,
+    IndexState,
+    get_index_state_file,
+    get_page_hashes,
+    save_full_build_state,
+    update_index_pages,
+)
+from barks_ocr.pipeline.whoosh_parallel import build_index_parallel, get_volume_weights
+from barks_ocr.pipeline.whoosh_term_stats import IndexTermStats
+from barks_ocr.utils.index_paths import get_volumes_index_dir
 
 APP_LOGGING_NAME = "whoi"
 
@@ -33,30 +48,52 @@ APP_LOGGING_NAME = "whoi"
 def check_index_integrity(
     comics_database: ComicsDatabase, volumes: list[int], checks_output: Path | None
 ) -> None:
-    volumes_index_dir = BARKS_ROOT_DIR / "Compleat Barks Disney Reader/Reader Files/Indexes"
+    volumes_index_dir = get_volumes_index_dir(1)
     search_engine = SearchEngine(volumes_index_dir)
+    term_stats = IndexTermStats(volumes_index_dir)
 
     print("Checking CAPITALIZATION_MAP...")
-    check_capitalization_map(search_engine)
+    check_capitalization_map(search_engine, term_stats)
 
     print("Checking FRAGMENTS_TO_SUPPRESS...")
-    check_fragments_to_suppress(search_engine)
+    check_fragments_to_suppress(search_engine, term_stats)
 
     print("Checking ALL_CAPS...")
-    check_all_caps(search_engine)
+    check_all_caps(search_engine, term_stats)
 
     print("Checking BARKSIAN_EXTRA_TERMS...")
-    check_barksian_terms(search_engine)
+    check_barksian_terms(search_engine, term_stats)
 
     print("Checking all titles included in index...")
     check_all_titles_included(comics_database, search_engine, volumes)
 
     print("Checking cleaned terms...")
-    check_cleaned_terms(search_engine, checks_output)
+    check_cleaned_terms(search_engine, term_stats, checks_output)
 
     print()
 
 
+def _is_word_indexed(search_engine: SearchEngine, term_stats: IndexTermStats, word: str) -> bool:
+    term = term_stats.get_single_term(word)
+    if term is not None:
+        return term_stats.has_term(term)
+    return bool(search_engine.find_words(word))
+
+
+def _find_speech_texts(
+    search_engine: SearchEngine, term_stats: IndexTermStats, word: str
+) -> list[str]:
+    term = term_stats.get_single_term(word)
+    if term is not None:
+        return term_stats.get_texts_with_term(term)
+    return [
+        speech_info.speech_text
+        for ttl_info in search_engine.find_words(word).values()
+        for pg_info in ttl_info.fanta_pages.values()
+        for speech_info in pg_info.speech_info_list
+    ]
+
+
 def check_all_titles_included(
     comics_database: ComicsDatabase, search_engine: SearchEngine, volumes: list[int]
 ) -> None:
@@ -74,64 +111,60 @@ def check_all_titles_included(
             print(f'    "{title}"')
 
 
-def check_capitalization_map(search_engine: SearchEngine) -> None:
+def check_capitalization_map(search_engine: SearchEngine, term_stats: IndexTermStats) -> None:
     assert "ele-phant" in CAPITALIZATION_MAP
 
     for key, value in CAPITALIZATION_MAP.items():
-        found = search_engine.find_words(key)
-        if not found:
+        speech_texts = _find_speech_texts(search_engine, term_stats, key)
+        if not speech_texts:
             msg = f'"{key}" not found'
             raise ValueError(msg)
         if key.lower() == "ele-phant":  # special case
             continue
 
-        for ttl_info in found.values():
-            for pg_info in ttl_info.fanta_pages.values():
-                for speech_info in pg_info.speech_info_list:
-                    speech_lower = speech_info.speech_text.lower()
-                    speech_lower = speech_lower.replace("\u00ad\n", "")
-                    speech_lower = speech_lower.replace("-\n", "-")
-                    speech_lower = speech_lower.replace("\n", " ")
-                    speech_lower = speech_lower.replace("$crooge", "scrooge")
-                    if value.lower() not in speech_lower:
-                        msg = f'"{value.lower()}":\n{speech_lower}\n\n{speech_info.speech_text}'
-                        raise ValueError(msg)
+        for speech_text in speech_texts:
+            speech_lower = speech_text.lower()
+            speech_lower = speech_lower.replace("\u00ad\n", "")
+            speech_lower = speech_lower.replace("-\n", "-")
+            speech_lower = speech_lower.replace("\n", " ")
+            speech_lower = speech_lower.replace("$crooge", "scrooge")
+            if value.lower() not in speech_lower:
+                msg = f'"{value.lower()}":\n{speech_lower}\n\n{speech_text}'
+                raise ValueError(msg)
 
 
-def check_fragments_to_suppress(search_engine: SearchEngine) -> None:
+def check_fragments_to_suppress(search_engine: SearchEngine, term_stats: IndexTermStats) -> None:
     for key in FRAGMENTS_TO_SUPPRESS:
-        found = search_engine.find_words(key)
-        if not found:
+        if not _is_word_indexed(search_engine, term_stats, key):
             msg = f'Fragment "{key}" not found'
             raise ValueError(msg)
 
 
-def check_all_caps(search_engine: SearchEngine) -> None:
+def check_all_caps(search_engine: SearchEngine, term_stats: IndexTermStats) -> None:
     for word in ALL_CAPS:
-        found = search_engine.find_words(word)
-        if not found:
+        speech_texts = _find_speech_texts(search_engine, term_stats, word)
+        if not speech_texts:
             msg = f'"{word}" not found'
             raise ValueError(msg)
 
-        for ttl_info in found.values():
-            for pg_info in ttl_info.fanta_pages.values():
-                for speech_info in pg_info.speech_info_list:
-                    speech_lower = speech_info.speech_text.lower()
-                    speech_lower = speech_lower.replace("-\n", "-")
-                    speech_lower = speech_lower.replace("\n", " ")
-                    if word.lower() not in speech_lower:
-                        msg = f'"{word.lower()}":\n{speech_lower}\n\n{speech_info.speech_text}'
-                        raise ValueError(msg)
+        for speech_text in speech_texts:
+            speech_lower = speech_text.lower()
+            speech_lower = speech_lower.replace("-\n", "-")
+            speech_lower = speech_lower.replace("\n", " ")
+            if word.lower() not in speech_lower:
+                msg = f'"{word.lower()}":\n{speech_lower}\n\n{speech_text}'
+                raise ValueError(msg)
 
 
-def check_barksian_terms(search_engine: SearchEngine) -> None:
+def check_barksian_terms(search_engine: SearchEngine, term_stats: IndexTermStats) -> None:
     for term in BARKSIAN_EXTRA_TERMS:
-        found = search_engine.find_words(term)
-        if not found:
+        if not _is_word_indexed(search_engine, term_stats, term):
             logger.error(f'Barksian extra term "{term}" not found')
 
 
-def check_cleaned_terms(search_engine: SearchEngine, checks_output: Path | None) -> None:
+def check_cleaned_terms(
+    search_engine: SearchEngine, term_stats: IndexTermStats, checks_output: Path | None
+) -> None:
     # spell = SpellChecker()  # noqa: ERA001
     all_issues: list[tuple[str, TitleDict]] = []
     for term in search_engine.get_cleaned_terms():
@@ -139,18 +172,18 @@ def check_cleaned_terms(search_engine: SearchEngine, checks_output: Path | None)
         if "-" in term:
             term_with_no_hyphen = term.replace("-", "")
             if (
-                search_engine.find_words(term_with_no_hyphen)
+                _is_word_indexed(search_engine, term_stats, term_with_no_hyphen)
                 and term not in BARKSIAN_WORDS_WITH_OPTIONAL_HYPHENS
             ):
                 logger.error(f'Hyphenated term has non-hyphenated term as well: "{term}"')
                 error = True
 
-        found = search_engine.find_words(term)
-        if not found:
+        if not _is_word_indexed(search_engine, term_stats, term):
             logger.error(f'Could not find any content for term: "{term}"')
 
         if error:
-            all_issues.append((term, found))
+            # Only the (few) issues need the full search results for the queue file.
+            all_issues.append((term, search_engine.find_words(term)))
 
     if all_issues and checks_output:
         _write_queue_file(all_issues, checks_output)
@@ -181,43 +214,119 @@ def _write_queue_file(all_issues: list[tuple[str, TitleDict]], output_file: Path
     print(f'\nQueue file: "{output_file}" ({len(queue_lines)} entries).')
 
 
+def build_index(  # noqa: PLR0913
+    comics_database: ComicsDatabase,
+    volumes: list[int],
+    ocr_index: int,
+    incremental: bool = False,
+    merge_policy: str = DEFAULT_MERGE_POLICY,
+    workers: int = 1,
+) -> None:
+    """Build the index for 'volumes', or with 'incremental' just reindex their changed pages.
+
+    A full build is spread over up to 'workers' processes. Only an incremental run
+    hashes the pages, so a plain full build drops the saved page state and the next
+    incremental run is a full build too. The fuzzy search trigram index is brought
+    up to date either way.
+    """
+    volumes_index_dir = get_volumes_index_dir(ocr_index)
+    ocr_type = OCR_TYPE_DICT[ocr_index]
+    entity_provider = get_merged_entity_provider(volumes_index_dir, volumes)
+    index_state = IndexState(get_index_state_file(volumes_index_dir))
+
+    page_hashes = None
+    if incremental:
+        page_hashes = get_page_hashes(comics_database, volumes, ocr_type, entity_provider)
+        if update_index_pages(
+            comics_database,
+            volumes_index_dir,
+            ocr_type,
+            entity_provider,
+            page_hashes,
+            index_state,
+            merge_policy,
+        ):
+            save_fuzzy_term_index(volumes_index_dir)
+            return
+
+    build_index_parallel(
+        comics_database,
+        get_volume_weights(comics_database, volumes),
+        ocr_type,
+        volumes_index_dir,
+        volumes_index_dir,
+        workers,
+    )
+    if page_hashes is None:
+        index_state.clear()
+    else:
+        save_full_build_state(volumes_index_dir, page_hashes, index_state)
+
+    save_fuzzy_term_index(volumes_index_dir)
+
+
 app = typer.Typer()
 
 
-def _tag_volumes(
+def iter_speech_groups(
+    comics_database: ComicsDatabase,
+    all_speech_groups: SpeechGroups,
+    volumes: list[int],
+    ocr_index_to_use: OcrTypes,
+) -> Iterator[tuple[str, str, str, Any]]:
+    """Yield (title string, fanta page, group id, speech text) for the volumes' speech groups."""
+    titles = comics_database.get_configured_titles_in_fantagraphics_volumes(
+        volumes, exclude_non_comics=True
+    )
+    for title_str, fanta_info in titles:
+        title = fanta_info.comic_book_info.title
+        speech_page_groups = all_speech_groups.get_speech_page_groups(title)
+        for speech_page in speech_page_groups:
+            if speech_page.ocr_index != ocr_index_to_use:
+                continue
+            for group_id, speech_text in speech_page.speech_groups.items():
+                yield title_str, speech_page.fanta_page, group_id, speech_text
+
+
+def _tag_volumes(  # noqa: PLR0913
     comics_database: ComicsDatabase,
     volumes: list[int],
     ocr_index_to_use: OcrTypes,
     entities_dir: Path,
+    tag_batch_size: int = DEFAULT_TAG_BATCH_SIZE,
+    tag_processes: int = 1,
+    tag_cache_file: Path = DEFAULT_TAG_CACHE_FILE,
 ) -> None:
-    tagger = EntityTagger()
+    tagger = CachedEntityTagger(tag_cache_file, tag_batch_size, tag_processes)
+    # Not the speech corpus - tag the same 'SpeechText.ai_text' the index is made from.
     all_speech_groups = SpeechGroups(comics_database)
 
     for vol in volumes:
         print(f"Tagging volume {vol}...")
         volume_entities: dict = {}
 
-        titles = comics_database.get_configured_titles_in_fantagraphics_volumes(
-            [vol], exclude_non_comics=True
+        groups = list(
+            iter_speech_groups(comics_database, all_speech_groups, [vol], ocr_index_to_use)
         )
-        for title_str, fanta_info in titles:
-            title = fanta_info.comic_book_info.title
-            speech_page_groups = all_speech_groups.get_speech_page_groups(title)
-            for speech_page in speech_page_groups:
-                if speech_page.ocr_index != ocr_index_to_use:
-                    continue
-                for group_id, speech_text in speech_page.speech_groups.items():
-                    entities = tagger.tag(speech_text.ai_text)
-                    # Only store non-empty entity lists
-                    non_empty = {k: sorted(v) for k, v in entities.items() if v}
-                    if non_empty:
-                        volume_entities.setdefault(title_str, {}).setdefault(
-                            speech_page.fanta_page, {}
-                        )[group_id] = non_empty
+        num_hits = tagger.num_hits
+        all_entities = tagger.tag_many([speech_text.ai_text for _, _, _, speech_text in groups])
+        tagger.save()
+        print(f"  {tagger.num_hits - num_hits} of {len(groups)} groups from the tag cache.")
+        for (title_str, fanta_page, group_id, _), entities in zip(
+            groups, all_entities, strict=True
+        ):
+            # Only store non-empty entity lists
+            non_empty = {k: sorted(v) for k, v in entities.items() if v}
+            if non_empty:
+                volume_entities.setdefault(title_str, {}).setdefault(fanta_page, {})[group_id] = (
+                    non_empty
+                )
 
         save_auto_entities(entities_dir, vol, volume_entities)
         print(f"  Saved {entities_dir / f'entities-vol-{vol:02d}.json'}")
 
+    print(f"Tagged all volumes: {tagger.get_hit_rate_str()}.")
+
 
 @app.command(help="Build Whoosh index from Gemini AI groups")
 def main(  # noqa: PLR0913
@@ -238,42 +347,64 @@ def main(  # noqa: PLR0913
         default=False,
         help="Run spaCy tagging and save entity JSONs only (no index build)",
     ),
+    incremental: bool = typer.Option(
+        default=False,
+        help="Only reindex pages whose speech groups or entities changed since the last build",
+    ),
+    merge: str = typer.Option(
+        DEFAULT_MERGE_POLICY,
+        help=f"Segment merge policy for incremental updates ({', '.join(MERGE_POLICIES)})",
+    ),
+    workers: int = typer.Option(
+        1, "--workers", "-w", help="Parallel index build processes (1 = no multiprocessing)"
+    ),
+    tag_batch_size: int = typer.Option(DEFAULT_TAG_BATCH_SIZE, help="spaCy tagging batch size"),
+    tag_processes: int = typer.Option(1, help="spaCy tagging processes"),
+    tag_cache_file: Path = typer.Option(  # noqa: B008
+        DEFAULT_TAG_CACHE_FILE, help="Cache of entity tagging results by text"
+    ),
     log_level_str: LogLevelArg = "DEBUG",
 ) -> None:
     init_logging(APP_LOGGING_NAME, "make-whoosh-index-from-gemini-ai-groups.log", log_level_str)
 
+    if workers < 1:
+        msg = "--workers must be >= 1."
+        raise typer.BadParameter(msg)
+    if merge not in MERGE_POLICIES:
+        msg = f"--merge must be one of: {', '.join(MERGE_POLICIES)}."
+        raise typer.BadParameter(msg)
+
     volumes = list(intspan(volumes_str))
     comics_database = ComicsDatabase()
     assert ocr_index in OCR_TYPE_DICT
 
-    indexes_dirname = "Indexes" if ocr_index == 1 else "Indexes-easyocr"
-    volumes_index_dir = BARKS_ROOT_DIR / (
-        "Compleat Barks Disney Reader/Reader Files/" + indexes_dirname
-    )
+    volumes_index_dir = get_volumes_index_dir(ocr_index)
 
     if do_checks:
         check_index_integrity(comics_database, volumes, checks_output)
     elif tag or tag_only:
-        _tag_volumes(comics_database, volumes, OCR_TYPE_DICT[ocr_index], volumes_index_dir)
+        _tag_volumes(
+            comics_database,
+            volumes,
+            OCR_TYPE_DICT[ocr_index],
+            volumes_index_dir,
+            tag_batch_size,
+            tag_processes,
+            tag_cache_file,
+        )
         if not tag_only:
-            entity_provider = get_merged_entity_provider(volumes_index_dir, volumes)
-            whoosh_search = SearchEngineCreator(
-                comics_database, volumes_index_dir, OCR_TYPE_DICT[ocr_index]
-            )
-            whoosh_search.index_volumes(volumes, entity_provider=entity_provider)
+            build_index(comics_database, volumes, ocr_index, incremental, merge, workers)
     else:
-        entity_provider = get_merged_entity_provider(volumes_index_dir, volumes)
-        whoosh_search = SearchEngineCreator(
-            comics_database, volumes_index_dir, OCR_TYPE_DICT[ocr_index]
-        )
-        whoosh_search.index_volumes(volumes, entity_provider=entity_provider)
+        build_index(comics_database, volumes, ocr_index, incremental, merge, workers)
 
 
-def _discover_entities(
+def _discover_entities(  # noqa: PLR0913
     comics_database: ComicsDatabase,
     volumes: list[int],
     ocr_index_to_use: OcrTypes,
     output_path: Path,
+    tag_batch_size: int = DEFAULT_TAG_BATCH_SIZE,
+    tag_processes: int = 1,
 ) -> None:
     """Run spaCy tagging and output uncurated entity candidates with context."""
     tagger = EntityTagger()
@@ -285,27 +416,23 @@ def _discover_entities(
     )
     max_examples = 3
 
-    titles = comics_database.get_configured_titles_in_fantagraphics_volumes(
-        volumes, exclude_non_comics=True
+    groups = list(iter_speech_groups(comics_database, all_speech_groups, volumes, ocr_index_to_use))
+    all_entities = tagger.tag_many(
+        (speech_text.ai_text for _, _, _, speech_text in groups), tag_batch_size, tag_processes
     )
-    for title_str, fanta_info in titles:
-        title = fanta_info.comic_book_info.title
-        speech_page_groups = all_speech_groups.get_speech_page_groups(title)
-        for speech_page in speech_page_groups:
-            if speech_page.ocr_index != ocr_index_to_use:
-                continue
-            for group_id, speech_text in speech_page.speech_groups.items():
-                entities = tagger.tag(speech_text.ai_text)
-                _collect_uncurated_from_group(
-                    entities,
-                    curated_names,
-                    candidates,
-                    title_str,
-                    speech_page.fanta_page,
-                    group_id,
-                    speech_text.ai_text[:200],
-                    max_examples,
-                )
+    for (title_str, fanta_page, group_id, speech_text), entities in zip(
+        groups, all_entities, strict=True
+    ):
+        _collect_uncurated_from_group(
+            entities,
+            curated_names,
+            candidates,
+            title_str,
+            fanta_page,
+            group_id,
+            speech_text.ai_text[:200],
+            max_examples,
+        )
 
     _write_discover_output(candidates, output_path)
 
@@ -378,7 +505,7 @@ def _write_discover_output(candidates: dict[str, dict], output_path: Path) -> No
 
 
 @app.command(help="Discover uncurated spaCy entity candidates for review")
-def discover(
+def discover(  # noqa: PLR0913
     volumes_str: VolumesArg = "",
     ocr_index: int = 1,
     output: Path = typer.Option(  # noqa: B008
@@ -387,6 +514,8 @@ def discover(
         "-o",
         help="Output file for discovered candidates",
     ),
+    tag_batch_size: int = typer.Option(DEFAULT_TAG_BATCH_SIZE, help="spaCy tagging batch size"),
+    tag_processes: int = typer.Option(1, help="spaCy tagging processes"),
     log_level_str: LogLevelArg = "DEBUG",
 ) -> None:
     init_logging(APP_LOGGING_NAME, "discover-entities.log", log_level_str)
@@ -395,7 +524,9 @@ def discover(
     comics_database = ComicsDatabase()
     assert ocr_index in OCR_TYPE_DICT
 
-    _discover_entities(comics_database, volumes, OCR_TYPE_DICT[ocr_index], output)
+    _discover_entities(
+        comics_database, volumes, OCR_TYPE_DICT[ocr_index], output, tag_batch_size, tag_processes
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""Build a Whoosh volumes index across worker processes and merge the parts.
+
+``SearchEngineCreator`` indexes whole volumes, so the volumes are split into
+one part per worker, balanced by their number of indexed pages. Each worker
+builds its part into its own index (so all the tokenizing and analysis for a
+part happens in that worker's writer), the first part straight into the final
+index directory and the others into scratch directories. The scratch indexes'
+segments are then added to the final index and everything is merged into one
+segment, like a single-process build.
+"""
+
+import multiprocessing as mp
+import tempfile
+from pathlib import Path
+
+from barks_fantagraphics.comics_consts import RESTORABLE_PAGE_TYPES
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.speech_groupers import OcrTypes
+from barks_fantagraphics.whoosh_search_engine import SearchEngineCreator
+from loguru import logger
+from whoosh import index, writing
+
+from barks_ocr.cli_setup import get_logging_args, init_logging
+from barks_ocr.pipeline.entity_store import get_merged_entity_provider
+
+_WORKER_DB: ComicsDatabase | None = None
+
+
+def get_volume_weights(comics_database: ComicsDatabase, volumes: list[int]) -> dict[int, int]:
+    """Return the number of story pages of each of 'volumes', to balance the parts by."""
+    volume_weights = {}
+    for volume in volumes:
+        titles = comics_database.get_configured_titles_in_fantagraphics_volumes(
+            [volume], exclude_non_comics=True
+        )
+        volume_weights[volume] = sum(
+            len(
+                comics_database.get_comic_book(title_str).get_srce_restored_ocr_raw_story_files(
+                    RESTORABLE_PAGE_TYPES
+                )
+            )
+            for title_str, _ in titles
+        )
+    return volume_weights
+
+
+def partition_volumes(volume_weights: dict[int, int], num_parts: int) -> list[list[int]]:
+    """Split the volumes into at most 'num_parts' parts of roughly equal total weight."""
+    parts: list[list[int]] = [[] for _ in range(min(num_parts, len(volume_weights)))]
+    if not parts:
+        return []
+
+    part_weights = [0] * len(parts)
+    # Heaviest first, each into the currently lightest part.
+    for volume in sorted(volume_weights, key=lambda v: (-volume_weights[v], v)):
+        lightest = part_weights.index(min(part_weights))
+        parts[lightest].append(volume)
+        part_weights[lightest] += volume_weights[volume]
+
+    return [sorted(part) for part in parts]
+
+
+def build_index_parallel(  # noqa: PLR0913
+    comics_database: ComicsDatabase,
+    volume_weights: dict[int, int],
+    ocr_type: OcrTypes,
+    volumes_index_dir: Path,
+    entities_dir: Path,
+    workers: int,
+) -> None:
+    """Build the index for the volumes of 'volume_weights' with up to 'workers' processes."""
+    parts = partition_volumes(volume_weights, workers)
+    if len(parts) <= 1:
+        volumes = sorted(volume_weights)
+        _build_part(comics_database, volumes, ocr_type, volumes_index_dir, entities_dir)
+        return
+
+    logger.info(f"Building the index in {len(parts)} parts: {parts}.")
+
+    with tempfile.TemporaryDirectory(dir=volumes_index_dir.parent) as scratch_dir:
+        part_dirs = [volumes_index_dir] + [
+            Path(scratch_dir) / f"part-{i:02d}" for i in range(1, len(parts))
+        ]
+
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(
+            processes=len(parts), initializer=_worker_init, initargs=(get_logging_args(),)
+        ) as pool:
+            pool.map(
+                _worker_run,
+                [
+                    (part, ocr_type, part_dir, entities_dir)
+                    for part, part_dir in zip(parts, part_dirs, strict=True)
+                ],
+            )
+
+        logger.info(f"Merging {len(parts)} index parts...")
+        writer = index.open_dir(volumes_index_dir).writer()
+        for part_dir in part_dirs[1:]:
+            with index.open_dir(part_dir).reader() as reader:
+                for leaf_reader, _ in reader.leaf_readers():
+                    writer.add_reader(leaf_reader)
+        writer.commit(mergetype=writing.OPTIMIZE)
+
+
+def _build_part(
+    comics_database: ComicsDatabase,
+    volumes: list[int],
+    ocr_type: OcrTypes,
+    part_index_dir: Path,
+    entities_dir: Path,
+) -> None:
+    part_index_dir.mkdir(parents=True, exist_ok=True)
+    entity_provider = get_merged_entity_provider(entities_dir, volumes)
+    whoosh_search = SearchEngineCreator(comics_database, part_index_dir, ocr_type)
+    whoosh_search.index_volumes(volumes, entity_provider=entity_provider)
+
+
+def _worker_init(logging_args: tuple[str, str, str]) -> None:
+    """Pool initializer - log like the parent and make the comics database once per worker."""
+    init_logging(*logging_args)
+
+    global _WORKER_DB  # noqa: PLW0603
+    _WORKER_DB = ComicsDatabase()
+
+
+def _worker_run(args: tuple[list[int], OcrTypes, Path, Path]) -> None:
+    """Build one part of the index in a worker using the worker-local database."""
+    assert _WORKER_DB is not None
+    volumes, ocr_type, part_index_dir, entities_dir = args
+    _build_part(_WORKER_DB, volumes, ocr_type, part_index_dir, entities_dir)
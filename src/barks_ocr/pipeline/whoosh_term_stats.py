@@ -0,0 +1,64 @@
+"""Term statistics of a Whoosh volumes index for the index integrity checks.
+
+The integrity checks only need to know whether the index has any document with
+a given word, and for some words the text of those documents. Rather than one
+``SearchEngine.find_words`` search per word, ``IndexTermStats`` reads the
+indexed field's whole term dictionary once into a term -> document frequency
+map, and reads postings and stored text only for the words whose documents are
+needed. If the index has deleted documents, the frequencies are counted from the
+postings instead, which skip them, and terms left with no documents are dropped.
+
+Words are analyzed with the field's own analyzer, as a search would. Words that
+analyze to more than one term (phrases) aren't in the term dictionary as such,
+so callers fall back to a search for them.
+"""
+
+from pathlib import Path
+
+from loguru import logger
+from whoosh import index
+
+from barks_ocr.utils.index_paths import get_index_fingerprint
+
+# The 'SearchEngineCreator' field with the speech text, indexed and stored.
+CONTENT_FIELD = "content"
+
+
+class IndexTermStats:
+    def __init__(self, index_dir: Path, field: str = CONTENT_FIELD) -> None:
+        self._index = index.open_dir(index_dir)
+        self._field = field
+        self._field_type = self._index.schema[field]
+        self.fingerprint = get_index_fingerprint(self._index)
+
+        self.doc_freqs: dict[str, int] = {}
+        with self._index.reader() as reader:
+            # The term dictionary still counts deleted documents (an incremental update
+            # deletes without merging), so then count the live documents in the postings.
+            has_deletions = reader.has_deletions()
+            for term_bytes, term_info in reader.iter_field(field):
+                if has_deletions:
+                    doc_freq = sum(1 for _ in reader.postings(field, term_bytes).all_ids())
+                    if doc_freq == 0:
+                        continue
+                else:
+                    doc_freq = term_info.doc_frequency()
+                self.doc_freqs[self._field_type.from_bytes(term_bytes)] = doc_freq
+
+        logger.info(f'Read {len(self.doc_freqs)} "{field}" terms from "{index_dir}".')
+
+    def get_single_term(self, word: str) -> str | None:
+        """Return the one indexed term 'word' analyzes to, or None for a phrase."""
+        terms = list(self._field_type.process_text(word, mode="query"))
+        return terms[0] if len(terms) == 1 else None
+
+    def has_term(self, term: str) -> bool:
+        return self.doc_freqs.get(term, 0) > 0
+
+    def get_texts_with_term(self, term: str) -> list[str]:
+        """Return the stored speech text of every document with 'term'."""
+        if not self.has_term(term):
+            return []
+        with self._index.reader() as reader:
+            doc_nums = reader.postings(self._field, term).all_ids()
+            return [reader.stored_fields(doc_num)[self._field] for doc_num in doc_nums]
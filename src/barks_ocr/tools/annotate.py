@@ -268,6 +268,9 @@ def _draw_individual_boxes_on_image(pil_image: Image.Image, ocr_file: Path) -> N
     json_ocr_groups = get_json_ocr_groups(ocr_file)["groups"]
     draw = ImageDraw.Draw(pil_image)
 
+    group_ids = []
+    text_boxes = []
+    text_frags = []
     for group in json_ocr_groups:
         group_id = int(group)
 
@@ -279,22 +282,27 @@ def _draw_individual_boxes_on_image(pil_image: Image.Image, ocr_file: Path) -> N
                 logger.warning(f"No text box found for group {group_id} and box_id {box_id}.")
                 continue
 
-            try:
-                ocr_box = OcrBox(
-                    text_box,
-                    text_data["text_frag"],
-                    0.0,
-                    "N/A",
-                )
-            except Exception:
-                logger.exception(f"OcrBox error occurred for text_data: {text_data}")
-                raise
+            group_ids.append(group_id)
+            text_boxes.append(text_box)
+            text_frags.append(text_data["text_frag"])
 
-            if ocr_box.is_approx_rect:
-                draw.rectangle(ocr_box.min_rotated_rectangle, outline=get_color(group_id), width=4)
-            else:
-                box = [item for point in ocr_box.min_rotated_rectangle for item in point]
-                draw.polygon(box, outline=get_color(group_id), width=2)
+    # Make all the page's boxes in one go so their geometry is computed together.
+    ocr_boxes = OcrBox.from_quads(
+        text_boxes, text_frags, [0.0] * len(text_boxes), ["N/A"] * len(text_boxes)
+    )
+
+    for group_id, text_box, ocr_box in zip(group_ids, text_boxes, ocr_boxes, strict=True):
+        try:
+            is_approx_rect = ocr_box.is_approx_rect
+        except Exception:
+            logger.exception(f"OcrBox error occurred for text_box: {text_box}")
+            raise
+
+        if is_approx_rect:
+            draw.rectangle(ocr_box.min_rotated_rectangle, outline=get_color(group_id), width=4)
+        else:
+            box = [item for point in ocr_box.min_rotated_rectangle for item in point]
+            draw.polygon(box, outline=get_color(group_id), width=2)
 
 
 def _save_if_outdated(image: Image.Image, dst_file: Path, src_file: Path, label: str) -> None:
@@ -355,6 +363,7 @@ def _build_one_page(
     save: bool,
 ) -> tuple[str, Image.Image, list[SpeechLabel]] | None:
     """Re-read OCR data and rebuild a single annotated page (used for live refresh)."""
+    # Not the speech corpus - the annotations are drawn from 'SpeechText's.
     speech_groups = SpeechGroups(comics_database)
     title_panel_boxes = TitlePanelBoxes(comics_database)
     comic = comics_database.get_comic_book(title)
@@ -657,6 +666,7 @@ def show_ocr_annotations(
     """
     logger.info(f'Showing OCR annotations [{engine.value}] for "{title}"...')
 
+    # Not the speech corpus - the annotations are drawn from 'SpeechText's.
     speech_groups = SpeechGroups(comics_database)
     title_panel_boxes = TitlePanelBoxes(comics_database)
     comic = comics_database.get_comic_book(title)
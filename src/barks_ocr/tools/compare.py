@@ -49,6 +49,7 @@ def _compare_title(
     """Compare EasyOCR vs PaddleOCR for one title. Return mismatches and counts."""
     title = STR_TITLE_TO_ENUM[title_str]
     volume = comics_database.get_fanta_volume_int(title_str)
+    # Not the speech corpus - this renumbers and saves groups, and compares 'SpeechText's.
     speech_groups = SpeechGroups(comics_database)
     speech_page_groups = speech_groups.get_speech_page_groups(title)
 
@@ -0,0 +1,452 @@
+"""Local stand-in for the subset of the Gemini API used by the grouping pipeline.
+
+Implements just enough of the REST protocol for the google-genai client to run
+``gemini_batch_job`` -> ``gemini_batch_results`` -> ``gemini_groups`` (and the
+live ``--live`` mode) without the real service:
+
+* ``files.upload``   - resumable upload (start, then upload/finalize).
+* ``batches.create`` - ``models/{model}:batchGenerateContent`` from an uploaded JSONL file.
+* ``batches.get``    - ``batches/{id}``; the job runs for a configurable time.
+* ``files.download`` - ``files/{id}:download`` of the batch results JSONL.
+* ``models.generate_content`` - ``models/{model}:generateContent``.
+
+Responses are replayed from ``replay_dir`` when a matching file exists, otherwise a
+canned answer is synthesized from the OCR boxes embedded in the prompt: every
+``boxes_per_group`` consecutive boxes become one dialogue group. Latency and
+error injection are configurable, so retries and polling can be exercised too.
+
+Point the pipeline at it with ``GEMINI_BASE_URL=http://127.0.0.1:<port>``.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Self
+from urllib.parse import parse_qs, urlparse
+
+import typer
+from comic_utils.common_typer_options import LogLevelArg
+from loguru import logger
+
+from barks_ocr.cli_setup import init_logging
+
+APP_LOGGING_NAME = "fgem"
+
+DEFAULT_PORT = 8765
+DEFAULT_BOXES_PER_GROUP = 3
+
+_OCR_JSON_RE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+_BATCH_CREATE_RE = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):batchGenerateContent$")
+_GENERATE_RE = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):generateContent$")
+_BATCH_GET_RE = re.compile(r"^/v1beta/batches/(?P<id>[^/]+)$")
+_FILE_DOWNLOAD_RE = re.compile(r"^(?:/download)?/v1beta/files/(?P<id>[^/:]+):download$")
+_FILE_GET_RE = re.compile(r"^/v1beta/files/(?P<id>[^/:]+)$")
+_UPLOAD_PATH = "/upload/v1beta/files"
+
+
+@dataclass
+class FakeGeminiConfig:
+    latency_secs: float = 0.0
+    error_rate: float = 0.0
+    batch_secs_per_request: float = 0.0
+    boxes_per_group: int = DEFAULT_BOXES_PER_GROUP
+    replay_dir: Path | None = None
+    seed: int = 0
+
+
+@dataclass
+class _FakeFile:
+    name: str
+    mime_type: str
+    data: bytearray = field(default_factory=bytearray)
+
+
+@dataclass
+class _FakeBatch:
+    name: str
+    model: str
+    display_name: str
+    create_time: float
+    done_time: float
+    output_file_name: str
+
+
+def get_synthetic_predicted_groups(prompt: str, boxes_per_group: int) -> str:
+    """Make a plausible predicted-groups answer from the OCR boxes in a grouping prompt."""
+    match = _OCR_JSON_RE.search(prompt)
+    ocr_boxes = json.loads(match.group(1)) if match else []
+
+    groups = []
+    for start in range(0, len(ocr_boxes), boxes_per_group):
+        chunk = ocr_boxes[start : start + boxes_per_group]
+        box_ids = [str(box["text_id"]) for box in chunk]
+        texts = [str(box["text"]) for box in chunk]
+        groups.append(
+            {
+                "panel_id": "1",
+                "text_bubble_id": f"1-{len(groups) + 1}",
+                "box_ids": box_ids,
+                "split_cleaned_box_texts": dict(zip(box_ids, texts, strict=True)),
+                "original_text": " ".join(texts),
+                "cleaned_text": "\n".join(texts),
+                "type": "dialogue",
+                "style": "normal",
+                "notes": "none",
+            }
+        )
+
+    return json.dumps(groups, indent=4)
+
+
+def get_prompt_replay_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class FakeGeminiState:
+    """In-memory files and batch jobs shared by all request handler threads."""
+
+    def __init__(self, config: FakeGeminiConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._random = random.Random(config.seed)  # noqa: S311
+        self._files: dict[str, _FakeFile] = {}
+        self._pending_uploads: dict[str, _FakeFile] = {}
+        self._batches: dict[str, _FakeBatch] = {}
+        self.num_requests = 0
+        self.num_injected_errors = 0
+
+    def should_inject_error(self) -> bool:
+        with self._lock:
+            self.num_requests += 1
+            if self.config.error_rate > 0.0 and self._random.random() < self.config.error_rate:
+                self.num_injected_errors += 1
+                return True
+            return False
+
+    def start_upload(self, mime_type: str) -> str:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._pending_uploads[upload_id] = _FakeFile(f"files/{upload_id[:12]}", mime_type)
+        return upload_id
+
+    def append_upload(self, upload_id: str, chunk: bytes, finalize: bool) -> _FakeFile | None:
+        with self._lock:
+            fake_file = self._pending_uploads[upload_id]
+            fake_file.data.extend(chunk)
+            if not finalize:
+                return None
+            del self._pending_uploads[upload_id]
+            self._files[fake_file.name] = fake_file
+            return fake_file
+
+    def get_file(self, name: str) -> _FakeFile | None:
+        with self._lock:
+            return self._files.get(name)
+
+    def create_batch(self, model: str, display_name: str, input_file_name: str) -> _FakeBatch:
+        input_file = self.get_file(input_file_name)
+        if input_file is None:
+            msg = f'Unknown batch input file "{input_file_name}".'
+            raise KeyError(msg)
+
+        output_lines = [
+            json.dumps(self._get_batch_response_line(json.loads(line)))
+            for line in input_file.data.decode("utf-8").splitlines()
+            if line.strip()
+        ]
+
+        batch_id = uuid.uuid4().hex[:12]
+        output_file = _FakeFile(
+            f"files/batch-{batch_id}-output",
+            "application/jsonl",
+            bytearray(("\n".join(output_lines) + "\n").encode("utf-8")),
+        )
+        now = time.time()
+        batch = _FakeBatch(
+            name=f"batches/{batch_id}",
+            model=model,
+            display_name=display_name,
+            create_time=now,
+            done_time=now + self.config.batch_secs_per_request * len(output_lines),
+            output_file_name=output_file.name,
+        )
+        with self._lock:
+            self._files[output_file.name] = output_file
+            self._batches[batch.name] = batch
+
+        return batch
+
+    def get_batch(self, name: str) -> _FakeBatch | None:
+        with self._lock:
+            return self._batches.get(name)
+
+    def get_response_text(self, prompt: str, replay_key: str) -> str:
+        if self.config.replay_dir is not None:
+            replay_file = self.config.replay_dir / f"{replay_key}.json"
+            if replay_file.is_file():
+                return replay_file.read_text()
+
+        return get_synthetic_predicted_groups(prompt, self.config.boxes_per_group)
+
+    def _get_batch_response_line(self, request_line: dict[str, Any]) -> dict[str, Any]:
+        key = request_line.get("key", "")
+        prompt = _get_prompt_text(request_line["request"])
+        return {
+            "key": key,
+            "response": _get_generate_content_response(self.get_response_text(prompt, key)),
+        }
+
+
+def _get_prompt_text(request: dict[str, Any]) -> str:
+    return "".join(
+        part.get("text", "") for content in request["contents"] for part in content["parts"]
+    )
+
+
+def _get_generate_content_response(text: str) -> dict[str, Any]:
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+            }
+        ],
+        "usageMetadata": {
+            "promptTokenCount": 0,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": len(text) // 4,
+        },
+    }
+
+
+def _get_file_json(fake_file: _FakeFile, base_url: str) -> dict[str, Any]:
+    file_id = fake_file.name.removeprefix("files/")
+    return {
+        "name": fake_file.name,
+        "mimeType": fake_file.mime_type,
+        "sizeBytes": str(len(fake_file.data)),
+        "uri": f"{base_url}/v1beta/files/{file_id}",
+        "downloadUri": f"{base_url}/download/v1beta/files/{file_id}:download?alt=media",
+        "state": "ACTIVE",
+        "source": "GENERATED" if file_id.startswith("batch-") else "UPLOADED",
+    }
+
+
+def _get_batch_json(batch: _FakeBatch) -> dict[str, Any]:
+    done = time.time() >= batch.done_time
+    metadata: dict[str, Any] = {
+        "@type": "type.googleapis.com/google.ai.generativelanguage.v1main.GenerateContentBatch",
+        "name": batch.name,
+        "displayName": batch.display_name,
+        "model": f"models/{batch.model}",
+        "state": "BATCH_STATE_SUCCEEDED" if done else "BATCH_STATE_RUNNING",
+    }
+    if done:
+        metadata["output"] = {"responsesFile": batch.output_file_name}
+
+    return {"name": batch.name, "metadata": metadata, "done": done}
+
+
+class _FakeGeminiHandler(BaseHTTPRequestHandler):
+    server: "FakeGeminiServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        logger.debug(f"Fake gemini: {format % args}")
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        state = self.server.state
+
+        if self._delay_and_maybe_fail():
+            return
+
+        if match := _BATCH_GET_RE.match(path):
+            batch = state.get_batch(f"batches/{match['id']}")
+            if batch is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown batch {match['id']}.")
+                return
+            self._send_json(_get_batch_json(batch))
+        elif match := _FILE_DOWNLOAD_RE.match(path):
+            fake_file = state.get_file(f"files/{match['id']}")
+            if fake_file is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown file {match['id']}.")
+                return
+            self._send_bytes(bytes(fake_file.data), fake_file.mime_type)
+        elif match := _FILE_GET_RE.match(path):
+            fake_file = state.get_file(f"files/{match['id']}")
+            if fake_file is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown file {match['id']}.")
+                return
+            self._send_json(_get_file_json(fake_file, self.server.base_url))
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unsupported GET {path}.")
+
+    def do_POST(self) -> None:
+        parsed_url = urlparse(self.path)
+        path = parsed_url.path
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+
+        if path == _UPLOAD_PATH:
+            self._handle_upload(parsed_url.query, body)
+            return
+
+        if self._delay_and_maybe_fail():
+            return
+
+        if match := _BATCH_CREATE_RE.match(path):
+            self._handle_batch_create(match["model"], json.loads(body))
+        elif _GENERATE_RE.match(path):
+            request = json.loads(body)
+            prompt = _get_prompt_text(request)
+            text = self.server.state.get_response_text(prompt, get_prompt_replay_key(prompt))
+            self._send_json(_get_generate_content_response(text))
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unsupported POST {path}.")
+
+    def _handle_upload(self, query: str, body: bytes) -> None:
+        state = self.server.state
+        command = self.headers.get("X-Goog-Upload-Command", "")
+
+        if command == "start":
+            mime_type = self.headers.get("X-Goog-Upload-Header-Content-Type", "")
+            upload_id = state.start_upload(mime_type)
+            upload_url = f"{self.server.base_url}{_UPLOAD_PATH}?upload_id={upload_id}"
+            self._send_json(
+                {},
+                extra_headers={"X-Goog-Upload-URL": upload_url, "X-Goog-Upload-Status": "active"},
+            )
+            return
+
+        upload_id = parse_qs(query).get("upload_id", [""])[0]
+        fake_file = state.append_upload(upload_id, body, finalize="finalize" in command)
+        if fake_file is None:
+            self._send_json({}, extra_headers={"X-Goog-Upload-Status": "active"})
+        else:
+            self._send_json(
+                {"file": _get_file_json(fake_file, self.server.base_url)},
+                extra_headers={"X-Goog-Upload-Status": "final"},
+            )
+
+    def _handle_batch_create(self, model: str, request: dict[str, Any]) -> None:
+        batch_request = request.get("batch", {})
+        input_file_name = batch_request.get("inputConfig", {}).get("fileName", "")
+        try:
+            batch = self.server.state.create_batch(
+                model, batch_request.get("displayName", ""), input_file_name
+            )
+        except KeyError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        self._send_json(_get_batch_json(batch))
+
+    def _delay_and_maybe_fail(self) -> bool:
+        state = self.server.state
+        if state.config.latency_secs > 0.0:
+            time.sleep(state.config.latency_secs)
+        if state.should_inject_error():
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, "Injected fake error.")
+            return True
+        return False
+
+    def _send_json(self, data: dict[str, Any], extra_headers: dict[str, str] | None = None) -> None:
+        self._send_bytes(json.dumps(data).encode("utf-8"), "application/json", extra_headers)
+
+    def _send_bytes(
+        self, data: bytes, content_type: str, extra_headers: dict[str, str] | None = None
+    ) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        data = json.dumps(
+            {"error": {"code": status.value, "message": message, "status": status.name}}
+        ).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: FakeGeminiConfig, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _FakeGeminiHandler)
+        self.state = FakeGeminiState(config)
+        self._serve_thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Serve on a background thread; use ``shutdown`` to stop."""
+        self._serve_thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._serve_thread.start()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+app = typer.Typer()
+
+
+@app.command(help="Run a local stand-in for the Gemini files/batches/generate API")
+def main(  # noqa: PLR0913
+    port: int = DEFAULT_PORT,
+    latency_secs: float = typer.Option(0.0, help="Delay added to every API call"),
+    error_rate: float = typer.Option(0.0, help="Fraction of API calls answered with a 503"),
+    batch_secs_per_request: float = typer.Option(
+        0.0, help="Simulated batch job run time per request"
+    ),
+    boxes_per_group: int = typer.Option(
+        DEFAULT_BOXES_PER_GROUP, help="OCR boxes per synthesized group"
+    ),
+    replay_dir: Path | None = typer.Option(  # noqa: B008
+        None, help="Dir of canned responses: '<batch key>.json' or '<prompt hash>.json'"
+    ),
+    log_level_str: LogLevelArg = "INFO",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "fake-gemini-server.log", log_level_str)
+
+    config = FakeGeminiConfig(
+        latency_secs=latency_secs,
+        error_rate=error_rate,
+        batch_secs_per_request=batch_secs_per_request,
+        boxes_per_group=boxes_per_group,
+        replay_dir=replay_dir,
+    )
+    server = FakeGeminiServer(config, port)
+    logger.info(f"Fake Gemini server listening on {server.base_url}.")
+    logger.info(f"Use: GEMINI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping fake Gemini server.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    app()
@@ -517,6 +517,7 @@ def _process_title(  # noqa: PLR0913
     but skipped so the job keeps going).
     """
     title = STR_TITLE_TO_ENUM[title_str]
+    # Not the speech corpus - the bubbles are cropped from the 'SpeechText' text boxes.
     speech_groups = SpeechGroups(comics_database)
     speech_page_groups = speech_groups.get_speech_page_groups(title)
     comic = comics_database.get_comic_book(title_str)
@@ -0,0 +1,207 @@
+# ruff: noqa: T201
+
+"""Export every prelim and final speech group to Parquet for polars queries.
+
+Each group becomes one row - title, page, engine, group id, panel, type, style,
+text, notes, text box and acknowledged issues - in Hive-partitioned Parquet
+files under ``~/.cache/barks-ocr/groups-parquet``, one per stage and volume:
+
+    groups-parquet/stage=prelim/volume=5/groups.parquet
+    groups-parquet/stage=final/volume=5/groups.parquet
+
+The groups files are read through the volume speech corpora, so only changed
+files are read again, and a partition is only rewritten when the files it was
+made from have changed. Query the export lazily with ``scan_groups``:
+
+    groups = scan_groups()
+    groups.filter(
+        (pl.col("type") == "sound_effect") & (pl.col("ai_text").str.len_chars() > 20)
+    ).collect()
+    groups.filter(pl.col("notes").str.to_lowercase().str.contains("error")).collect()
+    groups.filter(pl.col("panel") == -1).group_by("stage", "volume").len().collect()
+
+Filters on 'stage' and 'volume' only read the matching partitions.
+"""
+
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+
+import polars as pl
+import typer
+from barks_fantagraphics.comics_database import ComicsDatabase
+from comic_utils.common_typer_options import LogLevelArg, VolumesArg
+from intspan import intspan
+from loguru import logger
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.pipeline.speech_corpus import DEFAULT_SPEECH_CORPUS_DIR, load_volume_corpus
+
+APP_LOGGING_NAME = "gexp"
+
+GROUPS_EXPORT_VERSION = 1
+DEFAULT_EXPORT_DIR = Path.home() / ".cache" / "barks-ocr" / "groups-parquet"
+STAGES = ("prelim", "final")
+PARTITION_FILENAME = "groups.parquet"
+
+GROUPS_SCHEMA = {
+    "title": pl.String,
+    "page": pl.String,
+    "engine": pl.String,
+    "group_id": pl.String,
+    "panel": pl.Int64,
+    "type": pl.String,
+    "style": pl.String,
+    "ai_text": pl.String,
+    "notes": pl.String,
+    "box": pl.List(pl.List(pl.Float64)),
+    "acknowledged_issues": pl.List(pl.String),
+}
+
+
+def get_partition_file(export_dir: Path, stage: str, volume: int) -> Path:
+    return export_dir / f"stage={stage}" / f"volume={volume}" / PARTITION_FILENAME
+
+
+def _get_state_file(export_dir: Path) -> Path:
+    return export_dir.with_name(f"{export_dir.name}-state.json")
+
+
+def _load_state(state_file: Path) -> dict[str, str]:
+    """Return the source stamp each partition was last made from."""
+    if not state_file.is_file():
+        return {}
+    state = json.loads(state_file.read_text())
+    if state.get("version") != GROUPS_EXPORT_VERSION:
+        return {}
+    return state["partitions"]
+
+
+def _save_state(state_file: Path, partitions: dict[str, str]) -> None:
+    state = {"version": GROUPS_EXPORT_VERSION, "partitions": partitions}
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = state_file.with_suffix(".tmp")
+    temp_file.write_text(json.dumps(state, indent=4, sort_keys=True))
+    temp_file.replace(state_file)
+
+
+def _get_sources_stamp(corpus: pl.DataFrame) -> str:
+    """Return a hash of the files, sizes and mtimes that 'corpus' was made from."""
+    digest = hashlib.sha256()
+    for file, size, mtime_ns in corpus.select("file", "size", "mtime_ns").sort("file").iter_rows():
+        digest.update(f"{file}\0{size}\0{mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _get_page_groups(page_json: dict, final: bool) -> dict[str, dict]:
+    # A final groups file is the 'groups' of the prelim groups file it was made from.
+    return page_json if final else page_json.get("groups", {})
+
+
+def flatten_groups(corpus: pl.DataFrame, final: bool) -> pl.DataFrame:
+    """Return one row per group of the pages in 'corpus'."""
+    columns: dict[str, list] = {name: [] for name in GROUPS_SCHEMA}
+
+    for title, fanta_page, ocr_type, page_json in corpus.select(
+        "title", "fanta_page", "ocr_type", "page_json"
+    ).iter_rows():
+        for group_id, group in _get_page_groups(json.loads(page_json), final).items():
+            columns["title"].append(title)
+            columns["page"].append(fanta_page)
+            columns["engine"].append(ocr_type.lower())
+            columns["group_id"].append(group_id)
+            columns["panel"].append(int(group.get("panel_num", -1)))
+            columns["type"].append(group.get("type"))
+            columns["style"].append(group.get("style"))
+            columns["ai_text"].append(group.get("ai_text"))
+            columns["notes"].append(group.get("notes"))
+            columns["box"].append(group.get("text_box"))
+            columns["acknowledged_issues"].append(group.get("acknowledged_issues") or [])
+
+    return pl.DataFrame(columns, schema=GROUPS_SCHEMA)
+
+
+def _write_partition(partition_file: Path, groups: pl.DataFrame) -> None:
+    partition_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = partition_file.with_suffix(".tmp")
+    groups.write_parquet(temp_file)
+    temp_file.replace(partition_file)
+
+
+def export_volumes(
+    comics_database: ComicsDatabase,
+    volumes: list[int],
+    export_dir: Path = DEFAULT_EXPORT_DIR,
+    corpus_dir: Path = DEFAULT_SPEECH_CORPUS_DIR,
+) -> int:
+    """Bring the partitions of 'volumes' up to date and return how many were rewritten."""
+    state_file = _get_state_file(export_dir)
+    partitions = _load_state(state_file)
+    num_written = 0
+
+    for volume in volumes:
+        for stage in STAGES:
+            final = stage == "final"
+            corpus = load_volume_corpus(comics_database, volume, corpus_dir, final=final)
+            partition_file = get_partition_file(export_dir, stage, volume)
+            key = f"{stage}/{volume}"
+
+            stamp = _get_sources_stamp(corpus)
+            if partitions.get(key) == stamp and partition_file.is_file():
+                logger.debug(f'Partition "{key}" is up to date.')
+                continue
+
+            if corpus.is_empty():
+                shutil.rmtree(partition_file.parent, ignore_errors=True)
+                partitions.pop(key, None)
+                continue
+
+            groups = flatten_groups(corpus, final)
+            _write_partition(partition_file, groups)
+            partitions[key] = stamp
+            num_written += 1
+            logger.info(f'Wrote {len(groups)} groups to partition "{key}".')
+
+    _save_state(state_file, partitions)
+
+    return num_written
+
+
+def scan_groups(export_dir: Path = DEFAULT_EXPORT_DIR) -> pl.LazyFrame:
+    """Return a lazy frame of all exported groups, with 'stage' and 'volume' columns."""
+    return pl.scan_parquet(export_dir / "**" / PARTITION_FILENAME, hive_partitioning=True)
+
+
+app = typer.Typer()
+
+
+@app.command(help="Export prelim and final speech groups to partitioned Parquet")
+def main(
+    volumes_str: VolumesArg = "",
+    export_dir: Path = typer.Option(DEFAULT_EXPORT_DIR, help="Parquet export root"),  # noqa: B008
+    corpus_dir: Path = typer.Option(  # noqa: B008
+        DEFAULT_SPEECH_CORPUS_DIR, help="Volume speech corpora"
+    ),
+    log_level_str: LogLevelArg = "INFO",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "groups-export.log", log_level_str)
+
+    volumes = list(intspan(volumes_str))
+    if not volumes:
+        msg = "At least one volume is needed."
+        raise typer.BadParameter(msg)
+
+    start = time.perf_counter()
+    num_written = export_volumes(ComicsDatabase(), volumes, export_dir, corpus_dir)
+    secs = time.perf_counter() - start
+
+    num_groups = scan_groups(export_dir).select(pl.len()).collect().item()
+    print(
+        f'Rewrote {num_written} partitions in {secs:.1f}s; {num_groups} groups in "{export_dir}".'
+    )
+
+
+if __name__ == "__main__":
+    app()
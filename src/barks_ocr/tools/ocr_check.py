@@ -1,4 +1,5 @@
 # ruff: noqa: T201
+import multiprocessing as mp
 from collections import Counter, defaultdict
 from dataclasses import dataclass
 from datetime import UTC, datetime
@@ -15,9 +16,10 @@ from barks_fantagraphics.speech_groupers import OcrTypes, SpeechGroups, SpeechPa
 from comic_utils.common_typer_options import TitleArg, VolumesArg
 from intspan import intspan
 from loguru import logger
-from PIL import Image, ImageDraw, ImageFont
 
-from barks_ocr.utils.geometry import Rect
+from barks_ocr.cli_setup import get_logging_args, init_logging
+from barks_ocr.pipeline.speech_corpus import CorpusPageGroup, SpeechCorpus
+from barks_ocr.utils.font_metrics import FontMetrics
 from barks_ocr.utils.group_checks import (
     has_dash_no_spaces,
     has_dash_wrong_space,
@@ -28,6 +30,13 @@ from barks_ocr.utils.group_checks import (
     is_short_text,
 )
 from barks_ocr.utils.ocr_box import OcrBox, PointList
+from barks_ocr.utils.ocr_check_cache import (
+    DEFAULT_OCR_CHECK_CACHE_DIR,
+    CachedIssue,
+    OcrCheckCache,
+    get_group_hash,
+)
+from barks_ocr.utils.panel_index import NO_PANEL_NUM, PanelIndex
 
 # ── Text-fit constants ────────────────────────────────────────────────────────
 
@@ -38,8 +47,15 @@ FIT_HEIGHT_FRACTION = 0.75  # derived font size ≈ box line height * this
 FIT_MIN_FONT_SIZE = 8
 MIN_MATCH_RATIO = 0.7  # SequenceMatcher threshold for cross-engine pairing
 
+# Bump when a check changes in a way that can change its results, so cached results are dropped.
+CHECK_SUITE_VERSION = 1
+
 _FIT_FONT_MISSING_WARNED: list[bool] = [False]
-_FIT_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+_FIT_FONT_METRICS = FontMetrics(FIT_FONT_PATH)
+_FIT_VERIFY_COUNTS: Counter[str] = Counter()  # "checked" and "disagreed" for --verify-fit
+
+# Fixes need a 'SpeechPageGroup' to renumber and save groups; a plain check reads the corpus.
+type PageGroup = SpeechPageGroup | CorpusPageGroup
 
 # ── Issue data ────────────────────────────────────────────────────────────────
 
@@ -56,31 +72,39 @@ class IssueFound:
     notes: str
 
 
-def _rect_from_points(points: PointList) -> Rect:
-    bottom_left, top_right = points[0], points[1]
-    return Rect(
-        bottom_left[0],
-        bottom_left[1],
-        top_right[0] - bottom_left[0],
-        top_right[1] - bottom_left[1],
-    )
-
-
 def _box_wh(text_box: PointList) -> tuple[int, int]:
     """Return (width, height) in pixels from the text_box's min rotated rect."""
     bottom_left, top_right = OcrBox(text_box, "", 0, "").min_rotated_rectangle
     return int(top_right[0] - bottom_left[0]), int(top_right[1] - bottom_left[1])
 
 
-def _text_fits_in_box(  # noqa: C901
+def _get_widest_line(lines: list[str], font_size: int, *, rendered: bool) -> tuple[int, str]:
+    """Return (width, line) of the widest line, measured from the glyph tables or by PIL."""
+    get_line_width = (
+        _FIT_FONT_METRICS.get_rendered_line_width if rendered else _FIT_FONT_METRICS.get_line_width
+    )
+
+    max_line_w = 0
+    widest_line = ""
+    for line in lines:
+        line_w = get_line_width(line, font_size)
+        if line_w > max_line_w:
+            max_line_w = line_w
+            widest_line = line
+
+    return max_line_w, widest_line
+
+
+def _text_fits_in_box(  # noqa: C901, PLR0913
     ai_text: str,
     text_box: PointList,
     fanta_page: str = "",
     *,
     strict: bool = True,
     width_tolerance: float = FIT_WIDTH_TOLERANCE,
+    verify: bool = False,
 ) -> bool:
-    """Render ai_text at a box-calibrated font size; check it fits text_box width.
+    """Measure ai_text at a box-calibrated font size; check it fits text_box width.
 
     Derives the font size from the box height divided by the number of lines so
     that fewer lines means a larger font — which is exactly the Gemini failure
@@ -92,6 +116,10 @@ def _text_fits_in_box(  # noqa: C901
     This avoids false positives for groups whose text may be rotated (e.g.
     sound effects), since ``text_box`` itself is always axis-aligned and
     carries no rotation information.
+
+    Line widths come from the cached glyph tables of ``_FIT_FONT_METRICS``.
+    With ``verify`` they are also measured by PIL, and any orientation where
+    the two disagree on the fit is logged and decided by PIL.
     """
     if not ai_text.strip() or not text_box:
         return True
@@ -102,38 +130,42 @@ def _text_fits_in_box(  # noqa: C901
 
     lines = ai_text.split("\n")
     n_lines = max(1, len(lines))
+    page_prefix = f"page={fanta_page}: " if fanta_page else ""
 
     def _fits_one_orientation(w: int, h: int) -> tuple[bool, str]:
         """Return (fits, debug_msg). Font derives from h; widest line compared to w."""
         font_size = max(FIT_MIN_FONT_SIZE, int(h / n_lines * FIT_HEIGHT_FRACTION))
         try:
-            font = ImageFont.truetype(str(FIT_FONT_PATH), font_size)
+            _FIT_FONT_METRICS.get_font(font_size)
         except OSError:
             if not _FIT_FONT_MISSING_WARNED[0]:
                 logger.warning(f'Fit-check font not found: "{FIT_FONT_PATH}". Skipping fit checks.')
                 _FIT_FONT_MISSING_WARNED[0] = True
             return True, ""
 
-        max_line_w = 0
-        widest_line = ""
-        for line in lines:
-            if not line:
-                continue
-            left, _top, right, _bottom = _FIT_MEASURE_DRAW.textbbox((0, 0), line, font=font)
-            line_w = right - left
-            if line_w > max_line_w:
-                max_line_w = line_w
-                widest_line = line
-
         allowed_w = w * width_tolerance
+        max_line_w, widest_line = _get_widest_line(lines, font_size, rendered=False)
+        fits = max_line_w <= allowed_w
+
+        if verify:
+            _FIT_VERIFY_COUNTS["checked"] += 1
+            rendered_w, _ = _get_widest_line(lines, font_size, rendered=True)
+            if (rendered_w <= allowed_w) != fits:
+                _FIT_VERIFY_COUNTS["disagreed"] += 1
+                logger.warning(
+                    f"{page_prefix}Fit decisions differ: glyph tables {max_line_w}px,"
+                    f" PIL {rendered_w}px, allowed {allowed_w:.1f}px, font_size={font_size},"
+                    f" text={ai_text!r}."
+                )
+                max_line_w = rendered_w
+                fits = not fits
+
         msg = (
             f"w={w}px h={h}px n_lines={n_lines} font_size={font_size}"
             f" widest_line_w={max_line_w}px allowed={allowed_w:.1f}px"
             f" (tolerance={width_tolerance}) widest_line={widest_line!r}"
         )
-        return max_line_w <= allowed_w, msg
-
-    page_prefix = f"page={fanta_page}: " if fanta_page else ""
+        return fits, msg
 
     ok_h, msg_h = _fits_one_orientation(box_w, box_h)
     if ok_h:
@@ -184,7 +216,7 @@ def _apply_line_pattern(source_text: str, pattern_text: str) -> str:
 
 def _find_matching_group(
     group: dict,
-    other_page_group: SpeechPageGroup | None,
+    other_page_group: PageGroup | None,
     min_ratio: float = MIN_MATCH_RATIO,
 ) -> dict | None:
     """Best-matching group in the other engine, restricted to same panel_num.
@@ -218,10 +250,36 @@ def _find_matching_group(
     return best_group if best_ratio >= min_ratio else None
 
 
+def _get_check_suite_stamp() -> str:
+    """Return a stamp of the check suite and the settings that its results depend on."""
+    return (
+        f"{CHECK_SUITE_VERSION}:{FIT_FONT_PATH}:{FIT_FONT_PATH.is_file()}"
+        f":{FIT_WIDTH_TOLERANCE}:{FIT_WIDTH_TOLERANCE_SFX}:{FIT_HEIGHT_FRACTION}"
+        f":{FIT_MIN_FONT_SIZE}"
+    )
+
+
 def _other_ocr_type(ocr_type: OcrTypes) -> OcrTypes:
     return OcrTypes.PADDLEOCR if ocr_type == OcrTypes.EASYOCR else OcrTypes.EASYOCR
 
 
+def _make_cached_issues(  # noqa: PLR0913
+    volume: int,
+    fanta_page: str,
+    engine: str,
+    group_id: str,
+    group: dict,
+    cached_issues: list[CachedIssue],
+) -> list[IssueFound]:
+    """Return the issues of an unchanged group from its cached issue types and panel num."""
+    ai_text = (group.get("ai_text") or "").strip()
+    notes = (group.get("notes") or "").strip()
+    return [
+        IssueFound(volume, fanta_page, engine, group_id, issue_type, panel_num, ai_text, notes)
+        for issue_type, panel_num in cached_issues
+    ]
+
+
 class PanelNumState(Enum):
     PANEL_NUM_SET = auto()
     PANEL_NUM_NOT_SET_FIXABLE = auto()
@@ -234,18 +292,28 @@ class PanelNumState(Enum):
 class OcrChecker:
     """Checks prelim OCR JSON files for issues and writes a kivy-editor queue file."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         comics_database: ComicsDatabase,
         fix_panel_nums: bool,
         fix_groups_order: bool,
         fix_newlines: bool,
+        verify_fit: bool = False,
+        full: bool = False,
+        cache_dir: Path = DEFAULT_OCR_CHECK_CACHE_DIR,
     ) -> None:
         self._comics_database = comics_database
         self._fix_panel_nums = fix_panel_nums
         self._fix_groups_order = fix_groups_order
         self._fix_newlines = fix_newlines
-        self._speech_groups = SpeechGroups(comics_database)
+        self._verify_fit = verify_fit
+        fixing = fix_panel_nums or fix_groups_order or fix_newlines
+        # Fixes change the groups as they go, and verifying must measure, so neither is cached.
+        self._cache_dir: Path | None = None if fixing or verify_fit else cache_dir
+        self._use_cached = not full
+        self._speech_groups = (
+            SpeechGroups(comics_database) if fixing else SpeechCorpus(comics_database)
+        )
         self._title_panel_boxes = TitlePanelBoxes(self._comics_database)
 
     # ── Public API ────────────────────────────────────────────────────────────
@@ -254,70 +322,167 @@ class OcrChecker:
         self,
         title_list: list[str],
         output_file: Path,
+        workers: int = 1,
     ) -> None:
-        """Check all pages of each title; print issues and write a queue file."""
-        all_issues: list[IssueFound] = []
+        """Check all pages of each title; print issues and write a queue file.
 
-        for title_str in title_list:
-            print("-" * 80)
-            title = STR_TITLE_TO_ENUM[title_str]
-            volume = self._comics_database.get_fanta_volume_int(title_str)
-            page_groups = self._speech_groups.get_speech_page_groups(title)
-            page_panel_boxes = self._title_panel_boxes.get_page_panel_boxes(title)
-
-            pages: dict[str, dict[OcrTypes, SpeechPageGroup]] = defaultdict(dict)
-            for pg in page_groups:
-                pages[pg.fanta_page][pg.ocr_index] = pg
-
-            title_issues: list[IssueFound] = []
-            for fanta_page in sorted(pages):
-                variants = pages[fanta_page]
-                for ocr_index, page_group in variants.items():
-                    other = variants.get(_other_ocr_type(ocr_index))
-                    title_issues.extend(self._check_page_group(page_group, page_panel_boxes, other))
-
-            if title_issues:
-                print(f'Issues in "{title_str}" (Vol. {volume}):')
-                for issue in title_issues:
-                    self._print_issue(issue)
-            else:
-                print(f'  No issues in "{title_str}" (Vol. {volume}).')
+        With more than one worker the titles are checked in a process pool, each
+        title - and so each page file a fix may write - by exactly one worker.
+        Results are taken in 'title_list' order, so the printed issues and the
+        queue file are the same as for a serial run.
+        """
+        all_issues: list[IssueFound] = []
 
+        def add_title_issues(title_str: str, title_issues: list[IssueFound]) -> None:
+            self._print_title_issues(title_str, title_issues)
             all_issues.extend(title_issues)
 
+        # No point spawning more workers than titles.
+        effective_workers = min(workers, len(title_list)) if title_list else 1
+        if effective_workers > 1:
+            if isinstance(self._speech_groups, SpeechCorpus):
+                # Bring the corpora up to date here so the workers don't all remake them.
+                self._speech_groups.update_volumes(
+                    {self._comics_database.get_fanta_volume_int(t) for t in title_list}
+                )
+            logger.info(f"Checking {len(title_list)} titles with {effective_workers} workers...")
+            ctx = mp.get_context("spawn")
+            with ctx.Pool(
+                processes=effective_workers,
+                initializer=_worker_init,
+                initargs=(
+                    self._fix_panel_nums,
+                    self._fix_groups_order,
+                    self._fix_newlines,
+                    self._verify_fit,
+                    not self._use_cached,
+                    self._cache_dir,
+                    get_logging_args(),
+                ),
+            ) as pool:
+                for title_str, (title_issues, verify_counts) in zip(
+                    title_list, pool.imap(_worker_run, title_list), strict=True
+                ):
+                    print("-" * 80)
+                    _FIT_VERIFY_COUNTS.update(verify_counts)
+                    add_title_issues(title_str, title_issues)
+        else:
+            for title_str in title_list:
+                print("-" * 80)
+                add_title_issues(title_str, self.check_title(title_str))
+
         self._print_issues_summary(all_issues)
+        if self._verify_fit:
+            print(
+                f"Text-fit verification: {_FIT_VERIFY_COUNTS['disagreed']} of"
+                f" {_FIT_VERIFY_COUNTS['checked']} fit decisions differed from PIL's."
+            )
         self._write_queue_file(all_issues, output_file)
 
+    def check_title(self, title_str: str) -> list[IssueFound]:
+        """Check all pages of a title and return the issues found, in page order.
+
+        Unless fixing or verifying, groups unchanged since the title's last check
+        get the issues cached then.
+        """
+        title = STR_TITLE_TO_ENUM[title_str]
+        page_groups = self._speech_groups.get_speech_page_groups(title)
+        page_panel_boxes = self._title_panel_boxes.get_page_panel_boxes(title)
+
+        pages: dict[str, dict[OcrTypes, PageGroup]] = defaultdict(dict)
+        for pg in page_groups:
+            pages[pg.fanta_page][pg.ocr_index] = pg
+
+        cache = (
+            None
+            if self._cache_dir is None
+            else OcrCheckCache(self._cache_dir / f"{title_str}.json", _get_check_suite_stamp())
+        )
+
+        title_issues: list[IssueFound] = []
+        for fanta_page in sorted(pages):
+            variants = pages[fanta_page]
+            for ocr_index, page_group in variants.items():
+                other = variants.get(_other_ocr_type(ocr_index))
+                title_issues.extend(
+                    self._check_page_group(page_group, page_panel_boxes, other, cache)
+                )
+
+        if cache is not None:
+            cache.save()
+            logger.debug(
+                f'"{title_str}": {cache.num_hits} of {cache.num_groups} groups unchanged'
+                " since the last check."
+            )
+
+        return title_issues
+
     # ── Per-page / per-group checks ───────────────────────────────────────────
 
     def _check_page_group(
         self,
-        page_group: SpeechPageGroup,
+        page_group: PageGroup,
         page_panel_boxes: TitlePagesPanelBoxes,
-        other_page_group: SpeechPageGroup | None = None,
+        other_page_group: PageGroup | None = None,
+        cache: OcrCheckCache | None = None,
     ) -> list[IssueFound]:
         volume = page_group.fanta_vol
         fanta_page = page_group.fanta_page
         engine = str(page_group.ocr_index)
         json_groups = page_group.speech_page_json.get("groups", {})
-        per_page_boxes = page_panel_boxes.pages[fanta_page]
 
         issues: list[IssueFound] = []
         there_were_fixes = False
 
         if self._fix_groups_order:
+            assert isinstance(page_group, SpeechPageGroup)
             if page_group.renumber_groups():
                 there_were_fixes = True
         else:
+            # Only the panel num checks and fixes need the panels of unassigned groups.
+            missing_panel_nums = self._get_missing_panel_nums(
+                json_groups, page_panel_boxes.pages[fanta_page]
+            )
+            page_key = f"{fanta_page}/{engine}"
             for group_id, group in json_groups.items():
+                missing_panel_num = missing_panel_nums.get(group_id, NO_PANEL_NUM)
+                group_hash = ""
+                if cache is not None:
+                    group_hash = get_group_hash(group, missing_panel_num)
+                    cached_issues = (
+                        cache.get(page_key, group_id, group_hash) if self._use_cached else None
+                    )
+                    if cached_issues is not None:
+                        issues.extend(
+                            _make_cached_issues(
+                                volume, fanta_page, engine, group_id, group, cached_issues
+                            )
+                        )
+                        cache.put(page_key, group_id, group_hash, cached_issues)
+                        continue
+
                 group_issues, there_were_group_fixes = self._check_group(
-                    volume, fanta_page, engine, group_id, group, per_page_boxes, other_page_group
+                    volume,
+                    fanta_page,
+                    engine,
+                    group_id,
+                    group,
+                    missing_panel_num,
+                    other_page_group,
                 )
                 issues.extend(group_issues)
                 if there_were_group_fixes:
                     there_were_fixes = True
+                if cache is not None:
+                    cache.put(
+                        page_key,
+                        group_id,
+                        group_hash,
+                        [(issue.issue_type, issue.panel_num) for issue in group_issues],
+                    )
 
         if there_were_fixes:
+            assert isinstance(page_group, SpeechPageGroup)
             page_group.save_json()
 
         return issues
@@ -329,12 +494,12 @@ class OcrChecker:
         engine: str,
         group_id: str,
         group: dict,
-        page_panel_boxes: PagePanelBoxes,
-        other_page_group: SpeechPageGroup | None = None,
+        missing_panel_num: int,
+        other_page_group: PageGroup | None = None,
     ) -> tuple[list[IssueFound], bool]:
         ai_text = (group.get("ai_text") or "").strip()
         notes = (group.get("notes") or "").strip()
-        panel_num_state, panel_num = self._get_panel_num_state(group, page_panel_boxes)
+        panel_num_state, panel_num = self._get_panel_num_state(group, missing_panel_num)
 
         issues: list[IssueFound] = []
         there_were_fixes = False
@@ -393,7 +558,7 @@ class OcrChecker:
         group: dict,
         group_id: str,
         fanta_page: str,
-        other_page_group: SpeechPageGroup | None,
+        other_page_group: PageGroup | None,
     ) -> tuple[bool, str | None]:
         """Return (fix_applied, issue_type_to_add).
 
@@ -415,7 +580,12 @@ class OcrChecker:
         )
 
         if _text_fits_in_box(
-            ai_text, text_box, fanta_page, strict=strict, width_tolerance=width_tolerance
+            ai_text,
+            text_box,
+            fanta_page,
+            strict=strict,
+            width_tolerance=width_tolerance,
+            verify=self._verify_fit,
         ):
             return False, None
 
@@ -445,13 +615,14 @@ class OcrChecker:
 
     # ── Predicates ────────────────────────────────────────────────────────────
 
-    def _get_panel_num_state(
-        self, group: dict, page_panel_boxes: PagePanelBoxes
-    ) -> tuple[PanelNumState, int]:
+    @staticmethod
+    def _get_panel_num_state(group: dict, missing_panel_num: int) -> tuple[PanelNumState, int]:
         panel_num = int(group.get("panel_num", -1))
         if panel_num != -1:
             return PanelNumState.PANEL_NUM_SET, panel_num
-        return self._can_replace_missing_panel_num(group, page_panel_boxes)
+        if missing_panel_num != NO_PANEL_NUM:
+            return PanelNumState.PANEL_NUM_NOT_SET_FIXABLE, missing_panel_num
+        return PanelNumState.PANEL_NUM_NOT_SET_UNFIXABLE, -1
 
     def _deal_with_fixable_panel_num(self, group: dict, group_id: str, panel_num: int) -> bool:
         if self._fix_panel_nums:
@@ -467,54 +638,29 @@ class OcrChecker:
         return False
 
     # ── Panel-num fix helpers ─────────────────────────────────────────────────
-    # TODO: Duplicated code from string_replacers
-    def _can_replace_missing_panel_num(
-        self, group: dict, page_panel_boxes: PagePanelBoxes
-    ) -> tuple[PanelNumState, int]:
-        panel_num = int(group["panel_num"])
-        assert panel_num == -1
-
-        text_box = group["text_box"]
-        for reduce_by in [20, 40, 60]:
-            can_do, reduced_box = self._get_reduced_text_box(text_box, reduce_by)
-            if not can_do:
-                logger.warning(f"Could not reduce text box: {text_box}")
-                break
-            assert reduced_box
-            new_panel_num = self._get_enclosing_panel_num(reduced_box, page_panel_boxes)
-            if new_panel_num != -1:
-                return PanelNumState.PANEL_NUM_NOT_SET_FIXABLE, new_panel_num
-
-        logger.warning(f"Could not find enclosing panel for box: {text_box}")
-
-        return PanelNumState.PANEL_NUM_NOT_SET_UNFIXABLE, -1
-
-    @staticmethod
-    def _get_reduced_text_box(text_box: PointList, reduce_by: int) -> tuple[bool, PointList | None]:
-        p0_x = text_box[0][0] + reduce_by
-        p0_y = text_box[0][1] + reduce_by
-        p1_x = text_box[1][0] - reduce_by
-        p1_y = text_box[1][1] + reduce_by
-        p2_x = text_box[2][0] - reduce_by
-        p2_y = text_box[2][1] - reduce_by
-        p3_x = text_box[3][0] + reduce_by
-        p3_y = text_box[3][1] - reduce_by
-
-        if p1_x <= p0_x or p2_y <= p0_y:
-            return False, None
-
-        return True, [(p0_x, p0_y), (p1_x, p1_y), (p2_x, p2_y), (p3_x, p3_y)]
 
     @staticmethod
-    def _get_enclosing_panel_num(box: PointList, page_panel_boxes: PagePanelBoxes) -> int:
-        box_rect = _rect_from_points(OcrBox(box, "", 0, "").min_rotated_rectangle)
-
-        for i, panel_box in enumerate(page_panel_boxes.panel_boxes):
-            panel_rect = Rect(panel_box.x0, panel_box.y0, panel_box.w, panel_box.h)
-            if panel_rect.is_rect_inside_rect(box_rect):
-                return i + 1
-
-        return -1
+    def _get_missing_panel_nums(
+        json_groups: dict[str, dict], page_panel_boxes: PagePanelBoxes
+    ) -> dict[str, int]:
+        """Enclosing panel, found with shrunk text boxes, of every group with no panel_num."""
+        missing_group_ids = [
+            group_id
+            for group_id, group in json_groups.items()
+            if int(group.get("panel_num", -1)) == -1
+        ]
+        if not missing_group_ids:
+            return {}
+
+        text_boxes = [json_groups[group_id]["text_box"] for group_id in missing_group_ids]
+        panel_index = PanelIndex.from_panel_boxes(page_panel_boxes.panel_boxes)
+        panel_nums = panel_index.get_enclosing_panel_nums_with_shrink(text_boxes).tolist()
+
+        for text_box, panel_num in zip(text_boxes, panel_nums, strict=True):
+            if panel_num == NO_PANEL_NUM:
+                logger.warning(f"Could not find enclosing panel for box: {text_box}")
+
+        return dict(zip(missing_group_ids, panel_nums, strict=True))
 
     # ── Output helpers ────────────────────────────────────────────────────────
 
@@ -537,6 +683,15 @@ class OcrChecker:
         output_file.write_text("\n".join(queue_lines) + ("\n" if queue_lines else ""))
         print(f'\nQueue file: "{output_file}" ({len(queue_lines)} entries).')
 
+    def _print_title_issues(self, title_str: str, title_issues: list[IssueFound]) -> None:
+        volume = self._comics_database.get_fanta_volume_int(title_str)
+        if title_issues:
+            print(f'Issues in "{title_str}" (Vol. {volume}):')
+            for issue in title_issues:
+                self._print_issue(issue)
+        else:
+            print(f'  No issues in "{title_str}" (Vol. {volume}).')
+
     @staticmethod
     def _print_issues_summary(all_issues: list[IssueFound]) -> None:
         print()
@@ -558,6 +713,43 @@ class OcrChecker:
         )
 
 
+# ── Worker processes ──────────────────────────────────────────────────────────
+
+_WORKER_CHECKER: OcrChecker | None = None
+
+
+def _worker_init(  # noqa: PLR0913
+    fix_panel_nums: bool,
+    fix_groups_order: bool,
+    fix_newlines: bool,
+    verify_fit: bool,
+    full: bool,
+    cache_dir: Path | None,
+    logging_args: tuple[str, str, str],
+) -> None:
+    """Pool initializer - log like the parent and make the checker once per worker process."""
+    init_logging(*logging_args)
+
+    global _WORKER_CHECKER  # noqa: PLW0603
+    _WORKER_CHECKER = OcrChecker(
+        ComicsDatabase(),
+        fix_panel_nums,
+        fix_groups_order,
+        fix_newlines,
+        verify_fit,
+        full,
+        cache_dir or DEFAULT_OCR_CHECK_CACHE_DIR,
+    )
+
+
+def _worker_run(title_str: str) -> tuple[list[IssueFound], Counter[str]]:
+    """Check one title in a worker; return its issues and text-fit verification counts."""
+    assert _WORKER_CHECKER is not None
+    _FIT_VERIFY_COUNTS.clear()
+    title_issues = _WORKER_CHECKER.check_title(title_str)
+    return title_issues, Counter(_FIT_VERIFY_COUNTS)
+
+
 # ── CLI ───────────────────────────────────────────────────────────────────────
 
 app = typer.Typer()
@@ -584,19 +776,31 @@ def main(  # noqa: PLR0913
     fix_panel_nums: bool = False,
     fix_groups_order: bool = False,
     fix_newlines: bool = False,
+    verify_fit: bool = typer.Option(
+        default=False, help="Also measure text-fit line widths with PIL and report differences"
+    ),
+    workers: int = typer.Option(
+        1, "--workers", "-w", help="Parallel title processes (1 = no multiprocessing)"
+    ),
+    full: bool = typer.Option(
+        default=False, help="Check every group, not just those changed since the last check"
+    ),
 ) -> None:
     if volumes_str and title_str:
         err_msg = "Options --volume and --title are mutually exclusive."
         raise typer.BadParameter(err_msg)
+    if workers < 1:
+        msg = "--workers must be >= 1."
+        raise typer.BadParameter(msg)
 
     comics_database = ComicsDatabase()
     volumes = list(intspan(volumes_str)) if volumes_str else []
     title_list = get_titles(comics_database, volumes, title_str, exclude_non_comics=True)
 
     output_file = output or _default_output_file(volumes_str)
-    OcrChecker(comics_database, fix_panel_nums, fix_groups_order, fix_newlines).check_titles(
-        title_list, output_file
-    )
+    OcrChecker(
+        comics_database, fix_panel_nums, fix_groups_order, fix_newlines, verify_fit, full
+    ).check_titles(title_list, output_file, workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+# ruff: noqa: T201
+
+"""Print a per-volume, per-stage completeness matrix for the OCR pipeline.
+
+Every directory holding pipeline files (raw OCR, batch details, batch results,
+prelim and final groups) is listed at most once with ``os.scandir``, and the
+listings are cached on disk keyed by the directory's mtime, so a rerun only
+rescans directories that have had files added, removed or renamed since.
+
+Nothing here imports the OCR engines, spaCy or the Gemini client.
+
+The 'Index' column compares the Whoosh index directory's mtime with the
+volume's prelim and final groups directories: 'stale' means files were added,
+removed or renamed there after the index was last written. In-place edits of
+existing groups files don't change a directory mtime, so they don't show up.
+"""
+
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import typer
+from barks_fantagraphics.comics_consts import RESTORABLE_PAGE_TYPES
+from barks_fantagraphics.comics_database import ComicsDatabase
+from barks_fantagraphics.comics_utils import get_ocr_type
+from barks_fantagraphics.ocr_file_paths import (
+    BATCH_JOBS_OUTPUT_DIR,
+    FINISHED_BATCH_JOBS_DIR,
+    get_batch_details_file,
+    get_ocr_predicted_groups_filename,
+)
+from barks_fantagraphics.ocr_json_files import JsonFiles
+from comic_utils.common_typer_options import LogLevelArg, VolumesArg
+from intspan import intspan
+from loguru import logger
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.utils.index_paths import get_volumes_index_dir
+
+APP_LOGGING_NAME = "psta"
+
+LISTINGS_CACHE_VERSION = 1
+DEFAULT_LISTINGS_CACHE_FILE = Path.home() / ".cache" / "barks-ocr" / "status-dir-listings.json"
+
+STAGE_COLUMNS = ["OCR", "Batch", "Results", "Prelim", "Final", "Index"]
+
+
+class DirListings:
+    """Directory file name listings, cached on disk by directory mtime."""
+
+    def __init__(self, cache_file: Path) -> None:
+        self._cache_file = cache_file
+        self._cache: dict[str, list] = {}
+        self._listings: dict[Path, frozenset[str]] = {}
+        self._mtimes: dict[Path, int] = {}
+        self._num_scanned = 0
+
+        if cache_file.is_file():
+            # noinspection PyBroadException
+            try:
+                cache = json.loads(cache_file.read_text())
+                if cache.get("version") == LISTINGS_CACHE_VERSION:
+                    self._cache = cache["dirs"]
+            except Exception:  # noqa: BLE001
+                logger.warning(f'Ignoring unreadable listings cache "{cache_file}".')
+
+    @property
+    def num_scanned(self) -> int:
+        return self._num_scanned
+
+    def get_names(self, directory: Path) -> frozenset[str]:
+        """Return the file names in 'directory' (empty if there is no such directory)."""
+        names = self._listings.get(directory)
+        if names is not None:
+            return names
+
+        mtime_ns = self.get_mtime_ns(directory)
+        if mtime_ns is None:
+            names = frozenset()
+        else:
+            cached = self._cache.get(str(directory))
+            if cached is not None and cached[0] == mtime_ns:
+                names = frozenset(cached[1])
+            else:
+                with os.scandir(directory) as entries:
+                    names = frozenset(entry.name for entry in entries)
+                self._cache[str(directory)] = [mtime_ns, sorted(names)]
+                self._num_scanned += 1
+
+        self._listings[directory] = names
+        return names
+
+    def get_mtime_ns(self, directory: Path) -> int | None:
+        if directory not in self._mtimes:
+            try:
+                self._mtimes[directory] = directory.stat().st_mtime_ns
+            except FileNotFoundError:
+                return None
+        return self._mtimes[directory]
+
+    def has_file(self, file: Path) -> bool:
+        return file.name in self.get_names(file.parent)
+
+    def save(self) -> None:
+        if self._num_scanned == 0:
+            return
+        self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self._cache_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps({"version": LISTINGS_CACHE_VERSION, "dirs": self._cache}))
+        temp_file.replace(self._cache_file)
+
+
+@dataclass
+class VolumeStatus:
+    volume: int
+    num_titles: int = 0
+    num_pages: int = 0
+    num_ocr_files: int = 0
+    have_ocr: int = 0
+    batch_titles: int = 0
+    have_results: int = 0
+    have_prelim: int = 0
+    have_final: int = 0
+    index_state: str = "no"
+    groups_dirs: set[Path] = field(default_factory=set)
+
+
+def get_volume_status(
+    comics_database: ComicsDatabase, volume: int, listings: DirListings
+) -> VolumeStatus:
+    status = VolumeStatus(volume)
+    volume_dirname = comics_database.get_fantagraphics_volume_title(volume)
+    batch_results_dir = BATCH_JOBS_OUTPUT_DIR / volume_dirname
+
+    titles = comics_database.get_configured_titles_in_fantagraphics_volumes(
+        [volume], exclude_non_comics=True
+    )
+    for title, _ in titles:
+        status.num_titles += 1
+
+        batch_details_file = get_batch_details_file(title)
+        if listings.has_file(batch_details_file) or listings.has_file(
+            FINISHED_BATCH_JOBS_DIR / batch_details_file.name
+        ):
+            status.batch_titles += 1
+
+        comic = comics_database.get_comic_book(title)
+        json_files = JsonFiles(comics_database, title)
+        svg_files = comic.get_srce_restored_svg_story_files(RESTORABLE_PAGE_TYPES)
+        ocr_files = comic.get_srce_restored_ocr_raw_story_files(RESTORABLE_PAGE_TYPES)
+        for svg_file, ocr_file in zip(svg_files, ocr_files, strict=True):
+            status.num_pages += 1
+            fanta_page = Path(svg_file).stem
+            json_files.set_ocr_file(ocr_file)
+
+            for ocr_type_file, prelim_file in zip(
+                ocr_file, json_files.ocr_prelim_groups_json_file, strict=True
+            ):
+                predicted_file = batch_results_dir / get_ocr_predicted_groups_filename(
+                    fanta_page, get_ocr_type(ocr_type_file)
+                )
+                status.num_ocr_files += 1
+                status.have_ocr += listings.has_file(Path(ocr_type_file))
+                status.have_results += listings.has_file(predicted_file)
+                status.have_prelim += listings.has_file(prelim_file)
+                status.groups_dirs.add(prelim_file.parent)
+
+            final_files = json_files.ocr_final_groups_json_file
+            status.have_final += any(listings.has_file(f) for f in final_files)
+            status.groups_dirs.update(f.parent for f in final_files)
+
+    return status
+
+
+def set_index_states(statuses: list[VolumeStatus], index_dir: Path, listings: DirListings) -> None:
+    index_mtime_ns = listings.get_mtime_ns(index_dir)
+    for status in statuses:
+        if index_mtime_ns is None or status.have_prelim == 0:
+            status.index_state = "no"
+            continue
+        groups_mtimes = [listings.get_mtime_ns(d) or 0 for d in status.groups_dirs]
+        status.index_state = "stale" if max(groups_mtimes) > index_mtime_ns else "yes"
+
+
+def _get_fraction_str(count: int, total: int) -> str:
+    if total == 0:
+        return "-"
+    return "done" if count == total else f"{count}/{total}"
+
+
+def print_status_matrix(statuses: list[VolumeStatus]) -> None:
+    print(f"{'Vol':>4} {'Titles':>6} {'Pages':>6} " + " ".join(f"{c:>9}" for c in STAGE_COLUMNS))
+
+    totals: defaultdict[str, int] = defaultdict(int)
+    for status in statuses:
+        cells = [
+            _get_fraction_str(status.have_ocr, status.num_ocr_files),
+            _get_fraction_str(status.batch_titles, status.num_titles),
+            _get_fraction_str(status.have_results, status.num_ocr_files),
+            _get_fraction_str(status.have_prelim, status.num_ocr_files),
+            _get_fraction_str(status.have_final, status.num_pages),
+            status.index_state,
+        ]
+        print(
+            f"{status.volume:>4} {status.num_titles:>6} {status.num_pages:>6} "
+            + " ".join(f"{c:>9}" for c in cells)
+        )
+        totals["pages"] += status.num_pages
+        totals["final"] += status.have_final
+
+    print()
+    print(f"Final groups for {totals['final']} of {totals['pages']} pages.")
+
+
+app = typer.Typer()
+
+
+@app.command(help="Show how far each volume has got through the OCR pipeline")
+def main(
+    volumes_str: VolumesArg = "",
+    ocr_index: int = typer.Option(1, help="OCR type of the Whoosh index to check"),
+    listings_cache_file: Path = typer.Option(  # noqa: B008
+        DEFAULT_LISTINGS_CACHE_FILE, help="Directory listings cache"
+    ),
+    log_level_str: LogLevelArg = "WARNING",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "pipeline-status.log", log_level_str)
+
+    volumes = list(intspan(volumes_str))
+    if not volumes:
+        msg = "At least one volume is needed."
+        raise typer.BadParameter(msg)
+
+    comics_database = ComicsDatabase()
+    listings = DirListings(listings_cache_file)
+
+    statuses = [get_volume_status(comics_database, volume, listings) for volume in volumes]
+    set_index_states(statuses, get_volumes_index_dir(ocr_index), listings)
+    listings.save()
+    logger.info(f"Scanned {listings.num_scanned} directories.")
+
+    print_status_matrix(statuses)
+
+
+if __name__ == "__main__":
+    app()
@@ -8,13 +8,12 @@ import typer
 from barks_fantagraphics.barks_titles import STR_TITLE_TO_ENUM
 from barks_fantagraphics.comics_database import ComicsDatabase
 from barks_fantagraphics.comics_helpers import get_titles
-from barks_fantagraphics.panel_boxes import PagePanelBoxes, TitlePagesPanelBoxes, TitlePanelBoxes
+from barks_fantagraphics.panel_boxes import TitlePagesPanelBoxes, TitlePanelBoxes
 from barks_fantagraphics.speech_groupers import SpeechGroups, SpeechPageGroup
 from comic_utils.common_typer_options import TitleArg, VolumesArg
 from intspan import intspan
 
-from barks_ocr.utils.geometry import Rect
-from barks_ocr.utils.ocr_box import OcrBox, PointList
+from barks_ocr.utils.panel_index import NO_PANEL_NUM, PanelIndex
 
 SKIP_PREFIXES = {
     (" - ", 12): [105],
@@ -27,14 +26,15 @@ class PageCleaner:
         self,
         dry_run: bool,
         speech_page_group: SpeechPageGroup,
-        page_panel_boxes: PagePanelBoxes,
+        panel_index: PanelIndex,
         skip_pages: list[int],
         target_regex: re.Pattern[str] | None,
         replacement_string: str,
     ) -> None:
         self._dry_run = dry_run
         self._speech_page_group = speech_page_group
-        self._page_panel_boxes = page_panel_boxes
+        self._panel_index = panel_index
+        self._missing_panel_nums: dict[str, int] = {}
         self._skip_pages = skip_pages
         self._target_regex = target_regex
         self._replacement_string = replacement_string
@@ -48,6 +48,8 @@ class PageCleaner:
         prelim_ocr_json = self._speech_page_group.speech_page_json
 
         try:
+            self._missing_panel_nums = self._get_missing_panel_nums(prelim_ocr_json["groups"])
+
             dirty_content = False
             remove_groups = []
             for group_id, group in prelim_ocr_json["groups"].items():
@@ -112,31 +114,34 @@ class PageCleaner:
 
         return False
 
-    def _replace_missing_panel_num(self, _group_id: str, group: dict) -> tuple[bool, int]:
-        panel_num = int(group["panel_num"])
-
-        if panel_num != -1:
-            return False, -1
+    def _get_missing_panel_nums(self, groups: dict[str, dict]) -> dict[str, int]:
+        missing_group_ids = [
+            group_id for group_id, group in groups.items() if int(group["panel_num"]) == -1
+        ]
+        if not missing_group_ids:
+            return {}
 
         # Look for a containing panel by trying successively smaller text boxes.
-        text_box = group["text_box"]
-        reduce_by_amounts = [20, 40, 60]
+        panel_nums = self._panel_index.get_enclosing_panel_nums_with_shrink(
+            [groups[group_id]["text_box"] for group_id in missing_group_ids]
+        )
 
-        for reduce_by in reduce_by_amounts:
-            can_do, reduced_box = self._get_reduced_text_box(text_box, reduce_by)
-            if not can_do:
-                break
+        return dict(zip(missing_group_ids, panel_nums.tolist(), strict=True))
 
-            assert reduced_box
-            new_panel_num = self._get_enclosing_panel_num(reduced_box)
+    def _replace_missing_panel_num(self, group_id: str, group: dict) -> tuple[bool, int]:
+        panel_num = int(group["panel_num"])
 
-            if new_panel_num != -1:
-                print(
-                    f'For file "{self._speech_page_group.ocr_prelim_groups_json_file.name}"'
-                    f" and text {group['ai_text']!r},"
-                    f" fix panel_num with new value {new_panel_num}."
-                )
-                return True, new_panel_num
+        if panel_num != -1:
+            return False, -1
+
+        new_panel_num = self._missing_panel_nums.get(group_id, NO_PANEL_NUM)
+        if new_panel_num != NO_PANEL_NUM:
+            print(
+                f'For file "{self._speech_page_group.ocr_prelim_groups_json_file.name}"'
+                f" and text {group['ai_text']!r},"
+                f" fix panel_num with new value {new_panel_num}."
+            )
+            return True, new_panel_num
 
         print(
             f'*** ERROR: For file "{self._speech_page_group.ocr_prelim_groups_json_file.name}",'
@@ -144,51 +149,6 @@ class PageCleaner:
         )
         return False, -1
 
-    @staticmethod
-    def _get_reduced_text_box(text_box: PointList, reduce_by: int) -> tuple[bool, PointList | None]:
-        p0_x = text_box[0][0] + reduce_by
-        p0_y = text_box[0][1] + reduce_by
-
-        p1_x = text_box[1][0] - reduce_by
-        p1_y = text_box[1][1] + reduce_by
-
-        p2_x = text_box[2][0] - reduce_by
-        p2_y = text_box[2][1] - reduce_by
-
-        p3_x = text_box[3][0] + reduce_by
-        p3_y = text_box[3][1] - reduce_by
-
-        if p1_x <= p0_x or p2_y <= p0_y:
-            return False, None
-
-        return True, [(p0_x, p0_y), (p1_x, p1_y), (p2_x, p2_y), (p3_x, p3_y)]
-
-    def _get_enclosing_panel_num(self, box: PointList) -> int:
-        ocr_box = OcrBox(box, "", 0, "")
-        box = ocr_box.min_rotated_rectangle
-        bottom_left = box[0]
-        top_right = box[1]
-        box_rect = Rect(
-            bottom_left[0],
-            bottom_left[1],
-            top_right[0] - bottom_left[0],
-            top_right[1] - bottom_left[1],
-        )
-        # print("box_rect", "XX", box_rect, "XX")
-
-        for i, panel_box in enumerate(self._page_panel_boxes.panel_boxes):
-            top_left_x = panel_box.x0
-            top_left_y = panel_box.y0
-            w = panel_box.w
-            h = panel_box.h
-            panel_rect = Rect(top_left_x, top_left_y, w, h)
-            # print("panel_rect", i, "YY", panel_rect, "YY")
-            if panel_rect.is_rect_inside_rect(box_rect):
-                # print(f"Is inside: {i+1}.")
-                return i + 1
-
-        return -1
-
     def _get_replace_text(self, _group_id: str, group: dict) -> tuple[bool, str]:
         ai_text = group["ai_text"]
         assert self._target_regex is not None
@@ -304,7 +264,7 @@ class PrelimOCRCleaner:
             page_cleaner = PageCleaner(
                 self._dry_run,
                 speech_page_group,
-                page_panel_boxes.pages[fanta_page],
+                PanelIndex.from_panel_boxes(page_panel_boxes.pages[fanta_page].panel_boxes),
                 skip_pages,
                 target_regex,
                 replacement_string,
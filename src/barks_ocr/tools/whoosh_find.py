@@ -1,88 +1,155 @@
 # ruff: noqa: T201
 import contextlib
 from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
 
 import typer
 from barks_fantagraphics.barks_titles import STR_TITLE_TO_ENUM
-from barks_fantagraphics.comics_consts import BARKS_ROOT_DIR
-from barks_fantagraphics.speech_groupers import OCR_TYPE_DICT
-from barks_fantagraphics.whoosh_search_engine import ENTITY_TYPES, SearchEngine
+from barks_fantagraphics.entity_types import EntityType
+from barks_fantagraphics.speech_groupers import OCR_TYPE_DICT, OcrTypes
 from comic_utils.common_typer_options import LogLevelArg
 
 from barks_ocr.cli_setup import init_logging
+from barks_ocr.tools.whoosh_find_client import find_with_server
+from barks_ocr.utils.index_paths import get_volumes_index_dir
 from barks_ocr.utils.paragraph_wrap import ParagraphWrapper
 
+if TYPE_CHECKING:
+    from barks_fantagraphics.whoosh_search_engine import TitleDict
+
 APP_LOGGING_NAME = "whof"
 
 app = typer.Typer()
 
 
+def _find(ocr_index: int, entity_type: str | None, words: str, no_server: bool) -> "TitleDict":
+    if not no_server:
+        found = find_with_server(ocr_index, entity_type, words)
+        if found is not None:
+            return found
+
+    # Only an in-process search needs Whoosh and the search engine.
+    from barks_fantagraphics.whoosh_search_engine import SearchEngine  # noqa: PLC0415
+
+    from barks_ocr.tools.whoosh_find_server import run_search  # noqa: PLC0415
+
+    return run_search(SearchEngine(get_volumes_index_dir(ocr_index)), entity_type, words)
+
+
+def _print_found(
+    found_text: "TitleDict", words: str, engine: OcrTypes, queue_file: TextIO | None
+) -> None:
+    text_indenter = ParagraphWrapper(initial_indent="       ", subsequent_indent="            ")
+    for comic_title, title_info in found_text.items():
+        print(f'"{comic_title}"')
+        title = STR_TITLE_TO_ENUM[comic_title]
+
+        for fanta_page, page_info in title_info.fanta_pages.items():
+            print(
+                f"     Fanta vol {title_info.fanta_vol}, page {fanta_page},"
+                f" Comic page {page_info.comic_page}"
+            )
+            for speech_info in page_info.speech_info_list:
+                sp_id = speech_info.group_id
+                panel = speech_info.panel_num
+                text_lines = speech_info.speech_text.replace("\u00ad", "-")
+                entity_suffix = (
+                    f" [{','.join(speech_info.entity_types)}]" if speech_info.entity_types else ""
+                )
+                indented_text = text_indenter.fill(
+                    f'"{sp_id} ({panel}){entity_suffix}": {text_lines}'
+                )
+                print(indented_text)
+                print()
+                if queue_file is not None:
+                    queue_file.write(
+                        f'"{words}" {title.name} {page_info.comic_page}'
+                        f"  {title_info.fanta_vol} {fanta_page} {engine} {sp_id}\n"
+                    )
+            print()
+
+
+def _find_fuzzy(
+    ocr_index: int, words: str, max_edits: int | None, no_server: bool
+) -> "list[tuple[str, TitleDict]]":
+    """Return the search results for each index term close to each of the words."""
+    # The trigram index needs Whoosh - keep it out of plain searches.
+    from barks_ocr.pipeline.whoosh_fuzzy import (  # noqa: PLC0415
+        DEFAULT_MAX_EDITS,
+        FuzzyTermIndex,
+        get_max_edits,
+    )
+
+    if max_edits is None:
+        max_edits = DEFAULT_MAX_EDITS
+    fuzzy_index = FuzzyTermIndex.load_or_build(get_volumes_index_dir(ocr_index))
+
+    all_found = []
+    for word in words.lower().split():
+        matches = fuzzy_index.find(word, max_edits)
+        if not matches:
+            print(f'No index terms within {get_max_edits(word, max_edits)} edits of "{word}".')
+            continue
+
+        match_strs = [f"{m.term} ({m.edits} edits, {m.doc_freq} groups)" for m in matches]
+        print(f'Index terms close to "{word}": {", ".join(match_strs)}')
+        all_found.extend((m.term, _find(ocr_index, None, m.term, no_server)) for m in matches)
+
+    print()
+    return all_found
+
+
 @app.command(help="Find words in the Whoosh index")
-def main(
+def main(  # noqa: PLR0913
     words: str = "",
     ocr_index: int = 1,
     entity_type: str | None = typer.Option(
         None,
         "--entity-type",
-        help=f"Search by entity type ({', '.join(ENTITY_TYPES)})",
+        help=f"Search by entity type ({', '.join(t.value for t in EntityType)})",
     ),
     add_to_queue: Path | None = typer.Option(  # noqa: B008
         None,
         "--add-to-queue",
         help="Append found items to queue file (format: volume fanta_page engine group_id)",
     ),
+    fuzzy: bool = typer.Option(
+        default=False,
+        help="Also find index terms a few edits from the words (OCR errors, split words)",
+    ),
+    max_edits: int | None = typer.Option(
+        None,
+        help="Most edits for --fuzzy matches (default: the fuzzy index's, fewer for short words)",
+    ),
+    no_server: bool = typer.Option(
+        default=False,
+        help="Search in-process even if a barks-ocr-whoosh-find-server is running",
+    ),
     log_level_str: LogLevelArg = "DEBUG",
 ) -> None:
     init_logging(APP_LOGGING_NAME, "whoosh-find.log", log_level_str)
 
     assert ocr_index in OCR_TYPE_DICT
 
-    indexes_dirname = "Indexes" if ocr_index == 1 else "Indexes-easyocr"
-    volumes_index_dir = BARKS_ROOT_DIR / (
-        "Compleat Barks Disney Reader/Reader Files/" + indexes_dirname
-    )
-    whoosh_search = SearchEngine(volumes_index_dir)
+    if entity_type is not None:
+        from barks_fantagraphics.whoosh_search_engine import ENTITY_TYPES  # noqa: PLC0415
 
-    if entity_type is not None and entity_type not in ENTITY_TYPES:
-        print(f"Invalid entity type '{entity_type}'. Must be one of: {', '.join(ENTITY_TYPES)}")
+        if entity_type not in ENTITY_TYPES:
+            print(f"Invalid entity type '{entity_type}'. Must be one of: {', '.join(ENTITY_TYPES)}")
+            raise typer.Exit(code=1)
+    if fuzzy and entity_type is not None:
+        print("--fuzzy can't be used with --entity-type.")
         raise typer.Exit(code=1)
 
     engine = OCR_TYPE_DICT[ocr_index]
-    text_indenter = ParagraphWrapper(initial_indent="       ", subsequent_indent="            ")
-    if entity_type is not None:
-        found_text = whoosh_search.find_entities(entity_type, words)
+    if fuzzy:
+        all_found = _find_fuzzy(ocr_index, words, max_edits, no_server)
     else:
-        found_text = whoosh_search.find_words(words)
+        all_found = [(words, _find(ocr_index, entity_type, words, no_server))]
+
     with add_to_queue.open("a") if add_to_queue else contextlib.nullcontext() as queue_file:
-        for comic_title, title_info in found_text.items():
-            print(f'"{comic_title}"')
-            title = STR_TITLE_TO_ENUM[comic_title]
-
-            for fanta_page, page_info in title_info.fanta_pages.items():
-                print(
-                    f"     Fanta vol {title_info.fanta_vol}, page {fanta_page},"
-                    f" Comic page {page_info.comic_page}"
-                )
-                for speech_info in page_info.speech_info_list:
-                    sp_id = speech_info.group_id
-                    panel = speech_info.panel_num
-                    text_lines = speech_info.speech_text.replace("\u00ad", "-")
-                    entity_suffix = (
-                        f" [{','.join(speech_info.entity_types)}]"
-                        if speech_info.entity_types
-                        else ""
-                    )
-                    indented_text = text_indenter.fill(
-                        f'"{sp_id} ({panel}){entity_suffix}": {text_lines}'
-                    )
-                    print(indented_text)
-                    print()
-                    if queue_file is not None:
-                        queue_file.write(
-                            f'"{words}" {title.name} {page_info.comic_page}'
-                            f"  {title_info.fanta_vol} {fanta_page} {engine} {sp_id}\n"
-                        )
-                print()
+        for found_words, found_text in all_found:
+            _print_found(found_text, found_words, engine, queue_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+"""Client side of the ``barks-ocr-whoosh-find-server`` search server.
+
+Kept apart from the server so ``barks-ocr-whoosh-find`` can ask a running
+server without importing Whoosh or the search engine - it only needs those if
+there is no server and it searches in-process.
+"""
+
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from barks_fantagraphics.whoosh_search_engine import TitleDict
+
+SERVER_DIR = Path.home() / ".cache" / "barks-ocr"
+SOCKET_FAMILY = "AF_UNIX"
+
+# (entity type or None for a words search, words), or None to stop the server.
+type SearchRequest = tuple[str | None, str]
+
+
+def get_server_socket(ocr_index: int) -> Path:
+    return SERVER_DIR / f"whoosh-find-{ocr_index}.sock"
+
+
+def get_key_file(socket_file: Path) -> Path:
+    return socket_file.with_suffix(".key")
+
+
+def send_request(
+    socket_file: Path, request: SearchRequest | None
+) -> "tuple[bool, TitleDict | str] | None":
+    """Send 'request' to the server at 'socket_file' and return its reply, or None if no server."""
+    if not socket_file.exists():
+        return None
+
+    try:
+        authkey = get_key_file(socket_file).read_bytes()
+        with Client(str(socket_file), family=SOCKET_FAMILY, authkey=authkey) as conn:
+            conn.send(request)
+            return (True, {}) if request is None else conn.recv()
+    except (OSError, EOFError, AuthenticationError) as e:
+        logger.debug(f'No search server at "{socket_file}": {e}')
+        return None
+
+
+def find_with_server(ocr_index: int, entity_type: str | None, words: str) -> "TitleDict | None":
+    """Return the search results from the server for 'ocr_index', or None if there isn't one."""
+    reply = send_request(get_server_socket(ocr_index), (entity_type, words))
+    if reply is None:
+        return None
+
+    ok, found = reply
+    if not ok:
+        logger.warning(f"Search server failed: {found}")
+        return None
+    assert isinstance(found, dict)
+    return found
@@ -0,0 +1,181 @@
+"""Keep a ``SearchEngine`` warm for ``barks-ocr-whoosh-find`` behind a Unix socket.
+
+Each ``barks-ocr-whoosh-find`` run otherwise pays for the imports, opening the
+index and making a searcher before its one search. This server does that once
+and answers searches over a Unix socket in ``~/.cache/barks-ocr``, with an LRU
+cache of results. The cache is dropped, and the index reopened, whenever the
+index fingerprint changes (i.e. after any index build or update - a full
+rebuild starts the generation at 1 again, so that alone won't do).
+
+Requests and results are pickled ``multiprocessing.connection`` messages. The
+connection is authenticated with a random key written next to the socket that
+only the user can read, so only the user's own clients are answered.
+
+The client side is in ``whoosh_find_client``.
+"""
+
+import os
+import secrets
+from collections import OrderedDict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+from pathlib import Path
+
+import typer
+from barks_fantagraphics.speech_groupers import OCR_TYPE_DICT
+from barks_fantagraphics.whoosh_search_engine import SearchEngine, TitleDict
+from comic_utils.common_typer_options import LogLevelArg
+from loguru import logger
+from whoosh import index
+
+from barks_ocr.cli_setup import init_logging
+from barks_ocr.tools.whoosh_find_client import (
+    SOCKET_FAMILY,
+    SearchRequest,
+    get_key_file,
+    get_server_socket,
+    send_request,
+)
+from barks_ocr.utils.index_paths import get_index_fingerprint, get_volumes_index_dir
+
+APP_LOGGING_NAME = "whos"
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def run_search(search_engine: SearchEngine, entity_type: str | None, words: str) -> TitleDict:
+    if entity_type is not None:
+        return search_engine.find_entities(entity_type, words)
+    return search_engine.find_words(words)
+
+
+class WarmSearchEngine:
+    """A ``SearchEngine`` with an LRU results cache, both renewed on an index change."""
+
+    def __init__(self, index_dir: Path, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self._index_dir = index_dir
+        self._cache_size = cache_size
+        self._index = index.open_dir(index_dir)
+        self._fingerprint = ""
+        self._search_engine: SearchEngine | None = None
+        self._cache: OrderedDict[SearchRequest, TitleDict] = OrderedDict()
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def _get_search_engine(self) -> SearchEngine:
+        fingerprint = get_index_fingerprint(self._index)
+        if self._search_engine is None or fingerprint != self._fingerprint:
+            if self._search_engine is not None:
+                logger.info(f"Index changed ({fingerprint}) - reopening the index.")
+            self._search_engine = SearchEngine(self._index_dir)
+            self._fingerprint = fingerprint
+            self._cache.clear()
+        return self._search_engine
+
+    def search(self, request: SearchRequest) -> TitleDict:
+        search_engine = self._get_search_engine()
+
+        found = self._cache.get(request)
+        if found is not None:
+            self._cache.move_to_end(request)
+            self.num_hits += 1
+            return found
+
+        self.num_misses += 1
+        found = run_search(search_engine, *request)
+        self._cache[request] = found
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return found
+
+
+def _make_listener(socket_file: Path) -> Listener:
+    if socket_file.exists():
+        if send_request(socket_file, (None, "")) is not None:
+            msg = f'A search server is already running at "{socket_file}".'
+            raise typer.BadParameter(msg)
+        socket_file.unlink()  # left over from a server that didn't stop cleanly
+
+    socket_file.parent.mkdir(parents=True, exist_ok=True)
+    authkey = secrets.token_bytes(32)
+    key_file = get_key_file(socket_file)
+    key_file.unlink(missing_ok=True)
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(authkey)
+
+    return Listener(str(socket_file), family=SOCKET_FAMILY, authkey=authkey)
+
+
+def serve(warm_search: WarmSearchEngine, listener: Listener) -> None:
+    """Answer search requests until asked to stop."""
+    while True:
+        try:
+            conn = listener.accept()
+        except (OSError, EOFError, AuthenticationError) as e:
+            logger.warning(f"Rejected a search client: {e}")
+            continue
+
+        with conn:
+            try:
+                request = conn.recv()
+            except (OSError, EOFError) as e:
+                logger.warning(f"Lost a search client: {e}")
+                continue
+            if request is None:
+                logger.info("Stop requested.")
+                return
+
+            entity_type, words = request
+            if not words:
+                conn.send((True, {}))
+                continue
+            try:
+                found = warm_search.search((entity_type, words))
+            except Exception as e:  # noqa: BLE001
+                logger.error(f'Search for "{words}" failed: {e}')
+                conn.send((False, str(e)))
+                continue
+            conn.send((True, found))
+
+            logger.debug(
+                f'Searched "{words}": {len(found)} titles'
+                f" ({warm_search.num_hits} cache hits, {warm_search.num_misses} misses)."
+            )
+
+
+app = typer.Typer()
+
+
+@app.command(help="Keep the Whoosh index open and answer barks-ocr-whoosh-find searches")
+def main(
+    ocr_index: int = 1,
+    cache_size: int = typer.Option(DEFAULT_CACHE_SIZE, help="Number of search results to cache"),
+    stop: bool = typer.Option(default=False, help="Stop the running server"),
+    log_level_str: LogLevelArg = "INFO",
+) -> None:
+    init_logging(APP_LOGGING_NAME, "whoosh-find-server.log", log_level_str)
+
+    assert ocr_index in OCR_TYPE_DICT
+    socket_file = get_server_socket(ocr_index)
+
+    if stop:
+        if send_request(socket_file, None) is None:
+            logger.error(f'No search server running at "{socket_file}".')
+            raise typer.Exit(code=1)
+        return
+
+    warm_search = WarmSearchEngine(get_volumes_index_dir(ocr_index), cache_size)
+    listener = _make_listener(socket_file)
+    logger.info(f'Search server for OCR index {ocr_index} listening on "{socket_file}".')
+    try:
+        serve(warm_search, listener)
+    except KeyboardInterrupt:
+        logger.info("Stopping search server.")
+    finally:
+        listener.close()
+        get_key_file(socket_file).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    app()
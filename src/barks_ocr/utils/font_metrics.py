@@ -0,0 +1,89 @@
+"""Text line widths from cached per-size glyph advance and kerning tables.
+
+Measuring a line with ``ImageDraw.textbbox`` lays it out and rasterizes its
+glyphs, and ``ImageFont.truetype`` reads the font file again each time it's
+called. A ``FontMetrics`` keeps one ``FreeTypeFont`` per size and, per size,
+tables of glyph advances, glyph ink extents and pair kerning, filled in as
+characters and pairs are first seen. A line's width is then the advances and
+kerning of its characters up to the last one, plus the last glyph's right ink
+edge, less the first glyph's left ink edge - the ``textbbox`` width, give or
+take a pixel of rounding.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+from PIL.ImageFont import FreeTypeFont
+
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+@dataclass
+class _SizeTables:
+    font: FreeTypeFont
+    advances: dict[str, float] = field(default_factory=dict)
+    ink_extents: dict[str, tuple[int, int]] = field(default_factory=dict)  # (left, right)
+    kerning: dict[str, float] = field(default_factory=dict)  # keyed by the character pair
+
+    def get_advance(self, ch: str) -> float:
+        advance = self.advances.get(ch)
+        if advance is None:
+            advance = self.font.getlength(ch)
+            self.advances[ch] = advance
+        return advance
+
+    def get_ink_extent(self, ch: str) -> tuple[int, int]:
+        extent = self.ink_extents.get(ch)
+        if extent is None:
+            left, _top, right, _bottom = self.font.getbbox(ch)
+            extent = (int(left), int(right))
+            self.ink_extents[ch] = extent
+        return extent
+
+    def get_kerning(self, pair: str) -> float:
+        kerning = self.kerning.get(pair)
+        if kerning is None:
+            kerning = (
+                self.font.getlength(pair) - self.get_advance(pair[0]) - self.get_advance(pair[1])
+            )
+            self.kerning[pair] = kerning
+        return kerning
+
+
+class FontMetrics:
+    def __init__(self, font_path: Path) -> None:
+        self._font_path = font_path
+        self._sizes: dict[int, _SizeTables] = {}
+
+    def _get_size_tables(self, font_size: int) -> _SizeTables:
+        tables = self._sizes.get(font_size)
+        if tables is None:
+            tables = _SizeTables(ImageFont.truetype(str(self._font_path), font_size))
+            self._sizes[font_size] = tables
+        return tables
+
+    def get_font(self, font_size: int) -> FreeTypeFont:
+        """Return the font at 'font_size', loading it on first use (OSError if it's missing)."""
+        return self._get_size_tables(font_size).font
+
+    def get_line_width(self, line: str, font_size: int) -> int:
+        """Return the ink width of 'line' from the glyph tables."""
+        if not line:
+            return 0
+        tables = self._get_size_tables(font_size)
+
+        pen_x = 0.0
+        for i in range(len(line) - 1):
+            pen_x += tables.get_advance(line[i]) + tables.get_kerning(line[i : i + 2])
+
+        return round(pen_x + tables.get_ink_extent(line[-1])[1] - tables.get_ink_extent(line[0])[0])
+
+    def get_rendered_line_width(self, line: str, font_size: int) -> int:
+        """Return the ink width of 'line' as laid out by PIL."""
+        if not line:
+            return 0
+        left, _top, right, _bottom = _MEASURE_DRAW.textbbox(
+            (0, 0), line, font=self.get_font(font_size)
+        )
+        return int(right - left)
@@ -3,6 +3,7 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 from google import genai
+from google.genai import types
 
 AI_PRO_IMAGE_MODEL = "gemini-3-pro-image-preview"
 AI_PRO_MODEL = "gemini-3.1-pro-preview"
@@ -10,4 +11,9 @@ AI_PRO_MODEL = "gemini-3.1-pro-preview"
 load_dotenv(Path(__file__).parent.parent.parent / ".env.runtime")
 
 GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
-CLIENT = genai.Client(api_key=GEMINI_API_KEY)
+# Set to point every client at a local stand-in server (see tools/fake_gemini_server.py).
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "")
+CLIENT = genai.Client(
+    api_key=GEMINI_API_KEY,
+    http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None,
+)
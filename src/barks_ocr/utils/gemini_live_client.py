@@ -0,0 +1,232 @@
+"""Direct (non-batch) Gemini calls with rate limiting, retries and a disk cache.
+
+The batch API is the cheap way to group a whole volume, but for a handful of
+re-done pages its minutes-to-hours turnaround is a big wait. This module makes
+the same grouping request directly against ``models.generate_content``:
+
+* ``RateLimiter`` keeps the process under a requests-per-second and a
+  tokens-per-minute budget, shared by every worker thread.
+* ``GeminiResponseCache`` stores each response on disk keyed by the prompt
+  hash, image hash and model, so re-running a page costs nothing. Only replies
+  that parse as JSON are stored, so a malformed reply is asked for again.
+* ``GeminiLiveClient`` ties the two together and retries transient errors
+  (429 and 5xx) with exponential backoff.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from google import genai
+from google.genai import errors, types
+from loguru import logger
+
+from barks_ocr.utils.gemini_ai_for_grouping import get_cleaned_text
+
+DEFAULT_MAX_QPS = 2.0
+DEFAULT_MAX_TOKENS_PER_MINUTE = 1_000_000
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_INITIAL_BACKOFF_SECS = 2.0
+MAX_BACKOFF_SECS = 60.0
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Rough request-size estimate used before the call; the real usage reported by
+# the response replaces it once the call completes.
+_CHARS_PER_TOKEN = 4
+_IMAGE_TOKEN_ESTIMATE = 1120
+_TOKEN_WINDOW_SECS = 60.0
+
+
+def get_live_client(api_key: str, base_url: str = "") -> genai.Client:
+    """Return a genai client, optionally pointed at a local stand-in server."""
+    if not base_url:
+        return genai.Client(api_key=api_key)
+    return genai.Client(api_key=api_key, http_options=types.HttpOptions(base_url=base_url))
+
+
+def estimate_request_tokens(prompt: str) -> int:
+    return len(prompt) // _CHARS_PER_TOKEN + _IMAGE_TOKEN_ESTIMATE
+
+
+def is_valid_json_response(text: str) -> bool:
+    """Return True if 'text' parses as JSON once given the usual Gemini text fixes."""
+    try:
+        json.loads(get_cleaned_text(text)[0])
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+class RateLimiter:
+    """Thread-safe limiter for requests per second and tokens per minute."""
+
+    def __init__(self, max_qps: float, max_tokens_per_minute: int) -> None:
+        assert max_qps > 0
+        assert max_tokens_per_minute > 0
+
+        self._min_interval = 1.0 / max_qps
+        self._max_tokens_per_minute = max_tokens_per_minute
+        self._lock = threading.Lock()
+        self._next_request_time = 0.0
+        self._token_window: deque[tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+
+    def acquire(self, num_tokens: int) -> None:
+        """Block until a request using ``num_tokens`` may be sent."""
+        # A single request bigger than the whole budget would otherwise wait forever.
+        num_tokens = min(num_tokens, self._max_tokens_per_minute)
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire_tokens(now)
+
+                wait_secs = max(0.0, self._next_request_time - now)
+                if self._tokens_in_window + num_tokens > self._max_tokens_per_minute:
+                    oldest_time = self._token_window[0][0]
+                    wait_secs = max(wait_secs, oldest_time + _TOKEN_WINDOW_SECS - now)
+
+                if wait_secs <= 0.0:
+                    self._next_request_time = now + self._min_interval
+                    self._token_window.append((now, num_tokens))
+                    self._tokens_in_window += num_tokens
+                    return
+
+            time.sleep(wait_secs)
+
+    def record_actual_tokens(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the window once the real token usage of a request is known."""
+        delta = actual_tokens - min(estimated_tokens, self._max_tokens_per_minute)
+        if delta == 0:
+            return
+        with self._lock:
+            self._token_window.append((time.monotonic(), delta))
+            self._tokens_in_window += delta
+
+    def _expire_tokens(self, now: float) -> None:
+        while self._token_window and self._token_window[0][0] + _TOKEN_WINDOW_SECS <= now:
+            _, tokens = self._token_window.popleft()
+            self._tokens_in_window -= tokens
+
+
+class GeminiResponseCache:
+    """On-disk cache of response texts keyed by prompt, image and model."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self._cache_dir = cache_dir
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def get_key(model: str, prompt: str, image_bytes: bytes) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        return hashlib.sha256(f"{model}\n{prompt_hash}\n{image_hash}".encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        cache_file = self._get_cache_file(key)
+        if not cache_file.is_file():
+            return None
+        return json.loads(cache_file.read_text(encoding="utf-8"))["text"]
+
+    def put(self, key: str, model: str, text: str) -> None:
+        cache_file = self._get_cache_file(key)
+        # Write then rename so a concurrent reader never sees a partial file.
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}")
+        tmp_file.write_text(json.dumps({"model": model, "text": text}), encoding="utf-8")
+        tmp_file.replace(cache_file)
+
+    def _get_cache_file(self, key: str) -> Path:
+        return self._cache_dir / f"{key}.json"
+
+
+class GeminiLiveClient:
+    """Makes JSON ``generate_content`` calls under a rate limit with retries."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: genai.Client,
+        model: str,
+        rate_limiter: RateLimiter,
+        cache: GeminiResponseCache | None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        initial_backoff_secs: float = DEFAULT_INITIAL_BACKOFF_SECS,
+    ) -> None:
+        self._client = client
+        self._model = model
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+        self._max_retries = max_retries
+        self._initial_backoff_secs = initial_backoff_secs
+
+    def generate_json(self, prompt: str, image_bytes: bytes, mime_type: str = "image/png") -> str:
+        """Return the response text for ``prompt`` plus image, from the cache if possible."""
+        cache_key = ""
+        if self._cache is not None:
+            cache_key = self._cache.get_key(self._model, prompt, image_bytes)
+            cached_text = self._cache.get(cache_key)
+            if cached_text is not None and is_valid_json_response(cached_text):
+                logger.debug(f"Gemini response cache hit: {cache_key[:12]}.")
+                return cached_text
+
+        text = self._generate_with_retries(prompt, image_bytes, mime_type)
+        if not is_valid_json_response(text):
+            msg = f"Gemini response is not valid json: {text[:80]!r}."
+            raise ValueError(msg)
+
+        if self._cache is not None:
+            self._cache.put(cache_key, self._model, text)
+
+        return text
+
+    def _generate_with_retries(self, prompt: str, image_bytes: bytes, mime_type: str) -> str:
+        contents = [
+            types.Part.from_text(text=prompt),
+            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
+        ]
+        config = types.GenerateContentConfig(response_mime_type="application/json")
+        estimated_tokens = estimate_request_tokens(prompt)
+
+        backoff_secs = self._initial_backoff_secs
+        attempt = 0
+        while True:
+            attempt += 1
+            self._rate_limiter.acquire(estimated_tokens)
+            try:
+                response = self._client.models.generate_content(
+                    model=self._model, contents=contents, config=config
+                )
+            except errors.APIError as e:
+                if e.code not in RETRYABLE_STATUS_CODES or attempt > self._max_retries:
+                    raise
+                jitter = 1.0 + random.random()  # noqa: S311
+                sleep_secs = min(MAX_BACKOFF_SECS, backoff_secs) * jitter
+                logger.warning(
+                    f"Gemini call failed with {e.code} (attempt {attempt}):"
+                    f" retrying in {sleep_secs:.1f}s."
+                )
+                time.sleep(sleep_secs)
+                backoff_secs *= 2
+                continue
+
+            usage = response.usage_metadata
+            if usage is not None and usage.total_token_count is not None:
+                self._rate_limiter.record_actual_tokens(estimated_tokens, usage.total_token_count)
+
+            if not response.text:
+                finish_reason = self._get_finish_reason(response)
+                msg = f"Empty Gemini response (finish reason: {finish_reason})."
+                raise ValueError(msg)
+
+            return response.text
+
+    @staticmethod
+    def _get_finish_reason(response: types.GenerateContentResponse) -> str:
+        if not response.candidates or response.candidates[0].finish_reason is None:
+            return "unknown"
+        return response.candidates[0].finish_reason.name
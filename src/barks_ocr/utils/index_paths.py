@@ -0,0 +1,30 @@
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from barks_fantagraphics.comics_consts import BARKS_ROOT_DIR
+
+if TYPE_CHECKING:
+    from whoosh.index import FileIndex
+
+
+def get_volumes_index_dir(ocr_index: int) -> Path:
+    """Return the Whoosh index directory for the 'ocr_index' OCR type."""
+    indexes_dirname = "Indexes" if ocr_index == 1 else "Indexes-easyocr"
+    return BARKS_ROOT_DIR / ("Compleat Barks Disney Reader/Reader Files/" + indexes_dirname)
+
+
+def get_index_fingerprint(ix: "FileIndex") -> str:
+    """Return a stamp of the index contents that changes with every commit.
+
+    The generation alone won't do - a full rebuild ('create_in' and one commit) is
+    generation 1 again. But every commit writes a new TOC file, so its inode, size
+    and mtime go in too.
+    """
+    generation = ix.latest_generation()
+    toc_file = Path(ix.storage.folder) / f"_{ix.indexname}_{generation}.toc"
+    try:
+        stat = toc_file.stat()
+    except FileNotFoundError:
+        # Replaced by a commit since the generation was read.
+        return f"{generation}:gone"
+    return f"{generation}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
@@ -0,0 +1,74 @@
+"""Find every occurrence of a fixed set of strings in one pass over a text.
+
+A ``MultiPatternMatcher`` is an Aho-Corasick automaton over its patterns. The
+failure links are folded into a full transition table when it's built, so a
+search is one dict lookup per text character, however many patterns there
+are. Like repeated ``str.find`` calls, it reports overlapping occurrences and
+patterns that are substrings of other patterns.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+
+_ROOT = 0
+
+type PatternMatch = tuple[int, int, str]  # start, end, pattern
+
+
+class MultiPatternMatcher:
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self._transitions: list[dict[str, int]] = [{}]
+        self._outputs: list[tuple[str, ...]] = [()]
+
+        for pattern in dict.fromkeys(patterns):
+            if pattern:
+                self._add_pattern(pattern)
+
+        self._add_failure_transitions()
+
+    def _add_pattern(self, pattern: str) -> None:
+        node = _ROOT
+        for ch in pattern:
+            next_node = self._transitions[node].get(ch)
+            if next_node is None:
+                next_node = len(self._transitions)
+                self._transitions.append({})
+                self._outputs.append(())
+                self._transitions[node][ch] = next_node
+            node = next_node
+        self._outputs[node] = (pattern,)
+
+    def _add_failure_transitions(self) -> None:
+        """Fold the failure links into the transitions and outputs, breadth first."""
+        trie_children = [dict(t) for t in self._transitions]
+        failure = [_ROOT] * len(self._transitions)
+
+        queue = deque(trie_children[_ROOT].values())
+        while queue:
+            node = queue.popleft()
+            fail_node = failure[node]
+            self._outputs[node] += self._outputs[fail_node]
+
+            # Transitions the trie doesn't have are the failure node's (already
+            # complete, as it's shallower). Transitions back to the root are left out.
+            transitions = self._transitions[node]
+            for ch, fail_next in self._transitions[fail_node].items():
+                transitions.setdefault(ch, fail_next)
+
+            for ch, child in trie_children[node].items():
+                failure[child] = self._transitions[fail_node].get(ch, _ROOT)
+                queue.append(child)
+
+    def find_all(self, text: str) -> list[PatternMatch]:
+        """Return every occurrence of every pattern in 'text', in order of their end."""
+        transitions = self._transitions
+        outputs = self._outputs
+
+        matches: list[PatternMatch] = []
+        node = _ROOT
+        for i, ch in enumerate(text):
+            node = transitions[node].get(ch, _ROOT)
+            if outputs[node]:
+                end = i + 1
+                matches.extend((end - len(pattern), end, pattern) for pattern in outputs[node])
+        return matches
@@ -1,5 +1,6 @@
 import json
 import math
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -9,52 +10,146 @@ from shapely import MultiPoint
 PointList = list[tuple[float, float]]
 
 
+# A quad within this many degrees of horizontal or vertical is treated as a plain rectangle.
+APPROX_RECT_ANGLE_TOLERANCE = 5.0
+
+
 class OcrBox:
+    """An OCR text box. Its geometry is computed on first use, not on construction.
+
+    Use ``OcrBox.from_quads`` to make many boxes at once, with the geometry of
+    the (usual) axis-aligned ones computed in one numpy pass. Their results are
+    the same as from shapely.
+    """
+
+    __slots__ = (
+        "_box_points",
+        "_is_approx_rect",
+        "_min_rotated_rectangle",
+        "accepted_text",
+        "box_id",
+        "ocr_prob",
+        "ocr_text",
+    )
+
     def __init__(
         self,
         box_points: PointList,
         ocr_text: str,
         ocr_prob: float,
         accepted_text: str,
+        box_id: str | None = None,
     ) -> None:
         self._box_points = box_points
         self.ocr_text = ocr_text
         self.ocr_prob = ocr_prob
         self.accepted_text = accepted_text
+        self.box_id = box_id
 
-        min_rotated_rectangle_azimuth = self._get_min_rotated_rectangle_azimuth(
-            MultiPoint(self._box_points).minimum_rotated_rectangle
-        )
-        # print(f"azimuth: {min_rotated_rectangle_azimuth}")  # noqa: ERA001
-        self.is_approx_rect = (
-            abs(min_rotated_rectangle_azimuth) < 5.0  # noqa: PLR2004
-            or abs(min_rotated_rectangle_azimuth - 180) < 5.0  # noqa: PLR2004
-            or abs(min_rotated_rectangle_azimuth - 90) < 5.0  # noqa: PLR2004
-        )
-        if self.is_approx_rect:
-            self.min_rotated_rectangle = self._get_envelope()
-        else:
-            self.min_rotated_rectangle = self._get_min_rotated_rectangle()
+        self._is_approx_rect: bool | None = None
+        self._min_rotated_rectangle: PointList | None = None
+
+    @classmethod
+    def from_quads(
+        cls,
+        box_points_list: list[PointList],
+        ocr_texts: list[str],
+        ocr_probs: list[float],
+        accepted_texts: list[str],
+        box_ids: list[str] | None = None,
+    ) -> list["OcrBox"]:
+        """Make a box per quad, computing the axis-aligned boxes' geometry in one numpy pass."""
+        num_boxes = len(box_points_list)
+        if box_ids is None:
+            box_ids = [None] * num_boxes  # ty: ignore[invalid-assignment]
+        assert box_ids is not None
+        assert len(ocr_texts) == len(ocr_probs) == len(accepted_texts) == len(box_ids) == num_boxes
+
+        ocr_boxes = [
+            cls(box_points, ocr_text, ocr_prob, accepted_text, box_id)
+            for box_points, ocr_text, ocr_prob, accepted_text, box_id in zip(
+                box_points_list, ocr_texts, ocr_probs, accepted_texts, box_ids, strict=True
+            )
+        ]
+        if num_boxes == 0:
+            return ocr_boxes
+
+        try:
+            quads = np.asarray(box_points_list, dtype=np.float64)
+        except ValueError:
+            quads = None
+        if quads is None or quads.shape != (num_boxes, 4, 2):
+            # Not all quads - leave these to the per-box shapely path.
+            return ocr_boxes
+
+        geometry = get_quads_geometry(quads)
+        mins = quads.min(axis=1)
+        maxs = quads.max(axis=1)
+
+        for i, ocr_box in enumerate(ocr_boxes):
+            # Rotated boxes get shapely's corners, in shapely's order ('annotate' takes the
+            # first one as the top left). Quads with no area have no shapely rectangle, and
+            # for ambiguous ones only shapely knows which rectangle it picks - keep its
+            # behaviour for all of these.
+            if (
+                not geometry.is_approx_rects[i]
+                or geometry.is_degenerate[i]
+                or geometry.is_ambiguous[i]
+            ):
+                continue
+            ocr_box._is_approx_rect = True  # noqa: SLF001
+            ocr_box._min_rotated_rectangle = [  # noqa: SLF001
+                (float(mins[i][0]), float(mins[i][1])),
+                (float(maxs[i][0]), float(maxs[i][1])),
+            ]
+
+        return ocr_boxes
+
+    @property
+    def box_points(self) -> PointList:
+        return self._box_points
+
+    @property
+    def is_approx_rect(self) -> bool:
+        if self._is_approx_rect is None:
+            self._compute_geometry()
+        assert self._is_approx_rect is not None
+        return self._is_approx_rect
+
+    @property
+    def min_rotated_rectangle(self) -> PointList:
+        """The envelope (bottom-left, top-right) or, if rotated, the four rectangle corners."""
+        if self._min_rotated_rectangle is None:
+            self._compute_geometry()
+        assert self._min_rotated_rectangle is not None
+        return self._min_rotated_rectangle
 
     def get_state(self) -> dict[str, Any]:
-        return {
-            "box_points": self._box_points,
-            "ocr_text": self.ocr_text,
-            "ocr_prob": self.ocr_prob,
-            "accepted_text": self.accepted_text,
-        }
+        state: dict[str, Any] = {} if self.box_id is None else {"box_id": self.box_id}
+        state.update(
+            {
+                "box_points": self._box_points,
+                "ocr_text": self.ocr_text,
+                "ocr_prob": self.ocr_prob,
+                "accepted_text": self.accepted_text,
+            }
+        )
+        return state
 
-    def _get_envelope(self) -> PointList:
-        rect = MultiPoint(self._box_points).envelope
-        coords = rect.exterior.coords
-        bottom_left = coords[0]
-        top_right = coords[2]
-        return [bottom_left, top_right]
+    def _compute_geometry(self) -> None:
+        min_rotated_rectangle = MultiPoint(self._box_points).minimum_rotated_rectangle
+        azimuth = self._get_min_rotated_rectangle_azimuth(min_rotated_rectangle)
+        self._is_approx_rect = is_approx_rect_azimuth(azimuth)
+        if self._is_approx_rect:
+            self._min_rotated_rectangle = self._get_envelope()
+        else:
+            coords = min_rotated_rectangle.exterior.coords
+            self._min_rotated_rectangle = [coords[0], coords[1], coords[2], coords[3]]
 
-    def _get_min_rotated_rectangle(self) -> PointList:
-        rect = MultiPoint(self._box_points).minimum_rotated_rectangle
-        coords = rect.exterior.coords
-        return [coords[0], coords[1], coords[2], coords[3]]
+    def _get_envelope(self) -> PointList:
+        xs = [float(point[0]) for point in self._box_points]
+        ys = [float(point[1]) for point in self._box_points]
+        return [(min(xs), min(ys)), (max(xs), max(ys))]
 
     def _get_min_rotated_rectangle_azimuth(self, rotated_rect) -> float:  # noqa: ANN001
         bbox = list(rotated_rect.exterior.coords)
@@ -78,6 +173,118 @@ class OcrBox:
         return math.hypot(b[0] - a[0], b[1] - a[1])
 
 
+def is_approx_rect_azimuth(azimuth: float) -> bool:
+    return (
+        abs(azimuth) < APPROX_RECT_ANGLE_TOLERANCE
+        or abs(azimuth - 180) < APPROX_RECT_ANGLE_TOLERANCE
+        or abs(azimuth - 90) < APPROX_RECT_ANGLE_TOLERANCE
+    )
+
+
+# All six point pairs of a quad. The minimum area rectangle has a side along a
+# convex hull edge, and every hull edge of four points is one of these pairs.
+_QUAD_POINT_PAIRS = np.array([(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)])
+_DEGENERATE_AREA = 1e-9
+# Areas this close count as a tie, and azimuths this close to the tolerance as on it.
+_AREA_TIE_RTOL = 1e-9
+_AZIMUTH_TIE_DEGREES = 1e-6
+
+
+@dataclass(frozen=True)
+class QuadsGeometry:
+    """The minimum rotated rectangles of N quads, as arrays with one row per quad."""
+
+    azimuths: np.ndarray  # (N,) long side azimuth in (0, 180] degrees
+    is_approx_rects: np.ndarray  # (N,)
+    rect_corners: np.ndarray  # (N, 4, 2) in ring order
+    is_degenerate: np.ndarray  # (N,) no area - collinear or coincident points
+    is_ambiguous: np.ndarray  # (N,) shapely may get the other 'is_approx_rects'
+
+
+def _get_long_side_azimuths(
+    u: np.ndarray, v: np.ndarray, u_extents: np.ndarray, v_extents: np.ndarray
+) -> np.ndarray:
+    """Return the azimuth of the long side, folded into (0, 180] like the shapely path."""
+    long_side = np.where((u_extents >= v_extents)[..., None], u, v)
+    azimuths = np.degrees(np.arctan2(long_side[..., 1], long_side[..., 0]))
+    return np.where(azimuths > 0.0, azimuths, azimuths + 180.0)
+
+
+def _get_approx_rect_offsets(azimuths: np.ndarray) -> np.ndarray:
+    """Return how far inside (positive) the approx rect tolerance each azimuth is."""
+    off_axis = np.minimum(
+        np.minimum(np.abs(azimuths), np.abs(azimuths - 180.0)), np.abs(azimuths - 90.0)
+    )
+    return APPROX_RECT_ANGLE_TOLERANCE - off_axis
+
+
+def get_quads_geometry(quads: np.ndarray) -> QuadsGeometry:
+    """Vectorized minimum rotated rectangles for an (N, 4, 2) array of quads.
+
+    The azimuth and ``is_approx_rect`` are as ``OcrBox`` computes them from shapely.
+    The rectangles match shapely's ``minimum_rotated_rectangle`` in area, but not
+    always in corners: when two rectangles have the same area shapely may pick the
+    other one, and its corners start from a different point. Quads where that, or
+    float noise right at the tolerance angle, could change ``is_approx_rect`` are
+    flagged 'is_ambiguous'.
+    """
+    assert quads.ndim == 3  # noqa: PLR2004
+    assert quads.shape[1:] == (4, 2)
+
+    # Candidate side directions from every point pair.
+    edges = quads[:, _QUAD_POINT_PAIRS[:, 1]] - quads[:, _QUAD_POINT_PAIRS[:, 0]]  # (N, 6, 2)
+    edge_lengths = np.hypot(edges[..., 0], edges[..., 1])
+    safe_lengths = np.where(edge_lengths > 0.0, edge_lengths, 1.0)
+    u = edges / safe_lengths[..., None]  # (N, 6, 2)
+    v = np.stack([-u[..., 1], u[..., 0]], axis=-1)
+
+    # Project the quad points onto each candidate axis pair.
+    proj_u = np.einsum("nkd,npd->nkp", u, quads)  # (N, 6, 4)
+    proj_v = np.einsum("nkd,npd->nkp", v, quads)
+    u_min, u_max = proj_u.min(axis=2), proj_u.max(axis=2)
+    v_min, v_max = proj_v.min(axis=2), proj_v.max(axis=2)
+    areas = (u_max - u_min) * (v_max - v_min)
+    areas = np.where(edge_lengths > 0.0, areas, np.inf)
+
+    candidate_azimuths = _get_long_side_azimuths(u, v, u_max - u_min, v_max - v_min)
+    candidate_offsets = _get_approx_rect_offsets(candidate_azimuths)
+
+    best = np.argmin(areas, axis=1)
+    rows = np.arange(len(quads))
+    best_u = u[rows, best]
+    best_v = v[rows, best]
+    u0, u1 = u_min[rows, best], u_max[rows, best]
+    v0, v1 = v_min[rows, best], v_max[rows, best]
+    best_areas = areas[rows, best]
+
+    is_degenerate = ~np.isfinite(best_areas) | (best_areas <= _DEGENERATE_AREA)
+
+    corner_coeffs = np.stack(
+        [
+            np.stack([u0, v0], -1),
+            np.stack([u1, v0], -1),
+            np.stack([u1, v1], -1),
+            np.stack([u0, v1], -1),
+        ],
+        axis=1,
+    )  # (N, 4, 2)
+    rect_corners = (
+        corner_coeffs[..., 0:1] * best_u[:, None, :] + corner_coeffs[..., 1:2] * best_v[:, None, :]
+    )
+
+    azimuths = candidate_azimuths[rows, best]
+    offsets = candidate_offsets[rows, best]
+    is_approx_rects = offsets > 0.0
+
+    # Another rectangle of (nearly) the same area on the other side of the tolerance,
+    # or an azimuth on the tolerance itself.
+    is_tied = areas <= (best_areas * (1.0 + _AREA_TIE_RTOL))[:, None]
+    is_ambiguous = np.any(is_tied & ((candidate_offsets > 0.0) != is_approx_rects[:, None]), axis=1)
+    is_ambiguous |= np.abs(offsets) <= _AZIMUTH_TIE_DEGREES
+
+    return QuadsGeometry(azimuths, is_approx_rects, rect_corners, is_degenerate, is_ambiguous)
+
+
 def load_groups_from_json(file: Path) -> dict[int, list[tuple[OcrBox, float]]]:
     with file.open("r") as f:
         json_groups = json.load(f)
@@ -92,6 +299,7 @@ def load_groups_from_json(file: Path) -> dict[int, list[tuple[OcrBox, float]]]:
                 json_ocr_box["ocr_text"],
                 json_ocr_box["ocr_prob"],
                 json_ocr_box["accepted_text"],
+                json_ocr_box.get("box_id"),
             )
             ikey = int(key)
             if ikey not in groups:
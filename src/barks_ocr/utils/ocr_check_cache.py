@@ -0,0 +1,82 @@
+"""A title's record of the ``ocr_check`` issues found for each group.
+
+Every group is stored with a hash of the group fields the checks read, plus
+anything else its result depends on (like the panel a missing panel number
+would be assigned), and the issue types and panel number found for it. A group
+whose hash hasn't changed since the last run gets its stored issues instead of
+being checked again. The whole record is dropped when the check suite stamp
+changes, i.e. when a check or its settings change.
+
+One json file per title in the cache directory.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+OCR_CHECK_CACHE_VERSION = 1
+DEFAULT_OCR_CHECK_CACHE_DIR = Path.home() / ".cache" / "barks-ocr" / "ocr-check"
+
+CHECKED_GROUP_FIELDS = ("ai_text", "notes", "type", "text_box", "panel_num", "acknowledged_issues")
+
+type CachedIssue = tuple[str, int]  # (issue type, panel num)
+
+
+def get_group_hash(group: dict[str, Any], *extra: object) -> str:
+    """Return a hash of the checked fields of 'group' and 'extra'."""
+    key = [[group.get(field) for field in CHECKED_GROUP_FIELDS], list(extra)]
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class OcrCheckCache:
+    def __init__(self, cache_file: Path, check_suite_stamp: str) -> None:
+        self._cache_file = cache_file
+        self._check_suite_stamp = check_suite_stamp
+        self._old_pages: dict[str, dict[str, Any]] = {}
+        self._pages: dict[str, dict[str, Any]] = {}
+        self.num_hits = 0
+
+        if cache_file.is_file():
+            cache = json.loads(cache_file.read_text())
+            if (
+                cache.get("version") == OCR_CHECK_CACHE_VERSION
+                and cache.get("check_suite") == check_suite_stamp
+            ):
+                self._old_pages = cache["pages"]
+            else:
+                logger.info(f'Ignoring ocr check cache from another check suite "{cache_file}".')
+
+    def get(self, page_key: str, group_id: str, group_hash: str) -> list[CachedIssue] | None:
+        """Return the stored issues of the group, or None if it has changed since they were."""
+        record = self._old_pages.get(page_key, {}).get(group_id)
+        if record is None or record["hash"] != group_hash:
+            return None
+        self.num_hits += 1
+        return [(issue_type, panel_num) for issue_type, panel_num in record["issues"]]
+
+    def put(self, page_key: str, group_id: str, group_hash: str, issues: list[CachedIssue]) -> None:
+        self._pages.setdefault(page_key, {})[group_id] = {
+            "hash": group_hash,
+            "issues": [list(issue) for issue in issues],
+        }
+
+    @property
+    def num_groups(self) -> int:
+        return sum(len(groups) for groups in self._pages.values())
+
+    def save(self) -> None:
+        """Write the groups put since loading - groups not checked this run are dropped."""
+        if self._pages == self._old_pages:
+            return
+        cache = {
+            "version": OCR_CHECK_CACHE_VERSION,
+            "check_suite": self._check_suite_stamp,
+            "pages": self._pages,
+        }
+        self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self._cache_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(cache))
+        temp_file.replace(self._cache_file)
@@ -0,0 +1,138 @@
+"""Vectorized "which panel encloses these boxes" lookups for a page's panels.
+
+A ``PanelIndex`` holds one page's panel rectangles as numpy arrays and answers
+the enclosing-panel question for all of a page's text boxes in one query,
+optionally retrying each box shrunk by ``PANEL_SHRINK_AMOUNTS`` pixels (text
+boxes often poke out of their panel border by a few pixels).
+
+Panel numbers are 1-based in panel order, like the ``panel_num`` group field.
+"""
+
+import json
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from barks_ocr.utils.ocr_box import PointList
+from barks_ocr.utils.rect_array import RectArray
+
+NO_PANEL_NUM = -1
+# The box envelope has no width or height, so it can't be placed in any panel.
+NO_AREA_PANEL_NUM = -2
+
+PANEL_SHRINK_AMOUNTS = (20, 40, 60)
+
+# Per-corner shrink direction for boxes in top-left, top-right, bottom-right,
+# bottom-left order.
+_SHRINK_SIGNS = np.array([(1, 1), (-1, 1), (-1, -1), (1, -1)], dtype=np.float64)
+
+
+class PanelIndex:
+    def __init__(self, panel_boxes_xywh: Sequence[Sequence[float]]) -> None:
+        self._panels = RectArray.from_xywh(panel_boxes_xywh)
+
+    @classmethod
+    def from_panel_segments(cls, panel_segment_info: dict[str, Any]) -> "PanelIndex":
+        """Make the index from a panel segments json dict (``"panels"`` of x, y, w, h)."""
+        return cls(panel_segment_info["panels"])
+
+    @classmethod
+    def from_panel_boxes(cls, panel_boxes: Iterable[Any]) -> "PanelIndex":
+        """Make the index from objects with ``x0``, ``y0``, ``w`` and ``h`` fields."""
+        return cls([(box.x0, box.y0, box.w, box.h) for box in panel_boxes])
+
+    @property
+    def num_panels(self) -> int:
+        return len(self._panels)
+
+    def get_enclosing_panel_num(self, box: PointList) -> int:
+        return int(self.get_enclosing_panel_nums([box])[0])
+
+    def get_enclosing_panel_num_with_shrink(
+        self, box: PointList, shrink_amounts: Sequence[int] = PANEL_SHRINK_AMOUNTS
+    ) -> int:
+        return int(self.get_enclosing_panel_nums_with_shrink([box], shrink_amounts)[0])
+
+    def get_enclosing_panel_nums(self, boxes: Sequence[PointList] | np.ndarray) -> np.ndarray:
+        """Return the first panel fully enclosing each box's envelope.
+
+        Boxes with no panel get ``NO_PANEL_NUM`` and boxes with an empty envelope
+        get ``NO_AREA_PANEL_NUM``.
+        """
+        quads = _as_points_array(boxes)
+        if len(quads) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        return self._get_enclosing_panel_nums(quads.min(axis=1), quads.max(axis=1))
+
+    def get_enclosing_panel_nums_with_shrink(
+        self,
+        boxes: Sequence[PointList] | np.ndarray,
+        shrink_amounts: Sequence[int] = PANEL_SHRINK_AMOUNTS,
+    ) -> np.ndarray:
+        """Return the enclosing panel of each box shrunk by successive ``shrink_amounts``.
+
+        Boxes are four points in top-left, top-right, bottom-right, bottom-left
+        order. A box is tried at each amount in turn and stops at the first
+        enclosing panel, or once it is too small to shrink any further. Boxes
+        with no enclosing panel get ``NO_PANEL_NUM``.
+        """
+        quads = _as_points_array(boxes)
+        num_boxes = len(quads)
+        if num_boxes == 0 or not shrink_amounts:
+            return np.full(num_boxes, NO_PANEL_NUM, dtype=np.int64)
+        assert quads.shape[1] == 4  # noqa: PLR2004
+
+        amounts = np.asarray(shrink_amounts, dtype=np.float64)
+        # (N, S, 4, 2): every box shrunk by every amount.
+        shrunk = quads[:, None, :, :] + amounts[None, :, None, None] * _SHRINK_SIGNS
+        can_shrink = (shrunk[..., 1, 0] > shrunk[..., 0, 0]) & (
+            shrunk[..., 2, 1] > shrunk[..., 0, 1]
+        )
+        # Once a box can't be shrunk, the larger amounts aren't tried either.
+        can_shrink = np.logical_and.accumulate(can_shrink, axis=1)
+
+        flat_shrunk = shrunk.reshape(-1, 4, 2)
+        panel_nums = self._get_enclosing_panel_nums(
+            flat_shrunk.min(axis=1), flat_shrunk.max(axis=1)
+        ).reshape(num_boxes, len(amounts))
+
+        found = can_shrink & (panel_nums > 0)
+        first_found = found.argmax(axis=1)
+        return np.where(
+            found.any(axis=1), panel_nums[np.arange(num_boxes), first_found], NO_PANEL_NUM
+        )
+
+    def _get_enclosing_panel_nums(self, mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+        # (N, P) containment of each box envelope in each panel.
+        envelopes = RectArray(mins[:, 0], mins[:, 1], maxs[:, 0], maxs[:, 1])
+        inside = self._panels.contains(envelopes).T
+        panel_nums = np.where(inside.any(axis=1), inside.argmax(axis=1) + 1, NO_PANEL_NUM)
+
+        has_area = (maxs > mins).all(axis=1)
+        return np.where(has_area, panel_nums, NO_AREA_PANEL_NUM)
+
+
+def get_panel_index_from_file(panel_segments_file: Path) -> PanelIndex:
+    """Return the (cached) panel index for a panel segments json file."""
+    return _get_panel_index_from_file(
+        str(panel_segments_file), panel_segments_file.stat().st_mtime_ns
+    )
+
+
+@lru_cache(maxsize=256)
+def _get_panel_index_from_file(panel_segments_file: str, _mtime_ns: int) -> PanelIndex:
+    with Path(panel_segments_file).open("r") as f:
+        return PanelIndex.from_panel_segments(json.load(f))
+
+
+def _as_points_array(boxes: Sequence[PointList] | np.ndarray) -> np.ndarray:
+    points = np.asarray(boxes, dtype=np.float64)
+    if points.size == 0:
+        return points.reshape(0, 4, 2)
+    assert points.ndim == 3  # noqa: PLR2004
+    assert points.shape[2] == 2  # noqa: PLR2004
+    return points
@@ -0,0 +1,157 @@
+"""A page's worth of axis-aligned rectangles as structure-of-arrays.
+
+The pairwise methods compare every rectangle in a ``RectArray`` against every
+rectangle in 'other' and return (len(self), len(other)) arrays; the elementwise
+methods pair rectangles up by index. Edges are inclusive, as in
+``geometry.Rect``. Unlike ``Rect``, rectangles with zero width or height are
+allowed (empty intersections), so single rectangles come back as
+(x0, y0, x1, y1) tuples, not ``Rect``s.
+"""
+
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+
+
+class RectArray:
+    def __init__(self, x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray) -> None:
+        self.x0 = np.asarray(x0, dtype=np.float64)
+        self.y0 = np.asarray(y0, dtype=np.float64)
+        self.x1 = np.asarray(x1, dtype=np.float64)
+        self.y1 = np.asarray(y1, dtype=np.float64)
+        assert self.x0.shape == self.y0.shape == self.x1.shape == self.y1.shape
+        assert self.x0.ndim == 1
+
+    @classmethod
+    def from_xywh(cls, xywh: Sequence[Sequence[float]] | np.ndarray) -> "RectArray":
+        boxes = np.asarray(xywh, dtype=np.float64).reshape(-1, 4)
+        return cls(boxes[:, 0], boxes[:, 1], boxes[:, 0] + boxes[:, 2], boxes[:, 1] + boxes[:, 3])
+
+    @classmethod
+    def from_points(cls, boxes: Sequence[Sequence[Sequence[float]]] | np.ndarray) -> "RectArray":
+        """Make the envelopes of equal-length point lists (e.g. OCR text box quads)."""
+        points = np.asarray(boxes, dtype=np.float64)
+        if points.size == 0:
+            return cls.from_xywh([])
+        assert points.ndim == 3  # noqa: PLR2004
+        mins = points.min(axis=1)
+        maxs = points.max(axis=1)
+        return cls(mins[:, 0], mins[:, 1], maxs[:, 0], maxs[:, 1])
+
+    def __len__(self) -> int:
+        return len(self.x0)
+
+    def __getitem__(self, index: int) -> tuple[float, float, float, float]:
+        return (
+            float(self.x0[index]),
+            float(self.y0[index]),
+            float(self.x1[index]),
+            float(self.y1[index]),
+        )
+
+    def __iter__(self) -> Iterator[tuple[float, float, float, float]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def widths(self) -> np.ndarray:
+        return self.x1 - self.x0
+
+    @property
+    def heights(self) -> np.ndarray:
+        return self.y1 - self.y0
+
+    @property
+    def areas(self) -> np.ndarray:
+        return self.widths * self.heights
+
+    def contains(self, other: "RectArray") -> np.ndarray:
+        """Pairwise: is other[j] inside self[i] (Rect.is_rect_inside_rect)."""
+        return (
+            (self.x0[:, None] <= other.x0[None, :])
+            & (other.x1[None, :] <= self.x1[:, None])
+            & (self.y0[:, None] <= other.y0[None, :])
+            & (other.y1[None, :] <= self.y1[:, None])
+        )
+
+    def contains_points(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Pairwise: is point j inside self[i] (Rect.is_point_inside_rect)."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        return (
+            (self.x0[:, None] <= xs[None, :])
+            & (xs[None, :] <= self.x1[:, None])
+            & (self.y0[:, None] <= ys[None, :])
+            & (ys[None, :] <= self.y1[:, None])
+        )
+
+    def overlaps(self, other: "RectArray") -> np.ndarray:
+        """Pairwise: do self[i] and other[j] share any point.
+
+        This also counts rectangles crossing each other with no corner inside
+        the other one, which Rect.overlaps_with misses.
+        """
+        return (
+            (self.x0[:, None] <= other.x1[None, :])
+            & (other.x0[None, :] <= self.x1[:, None])
+            & (self.y0[:, None] <= other.y1[None, :])
+            & (other.y0[None, :] <= self.y1[:, None])
+        )
+
+    def distances(self, other: "RectArray") -> np.ndarray:
+        """Pairwise: shortest edge to edge distance, 0 for overlapping rectangles."""
+        gap_x = np.maximum(
+            0.0,
+            np.maximum(self.x0[:, None], other.x0[None, :])
+            - np.minimum(self.x1[:, None], other.x1[None, :]),
+        )
+        gap_y = np.maximum(
+            0.0,
+            np.maximum(self.y0[:, None], other.y0[None, :])
+            - np.minimum(self.y1[:, None], other.y1[None, :]),
+        )
+        return np.hypot(gap_x, gap_y)
+
+    def union(self, other: "RectArray") -> "RectArray":
+        """Elementwise: the bounding rectangle of self[i] and other[i]."""
+        return RectArray(
+            np.minimum(self.x0, other.x0),
+            np.minimum(self.y0, other.y0),
+            np.maximum(self.x1, other.x1),
+            np.maximum(self.y1, other.y1),
+        )
+
+    def intersection(self, other: "RectArray") -> "RectArray":
+        """Elementwise: the overlap of self[i] and other[i], zero-sized if there is none."""
+        x0 = np.maximum(self.x0, other.x0)
+        y0 = np.maximum(self.y0, other.y0)
+        return RectArray(
+            x0,
+            y0,
+            np.maximum(x0, np.minimum(self.x1, other.x1)),
+            np.maximum(y0, np.minimum(self.y1, other.y1)),
+        )
+
+    def intersection_areas(self, other: "RectArray") -> np.ndarray:
+        """Pairwise: the overlap area of self[i] and other[j]."""
+        overlap_w = np.maximum(
+            0.0,
+            np.minimum(self.x1[:, None], other.x1[None, :])
+            - np.maximum(self.x0[:, None], other.x0[None, :]),
+        )
+        overlap_h = np.maximum(
+            0.0,
+            np.minimum(self.y1[:, None], other.y1[None, :])
+            - np.maximum(self.y0[:, None], other.y0[None, :]),
+        )
+        return overlap_w * overlap_h
+
+    def bounding_rect(self) -> tuple[float, float, float, float]:
+        """The union of all the rectangles as (x0, y0, x1, y1)."""
+        assert len(self) > 0
+        return (
+            float(self.x0.min()),
+            float(self.y0.min()),
+            float(self.x1.max()),
+            float(self.y1.max()),
+        )
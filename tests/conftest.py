@@ -0,0 +1,4 @@
+import os
+
+# barks_ocr.utils.gemini_ai reads the key on import; the tests only talk to the local stand-in.
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
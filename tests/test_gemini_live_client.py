@@ -0,0 +1,169 @@
+"""Live Gemini client and live predicted groups against the local stand-in server."""
+
+import json
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from barks_fantagraphics.ocr_file_paths import get_ocr_predicted_groups_filename
+from google.genai import errors
+from PIL import Image
+
+from barks_ocr.pipeline import run_pipeline
+from barks_ocr.pipeline.gemini_live_groups import LiveAiPredictedGroups
+from barks_ocr.pipeline.run_pipeline import PageArtifacts
+from barks_ocr.tools.fake_gemini_server import (
+    FakeGeminiConfig,
+    FakeGeminiServer,
+    get_prompt_replay_key,
+)
+from barks_ocr.utils.common import ProcessResult
+from barks_ocr.utils.gemini_live_client import (
+    GeminiLiveClient,
+    GeminiResponseCache,
+    RateLimiter,
+    get_live_client,
+)
+
+MODEL = "gemini-test"
+PROMPT = "Group these boxes."
+IMAGE_BYTES = b"not really a png"
+
+
+@pytest.fixture
+def replay_dir(tmp_path: Path) -> Path:
+    replay_dir = tmp_path / "replay"
+    replay_dir.mkdir()
+    return replay_dir
+
+
+def _make_server(replay_dir: Path, error_rate: float = 0.0) -> FakeGeminiServer:
+    """Return an unstarted server - entering it starts it."""
+    return FakeGeminiServer(FakeGeminiConfig(error_rate=error_rate, replay_dir=replay_dir))
+
+
+@pytest.fixture
+def server(replay_dir: Path) -> Iterator[FakeGeminiServer]:
+    with _make_server(replay_dir) as server:
+        yield server
+
+
+def _make_live_client(
+    server: FakeGeminiServer, cache_dir: Path | None, max_retries: int = 0
+) -> GeminiLiveClient:
+    return GeminiLiveClient(
+        get_live_client("test-key", server.base_url),
+        MODEL,
+        RateLimiter(max_qps=100.0, max_tokens_per_minute=1_000_000),
+        GeminiResponseCache(cache_dir) if cache_dir else None,
+        max_retries=max_retries,
+        initial_backoff_secs=0.0,
+    )
+
+
+def test_response_is_cached(server: FakeGeminiServer, tmp_path: Path) -> None:
+    live_client = _make_live_client(server, tmp_path / "cache")
+
+    first_text = live_client.generate_json(PROMPT, IMAGE_BYTES)
+    second_text = live_client.generate_json(PROMPT, IMAGE_BYTES)
+
+    assert json.loads(first_text) == []
+    assert second_text == first_text
+    assert server.state.num_requests == 1
+
+
+def test_malformed_response_is_not_cached(
+    server: FakeGeminiServer, replay_dir: Path, tmp_path: Path
+) -> None:
+    cache_dir = tmp_path / "cache"
+    live_client = _make_live_client(server, cache_dir)
+    replay_file = replay_dir / f"{get_prompt_replay_key(PROMPT)}.json"
+
+    replay_file.write_text('[{"panel_id": "1",')
+    with pytest.raises(ValueError, match="not valid json"):
+        live_client.generate_json(PROMPT, IMAGE_BYTES)
+    assert not list(cache_dir.glob("*.json"))
+
+    replay_file.write_text('[{"panel_id": "1"}]')
+    assert json.loads(live_client.generate_json(PROMPT, IMAGE_BYTES)) == [{"panel_id": "1"}]
+    assert server.state.num_requests == 2  # noqa: PLR2004
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+
+def test_retryable_errors_are_retried(replay_dir: Path) -> None:
+    max_retries = 2
+    with _make_server(replay_dir, error_rate=1.0) as server:
+        live_client = _make_live_client(server, None, max_retries)
+
+        with pytest.raises(errors.APIError) as e:
+            live_client.generate_json(PROMPT, IMAGE_BYTES)
+
+        assert e.value.code == 503  # noqa: PLR2004
+        assert server.state.num_requests == max_retries + 1
+
+
+def test_rate_limiter_spaces_requests() -> None:
+    rate_limiter = RateLimiter(max_qps=20.0, max_tokens_per_minute=1_000_000)
+
+    start = time.monotonic()
+    for _ in range(3):
+        rate_limiter.acquire(1)
+
+    assert time.monotonic() - start >= 0.09  # noqa: PLR2004
+
+
+def test_page_with_batch_results_is_read_not_fetched(
+    server: FakeGeminiServer, tmp_path: Path
+) -> None:
+    batch_results_dir = tmp_path / "batch-results"
+    batch_results_dir.mkdir()
+    predicted_groups_file = batch_results_dir / get_ocr_predicted_groups_filename("001", "easyocr")
+    predicted_groups_file.write_text('[{"panel_id": "2"}]')
+    live_ai_predicted_groups = LiveAiPredictedGroups(_make_live_client(server, None))
+
+    predicted_groups = live_ai_predicted_groups(
+        "001", "easyocr", batch_results_dir, [], tmp_path / "001.png"
+    )
+
+    assert predicted_groups == [{"panel_id": "2"}]
+    assert predicted_groups_file.read_text() == '[{"panel_id": "2"}]'
+    assert server.state.num_requests == 0
+
+
+def test_predict_stage_fetches_stale_page(
+    server: FakeGeminiServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    svg_file = tmp_path / "001.svg"
+    Image.new("RGBA", (40, 30), (0, 0, 0, 255)).save(str(svg_file) + ".png")
+    ocr_file = tmp_path / "001-easyocr.json"
+    ocr_file.write_text(json.dumps([[[1, 1, 20, 1, 20, 10, 1, 10], "HI", "HI", 0.9]]))
+    batch_results_dir = tmp_path / "batch-results"
+    predicted_groups_file = batch_results_dir / get_ocr_predicted_groups_filename("001", "easyocr")
+    batch_results_dir.mkdir()
+    predicted_groups_file.write_text('[{"panel_id": "stale"}]')
+    page = PageArtifacts(
+        title="Test Title",
+        volume=1,
+        volume_dirname="Volume 1",
+        fanta_page="001",
+        svg_file=svg_file,
+        panel_segments_file=tmp_path / "001.json",
+        ocr_types=("easyocr",),
+        ocr_files=(ocr_file,),
+        batch_results_dir=batch_results_dir,
+        predicted_groups_files=(predicted_groups_file,),
+        prelim_groups_files=(),
+        final_groups_files=(),
+    )
+    monkeypatch.setattr(
+        run_pipeline,
+        "_LIVE_PREDICTED_GROUPS",
+        LiveAiPredictedGroups(_make_live_client(server, None)),
+    )
+
+    assert run_pipeline._run_predict(page) == ProcessResult.SUCCESS  # noqa: SLF001
+
+    assert server.state.num_requests == 1
+    predicted_groups = json.loads(predicted_groups_file.read_text())
+    assert [group["box_ids"] for group in predicted_groups] == [["0"]]
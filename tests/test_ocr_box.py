@@ -0,0 +1,68 @@
+"""``OcrBox.from_quads`` and ``get_quads_geometry`` against the shapely geometry they replace."""
+
+import numpy as np
+import pytest
+from shapely import MultiPoint, Polygon
+
+from barks_ocr.utils.ocr_box import OcrBox, PointList, get_quads_geometry
+
+NUM_QUADS = 7000
+
+
+def _rotate(corners: np.ndarray, degrees: float) -> np.ndarray:
+    angle = np.radians(degrees)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    return corners @ rotation.T
+
+
+def _make_quads(seed: int) -> list[PointList]:
+    """Return random quads, text boxes (some rounded) and rectangles on the tolerance angle."""
+    rng = np.random.default_rng(seed)
+    quads = []
+    for i in range(NUM_QUADS):
+        kind = i % 4
+        if kind == 0:
+            quad = rng.uniform(0, 100, (4, 2))
+        elif kind == 1:
+            quad = np.round(rng.uniform(0, 50, (4, 2)))  # lots of equal-area ties
+        else:
+            width, height = rng.uniform(5, 400, 2)
+            corners = np.array(
+                [[-width, -height], [width, -height], [width, height], [-width, height]]
+            )
+            degrees = (
+                rng.uniform(0, 180)
+                if kind == 2  # noqa: PLR2004
+                else rng.choice([0.0, 4.99, 5.0, 5.01, 45.0, 85.0, 90.0, 95.0])
+            )
+            quad = _rotate(corners / 2, degrees) + rng.uniform(100, 2000, 2)
+            if i % 3 == 0:
+                quad = np.round(quad)
+        quads.append([(float(x), float(y)) for x, y in quad])
+    return quads
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_from_quads_matches_shapely(seed: int) -> None:
+    quads = _make_quads(seed)
+    ocr_boxes = OcrBox.from_quads(quads, [""] * NUM_QUADS, [0.0] * NUM_QUADS, [""] * NUM_QUADS)
+
+    for quad, ocr_box in zip(quads, ocr_boxes, strict=True):
+        shapely_box = OcrBox(quad, "", 0.0, "")
+        assert ocr_box.is_approx_rect == shapely_box.is_approx_rect, quad
+        # Same corners in the same order.
+        assert ocr_box.min_rotated_rectangle == shapely_box.min_rotated_rectangle, quad
+
+
+def test_quads_geometry_rectangles_have_shapely_area() -> None:
+    quads = np.array(_make_quads(2))
+    geometry = get_quads_geometry(quads)
+
+    for quad, corners, is_degenerate in zip(
+        quads, geometry.rect_corners, geometry.is_degenerate, strict=True
+    ):
+        if is_degenerate:
+            continue
+        assert Polygon(corners).area == pytest.approx(
+            MultiPoint(quad).minimum_rotated_rectangle.area, rel=1e-9
+        )